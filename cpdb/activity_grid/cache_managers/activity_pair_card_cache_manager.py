@@ -1,14 +1,36 @@
-from django.db.models import OuterRef
+from django.db.models import OuterRef, Q
 
 from activity_grid.models import ActivityPairCard
-from data.models import Allegation
+from data.models import Allegation, OfficerAllegation
 from data.utils.subqueries import SQCount
 
+SOURCE_MODELS = [ActivityPairCard, Allegation, OfficerAllegation]
+TARGET_MODELS = [ActivityPairCard]
 
-def cache_data():
+
+def _pair_cards_updated_since(since):
+    crids = set(Allegation.objects.filter(updated_at__gt=since).values_list('crid', flat=True))
+    crids.update(OfficerAllegation.objects.filter(updated_at__gt=since).values_list('allegation_id', flat=True))
+    officer_ids = OfficerAllegation.objects.filter(
+        allegation_id__in=crids, officer_id__isnull=False
+    ).values_list('officer_id', flat=True)
+
+    return ActivityPairCard.objects.filter(
+        Q(updated_at__gt=since) | Q(officer1_id__in=officer_ids) | Q(officer2_id__in=officer_ids)
+    )
+
+
+def cache_data(since=None, changes=None):
+    if changes is not None:
+        officer_ids = changes.affected_officer_ids()
+        pair_cards = ActivityPairCard.objects.filter(Q(officer1_id__in=officer_ids) | Q(officer2_id__in=officer_ids))
+    elif since is not None:
+        pair_cards = _pair_cards_updated_since(since)
+    else:
+        pair_cards = ActivityPairCard.objects.all()
     allegations = Allegation.objects.filter(
         officerallegation__officer=OuterRef('officer1')
     ).filter(
         officerallegation__officer=OuterRef('officer2')
     )
-    ActivityPairCard.objects.update(coaccusal_count=SQCount(allegations.values('crid')))
+    pair_cards.update(coaccusal_count=SQCount(allegations.values('crid')))
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_add_kind_to_attachmenttracking'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='''
+                UPDATE analytics_searchtracking AS t SET usages = merged.usages
+                FROM (
+                    SELECT MIN(id) AS id, SUM(usages) AS usages
+                    FROM analytics_searchtracking
+                    GROUP BY query
+                    HAVING COUNT(*) > 1
+                ) AS merged
+                WHERE t.id = merged.id;
+
+                DELETE FROM analytics_searchtracking AS t
+                USING analytics_searchtracking AS kept
+                WHERE t.query = kept.query AND t.id > kept.id;
+            ''',
+            reverse_sql=migrations.RunSQL.noop
+        ),
+        migrations.AlterField(
+            model_name='searchtracking',
+            name='query',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
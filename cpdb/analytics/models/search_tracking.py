@@ -4,7 +4,7 @@ from analytics.constants import QUERY_TYPES
 
 
 class SearchTracking(models.Model):
-    query = models.CharField(max_length=255)
+    query = models.CharField(max_length=255, unique=True)
     usages = models.PositiveIntegerField(default=0)
     results = models.PositiveIntegerField(default=0)
     query_type = models.CharField(choices=QUERY_TYPES, max_length=20)
@@ -1,5 +1,116 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction, DatabaseError
+from django.utils import timezone
+from psycopg2.extras import execute_values
+
 from .models import SearchTracking
 
+logger = logging.getLogger(__name__)
+
+
+class SearchTrackingBuffer(object):
+    '''
+    Aggregate tracked search queries in memory and write them with a single upsert per flush.
+    A flush happens when a query is added and either `flush_interval` seconds passed since the previous flush
+    or `max_queries` distinct queries are waiting. With `background` it runs in its own thread so the search
+    request does not wait for the write, at most one flush thread runs at a time.
+    When the upsert fails, the flushed counts are put back into the buffer for the next flush.
+    '''
+    def __init__(self, flush_interval=10, max_queries=500, background=True):
+        self.flush_interval = flush_interval
+        self.max_queries = max_queries
+        self.background = background
+        self._queries = {}
+        self._lock = threading.Lock()
+        self._last_flushed_at = time.time()
+        self._flush_thread = None
+
+    def add(self, query, results):
+        query = query[:SearchTracking._meta.get_field('query').max_length]
+        with self._lock:
+            usages, _ = self._queries.get(query, (0, 0))
+            self._queries[query] = (usages + 1, results)
+            should_flush = len(self._queries) >= self.max_queries or \
+                time.time() - self._last_flushed_at >= self.flush_interval
+
+        if not should_flush:
+            return
+        if self.background:
+            self._flush_in_background()
+        else:
+            self.flush()
+
+    def _flush_in_background(self):
+        with self._lock:
+            if self._flush_thread is not None and self._flush_thread.is_alive():
+                return
+            self._flush_thread = threading.Thread(target=self._background_flush, daemon=True)
+            self._flush_thread.start()
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def shutdown(self):
+        '''
+        Wait for a running background flush, then flush what is left.
+        '''
+        flush_thread = self._flush_thread
+        if flush_thread is not None:
+            flush_thread.join()
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            queries, self._queries = self._queries, {}
+            self._last_flushed_at = time.time()
+
+        if not queries:
+            return 0
+
+        now = timezone.now()
+        table_name = SearchTracking._meta.db_table
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                execute_values(
+                    cursor.cursor,
+                    f'''
+                        INSERT INTO {table_name} (query, usages, results, query_type, created_at, last_entered)
+                        VALUES %s
+                        ON CONFLICT (query) DO UPDATE SET
+                            usages = {table_name}.usages + EXCLUDED.usages,
+                            results = EXCLUDED.results,
+                            query_type = EXCLUDED.query_type,
+                            last_entered = EXCLUDED.last_entered
+                    ''',
+                    [(query, usages, results, 'free_text', now, now) for query, (usages, results) in queries.items()]
+                )
+        except DatabaseError:
+            logger.exception('Could not flush %d tracked search queries, keeping them for the next flush', len(queries))
+            self._restore(queries)
+            return 0
+        return len(queries)
+
+    def _restore(self, queries):
+        with self._lock:
+            for query, (usages, results) in queries.items():
+                added_usages, added_results = self._queries.get(query, (0, results))
+                self._queries[query] = (usages + added_usages, added_results)
+
+
+# Tests flush synchronously so the queries are written in the connection of the test case, and nothing is flushed
+# at exit since the test database is gone by then.
+search_tracking_buffer = SearchTrackingBuffer(background=not settings.TEST)
+if not settings.TEST:
+    atexit.register(search_tracking_buffer.shutdown)
+
 
 class QueryTrackingSearchHook(object):
     @staticmethod
@@ -9,14 +120,4 @@ class QueryTrackingSearchHook(object):
 
     @staticmethod
     def execute(term, content_type=None, results={}):
-        query_searches = SearchTracking.objects.filter(query=term)
-        if len(query_searches) == 0:
-            SearchTracking.objects.create(
-                query=term, usages=1, results=QueryTrackingSearchHook._count_result(results), query_type='free_text'
-            )
-        else:
-            query_search = query_searches[0]
-            query_search.usages = query_search.usages + 1
-            query_search.results = QueryTrackingSearchHook._count_result(results)
-            query_search.query_type = 'free_text'
-            query_search.save()
+        search_tracking_buffer.add(term, QueryTrackingSearchHook._count_result(results))
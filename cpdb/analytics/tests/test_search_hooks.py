@@ -1,23 +1,132 @@
+from django.db import DatabaseError
 from django.test import TestCase
 
+from freezegun import freeze_time
+from mock import Mock, patch
 from robber import expect
 
-from analytics.search_hooks import QueryTrackingSearchHook
+from analytics.search_hooks import QueryTrackingSearchHook, SearchTrackingBuffer, search_tracking_buffer
 from analytics.models import SearchTracking
 from analytics.factories import SearchTrackingFactory
 
 
 class QueryTrackingSearchHookTestCase(TestCase):
+    def setUp(self):
+        search_tracking_buffer.flush()
+        SearchTracking.objects.all().delete()
+
     def test_execute_create(self):
         QueryTrackingSearchHook.execute(term='query', results={})
+        search_tracking_buffer.flush()
+
         expect(SearchTracking.objects.count()).to.be.eq(1)
         expect(SearchTracking.objects.first().query).to.be.eq('query')
 
     def test_execute_update(self):
         SearchTrackingFactory(query='query', results=10, usages=5)
         QueryTrackingSearchHook.execute(term='query', results={'officer': [{}, {}], 'coaccused': [{}, {}]})
+        search_tracking_buffer.flush()
+
         expect(SearchTracking.objects.count()).to.be.eq(1)
         search_tracking = SearchTracking.objects.first()
         expect(search_tracking.query).to.be.eq('query')
         expect(search_tracking.usages).to.be.eq(6)
         expect(search_tracking.results).to.be.eq(4)
+
+
+class SearchTrackingBufferTestCase(TestCase):
+    def test_flush_aggregates_queries(self):
+        SearchTrackingFactory(query='jerome', results=10, usages=5, query_type='no_interaction')
+        buffer = SearchTrackingBuffer(flush_interval=60)
+        buffer.add('jerome', 3)
+        buffer.add('jerome', 2)
+        buffer.add('finnigan', 1)
+
+        expect(SearchTracking.objects.count()).to.eq(1)
+        expect(buffer.flush()).to.eq(2)
+
+        jerome = SearchTracking.objects.get(query='jerome')
+        expect(jerome.usages).to.eq(7)
+        expect(jerome.results).to.eq(2)
+        expect(jerome.query_type).to.eq('free_text')
+        finnigan = SearchTracking.objects.get(query='finnigan')
+        expect(finnigan.usages).to.eq(1)
+        expect(finnigan.results).to.eq(1)
+
+    def test_flush_empty_buffer(self):
+        expect(SearchTrackingBuffer().flush()).to.eq(0)
+        expect(SearchTracking.objects.count()).to.eq(0)
+
+    def test_flush_after_interval(self):
+        with freeze_time('2020-01-01 00:00:00'):
+            buffer = SearchTrackingBuffer(flush_interval=10, background=False)
+            buffer.add('jerome', 1)
+        expect(SearchTracking.objects.count()).to.eq(0)
+
+        with freeze_time('2020-01-01 00:00:11'):
+            buffer.add('jerome', 1)
+        expect(SearchTracking.objects.get(query='jerome').usages).to.eq(2)
+
+    def test_flush_when_full(self):
+        buffer = SearchTrackingBuffer(flush_interval=60, max_queries=2, background=False)
+        buffer.add('jerome', 1)
+        expect(SearchTracking.objects.count()).to.eq(0)
+
+        buffer.add('finnigan', 1)
+        expect(SearchTracking.objects.count()).to.eq(2)
+
+    @patch('analytics.search_hooks.threading.Thread')
+    def test_flush_in_background_thread(self, thread_mock):
+        thread_mock.return_value.is_alive.return_value = True
+        buffer = SearchTrackingBuffer(flush_interval=60, max_queries=1)
+        buffer.add('jerome', 1)
+        buffer.add('finnigan', 1)
+
+        thread_mock.assert_called_once_with(target=buffer._background_flush, daemon=True)
+        thread_mock.return_value.start.assert_called_once()
+        expect(SearchTracking.objects.count()).to.eq(0)
+
+    @patch('analytics.search_hooks.connection')
+    def test_background_flush_close_connection(self, connection_mock):
+        buffer = SearchTrackingBuffer()
+        buffer.flush = Mock(return_value=1)
+        buffer._background_flush()
+
+        buffer.flush.assert_called_once()
+        connection_mock.close.assert_called_once()
+
+    def test_shutdown(self):
+        buffer = SearchTrackingBuffer(flush_interval=60)
+        buffer._flush_thread = Mock()
+        buffer.add('jerome', 1)
+        buffer.shutdown()
+
+        buffer._flush_thread.join.assert_called_once()
+        expect(SearchTracking.objects.get(query='jerome').usages).to.eq(1)
+
+    def test_search_tracking_buffer_flush_synchronously_in_test(self):
+        expect(search_tracking_buffer.background).to.be.false()
+
+    def test_flush_keeps_queries_when_upsert_fails(self):
+        buffer = SearchTrackingBuffer(flush_interval=60)
+        buffer.add('jerome', 3)
+        buffer.add('finnigan', 1)
+
+        with patch('analytics.search_hooks.execute_values', side_effect=DatabaseError()):
+            expect(buffer.flush()).to.eq(0)
+        expect(SearchTracking.objects.count()).to.eq(0)
+
+        buffer.add('jerome', 2)
+        expect(buffer.flush()).to.eq(2)
+
+        jerome = SearchTracking.objects.get(query='jerome')
+        expect(jerome.usages).to.eq(2)
+        expect(jerome.results).to.eq(2)
+        expect(SearchTracking.objects.get(query='finnigan').usages).to.eq(1)
+
+    def test_add_truncates_long_query(self):
+        buffer = SearchTrackingBuffer()
+        buffer.add('a' * 300, 1)
+        buffer.flush()
+
+        expect(SearchTracking.objects.first().query).to.eq('a' * 255)
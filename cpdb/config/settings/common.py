@@ -111,6 +111,13 @@ CACHES = {
     }
 }
 
+# Number of Elasticsearch search results each process keeps in memory, 0 disables the cache
+SEARCH_RESULT_CACHE_SIZE = env.int('SEARCH_RESULT_CACHE_SIZE', 2000)
+# Seconds to wait for a combined search request, content types which did not answer in time are left out
+SEARCH_REQUEST_TIMEOUT = env.float('SEARCH_REQUEST_TIMEOUT', 2.0)
+# Seconds to keep computed pinboard data, which is also dropped whenever cache_data runs
+PINBOARD_CACHE_TIMEOUT = env.int('PINBOARD_CACHE_TIMEOUT', 60 * 60 * 24)
+
 
 # DEBUG
 # ------------------------------------------------------------------------------
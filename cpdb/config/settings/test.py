@@ -24,6 +24,8 @@ V1_URL = 'http://cpdb.lvh.me'
 
 ENABLE_SITEMAP = True
 
+SEARCH_RESULT_CACHE_SIZE = 0
+
 
 # OVERRIDE PROTECTED KEYS from common
 MAILCHIMP_API_KEY = ''
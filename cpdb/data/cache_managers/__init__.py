@@ -1,5 +1,10 @@
+import time
+from collections import OrderedDict
+
 from activity_grid.cache_managers import activity_pair_card_cache_manager
-from . import allegation_cache_manager, officer_cache_manager, salary_cache_manager
+from . import (
+    allegation_cache_manager, officer_cache_manager, salary_cache_manager, officer_coaccusal_cache_manager
+)
 from lawsuit.cache_managers import lawsuit_cache_manager
 
 
@@ -7,11 +12,60 @@ managers = [
     allegation_cache_manager,
     officer_cache_manager,
     salary_cache_manager,
+    officer_coaccusal_cache_manager,
     activity_pair_card_cache_manager,
     lawsuit_cache_manager
 ]
 
 
-def cache_all():
+def manager_name(manager):
+    return manager.__name__.split('.')[-1][:-len('_cache_manager')]
+
+
+def _has_changed_since(manager, since):
+    return any(model.objects.filter(updated_at__gt=since).exists() for model in manager.SOURCE_MODELS)
+
+
+def _cache_kwargs(manager, since=None, changes=None):
+    """
+    Arguments of manager.cache_data, or None when the manager can be skipped.
+    Managers caching into the table an update manager reloaded are run fully, its cached columns were reset.
+    """
+    if changes is not None:
+        if changes.model in manager.TARGET_MODELS:
+            return {}
+        if changes.model in manager.SOURCE_MODELS and not changes.empty:
+            return {'changes': changes}
+        return None
+    if since is None:
+        return {}
+    if _has_changed_since(manager, since):
+        return {'since': since}
+    return None
+
+
+def cache_all(only=None, since=None, changes=None):
+    """
+    Run the cache managers and return how long each of them took in seconds, None for skipped ones.
+    :param only: names of the managers to run, all of them if None
+    :param since: only refresh rows depending on source rows updated after this datetime,
+                  managers whose source tables did not change at all are skipped
+    :param changes: DataChanges reported by the update manager which just reloaded a table, only rows depending
+                    on the changed officers and allegations are refreshed, managers not depending on the table
+                    are skipped
+    """
+    timings = OrderedDict()
     for manager in managers:
-        manager.cache_data()
+        name = manager_name(manager)
+        if only is not None and name not in only:
+            continue
+
+        kwargs = _cache_kwargs(manager, since=since, changes=changes)
+        if kwargs is None:
+            timings[name] = None
+            continue
+
+        start_time = time.time()
+        manager.cache_data(**kwargs)
+        timings[name] = time.time() - start_time
+    return timings
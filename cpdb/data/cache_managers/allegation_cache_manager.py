@@ -2,9 +2,28 @@ from django.db.models import OuterRef, Subquery, Count
 
 from data.models import OfficerAllegation, Allegation
 
+SOURCE_MODELS = [Allegation, OfficerAllegation]
+TARGET_MODELS = [Allegation]
 
-def cache_data():
-    Allegation.objects.update(
+
+def _allegations_updated_since(since):
+    crids = set(Allegation.objects.filter(updated_at__gt=since).values_list('crid', flat=True))
+    crids.update(
+        OfficerAllegation.objects.filter(
+            updated_at__gt=since, allegation_id__isnull=False
+        ).values_list('allegation_id', flat=True)
+    )
+    return Allegation.objects.filter(crid__in=crids)
+
+
+def cache_data(since=None, changes=None):
+    if changes is not None:
+        allegations = Allegation.objects.filter(crid__in=changes.crids)
+    elif since is not None:
+        allegations = _allegations_updated_since(since)
+    else:
+        allegations = Allegation.objects.all()
+    allegations.update(
         most_common_category=Subquery(
             OfficerAllegation.objects.filter(
                 allegation_id=OuterRef('crid')
@@ -38,4 +57,4 @@ def cache_data():
     ]
 
     for column in count_columns:
-        Allegation.objects.filter(**{f'{column}__isnull': True}).update(**{column: 0})
+        allegations.filter(**{f'{column}__isnull': True}).update(**{column: 0})
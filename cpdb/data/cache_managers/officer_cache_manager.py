@@ -1,158 +1,186 @@
-from django.db import connection
-from django.db.models import OuterRef, Subquery, Count, Exists
-from django.db.models.functions import Lower
-from tqdm import tqdm
-
-from data.constants import (
-    MAJOR_AWARDS, MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR,
-    PERCENTILE_TRR_GROUP, PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP, PERCENTILE_ALLEGATION_GROUP
-)
+import logging
+import time
+from collections import OrderedDict
+
+from django.db import connection, transaction
+
+from data.constants import MAJOR_AWARDS, MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR
 
 from data.models import (
-    Officer, OfficerAllegation, Award,
+    Officer, Allegation, OfficerAllegation, Award,
     OfficerBadgeNumber, OfficerHistory, Salary,
-    OfficerYearlyPercentile
+    OfficerYearlyPercentile, OfficerYearlyPercentileSnapshot
 )
 from trr.models import TRR
 from data import officer_percentile
-from utils.bulk_db import build_bulk_update_sql
+from officers.query_helpers.officer_updated_since import get_officer_ids_updated_since
+from utils.bulk_db import bulk_update
+
 
+logger = logging.getLogger(__name__)
 
-def cache_data():
+SOURCE_MODELS = [Officer, Allegation, OfficerAllegation, Award, OfficerBadgeNumber, OfficerHistory, Salary, TRR]
+TARGET_MODELS = [Officer, OfficerYearlyPercentile, OfficerYearlyPercentileSnapshot]
+
+
+def cache_data(since=None, changes=None):
+    officer_ids = None
+    if changes is not None:
+        officer_ids = changes.affected_officer_ids()
+    elif since is not None:
+        officer_ids = get_officer_ids_updated_since(since)
+
+    officer_percentile.invalidate_percentile_map()
     build_cached_yearly_percentiles()
     build_cached_percentiles()
-    build_cached_columns()
-
-
-def _allegation_count_subquery(**kwargs):
-    return Subquery(
-        OfficerAllegation.objects.filter(
-            officer_id=OuterRef('id'),
-            **kwargs
-        ).values('officer_id').annotate(
-            count=Count('allegation_id', distinct=True)
-        ).values('count')[:1]
-    )
-
-
-def _award_count_subquery(**kwargs):
-    return Subquery(
-        Award.objects.filter(
-            officer_id=OuterRef('id'),
-            **kwargs
-        ).values('officer_id').annotate(
-            count=Count('id')
-        ).values('count')[:1]
-    )
-
-
-def build_cached_columns():
-    Officer.objects.update(
-        allegation_count=_allegation_count_subquery(),
-        sustained_count=_allegation_count_subquery(final_finding='SU'),
-        unsustained_count=_allegation_count_subquery(final_finding='NS'),
-        discipline_count=_allegation_count_subquery(disciplined=True),
-        honorable_mention_count=_award_count_subquery(award_type__contains='Honorable Mention'),
-        civilian_compliment_count=_award_count_subquery(award_type='Complimentary Letter'),
-        major_award_count=Subquery(
-            Award.objects.annotate(
-                lower_award_type=Lower('award_type')
-            ).filter(
-                officer_id=OuterRef('id'),
-                lower_award_type__in=MAJOR_AWARDS
-            ).values('officer_id').annotate(
-                count=Count('id')
-            ).values('count')[:1]
-        ),
-        trr_count=Subquery(
-            TRR.objects.filter(
-                officer_id=OuterRef('id'),
-            ).values('officer_id').annotate(
-                count=Count('id')
-            ).values('count')[:1]
-        ),
-        current_badge=Subquery(
-            OfficerBadgeNumber.objects.filter(
-                officer_id=OuterRef('id'),
-                current=True
-            ).values('star')[:1]
-        ),
-        last_unit=Subquery(
-            OfficerHistory.objects.filter(
-                officer_id=OuterRef('id'),
-            ).order_by('-end_date').values('unit_id')[:1]
-        ),
-        current_salary=Subquery(
-            Salary.objects.filter(
-                officer_id=OuterRef('id'),
-            ).order_by('-year').values('salary')[:1]
-        ),
-        has_unique_name=~Exists(
-            Officer.objects.exclude(
-                id=OuterRef('id')
-            ).filter(
-                first_name=OuterRef('first_name'), last_name=OuterRef('last_name')
-            )
-        )
-    )
-
-    count_columns = [
-        'allegation_count',
-        'sustained_count',
-        'unsustained_count',
-        'discipline_count',
-        'honorable_mention_count',
-        'civilian_compliment_count',
-        'major_award_count',
-        'trr_count',
+    build_cached_columns(officer_ids=officer_ids)
+
+
+def _cached_column_phases(officer_ids=None):
+    """
+    Each phase aggregates one source table into a temp table keyed by officer_id with a single GROUP BY
+    (or DISTINCT ON) pass. The first phase selects the officers to refresh, which the others are limited to
+    and LEFT JOINed onto: every officer, or only officer_ids plus officers whose name uniqueness changed.
+    """
+    refreshed_officers = 'officer_id IN (SELECT officer_id FROM tmp_officer_unique_names)'
+    unique_names_filter = ''
+    unique_names_params = []
+    if officer_ids is not None:
+        unique_names_filter = 'WHERE officer_id = ANY(%s) OR has_unique_name IS DISTINCT FROM cached_has_unique_name'
+        unique_names_params = [list(officer_ids)]
+
+    return [
+        ('unique names', 'tmp_officer_unique_names', f"""
+            SELECT officer_id, has_unique_name FROM (
+                SELECT id AS officer_id,
+                    has_unique_name AS cached_has_unique_name,
+                    COUNT(*) OVER (PARTITION BY first_name, last_name) = 1 AS has_unique_name
+                FROM {Officer._meta.db_table}
+            ) AS unique_names
+            {unique_names_filter}
+        """, unique_names_params),
+        ('allegation counts', 'tmp_officer_allegation_counts', f"""
+            SELECT officer_id,
+                COUNT(DISTINCT allegation_id) AS allegation_count,
+                COUNT(DISTINCT allegation_id) FILTER (WHERE final_finding = 'SU') AS sustained_count,
+                COUNT(DISTINCT allegation_id) FILTER (WHERE final_finding = 'NS') AS unsustained_count,
+                COUNT(DISTINCT allegation_id) FILTER (WHERE disciplined) AS discipline_count
+            FROM {OfficerAllegation._meta.db_table}
+            WHERE {refreshed_officers}
+            GROUP BY officer_id
+        """, []),
+        ('award counts', 'tmp_officer_award_counts', f"""
+            SELECT officer_id,
+                COUNT(*) FILTER (WHERE award_type LIKE %s) AS honorable_mention_count,
+                COUNT(*) FILTER (WHERE award_type = %s) AS civilian_compliment_count,
+                COUNT(*) FILTER (WHERE LOWER(award_type) IN %s) AS major_award_count
+            FROM {Award._meta.db_table}
+            WHERE {refreshed_officers}
+            GROUP BY officer_id
+        """, ['%Honorable Mention%', 'Complimentary Letter', tuple(MAJOR_AWARDS)]),
+        ('trr counts', 'tmp_officer_trr_counts', f"""
+            SELECT officer_id, COUNT(*) AS trr_count
+            FROM {TRR._meta.db_table}
+            WHERE {refreshed_officers}
+            GROUP BY officer_id
+        """, []),
+        ('current badges', 'tmp_officer_current_badges', f"""
+            SELECT DISTINCT ON (officer_id) officer_id, star AS current_badge
+            FROM {OfficerBadgeNumber._meta.db_table}
+            WHERE {refreshed_officers} AND current
+            ORDER BY officer_id, id
+        """, []),
+        ('last units', 'tmp_officer_last_units', f"""
+            SELECT DISTINCT ON (officer_id) officer_id, unit_id AS last_unit_id
+            FROM {OfficerHistory._meta.db_table}
+            WHERE {refreshed_officers}
+            ORDER BY officer_id, end_date DESC
+        """, []),
+        ('current salaries', 'tmp_officer_current_salaries', f"""
+            SELECT DISTINCT ON (officer_id) officer_id, salary AS current_salary
+            FROM {Salary._meta.db_table}
+            WHERE {refreshed_officers}
+            ORDER BY officer_id, year DESC
+        """, []),
     ]
 
-    for column in count_columns:
-        Officer.objects.filter(**{f'{column}__isnull': True}).update(**{column: 0})
 
+def build_cached_columns(officer_ids=None):
+    """
+    Compute the cached officer columns with a few set based passes into temp tables and apply them with a
+    single UPDATE ... FROM. Returns how long each phase took in seconds.
+    :param officer_ids: only refresh these officers (and any officer whose name uniqueness changed), None for all
+    """
+    phases = _cached_column_phases(officer_ids)
+    timings = OrderedDict()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for phase, table_name, select_sql, params in phases:
+            start_time = time.time()
+            cursor.execute(f'DROP TABLE IF EXISTS {table_name}')
+            cursor.execute(f'CREATE TEMP TABLE {table_name} AS {select_sql}', params)
+            timings[phase] = time.time() - start_time
+
+        start_time = time.time()
+        cursor.execute(f"""
+            UPDATE {Officer._meta.db_table} AS officer SET
+                allegation_count = COALESCE(allegation_counts.allegation_count, 0),
+                sustained_count = COALESCE(allegation_counts.sustained_count, 0),
+                unsustained_count = COALESCE(allegation_counts.unsustained_count, 0),
+                discipline_count = COALESCE(allegation_counts.discipline_count, 0),
+                honorable_mention_count = COALESCE(award_counts.honorable_mention_count, 0),
+                civilian_compliment_count = COALESCE(award_counts.civilian_compliment_count, 0),
+                major_award_count = COALESCE(award_counts.major_award_count, 0),
+                trr_count = COALESCE(trr_counts.trr_count, 0),
+                current_badge = current_badges.current_badge,
+                last_unit_id = last_units.last_unit_id,
+                current_salary = current_salaries.current_salary,
+                has_unique_name = unique_names.has_unique_name
+            FROM tmp_officer_unique_names AS unique_names
+            LEFT JOIN tmp_officer_allegation_counts AS allegation_counts
+                ON allegation_counts.officer_id = unique_names.officer_id
+            LEFT JOIN tmp_officer_award_counts AS award_counts
+                ON award_counts.officer_id = unique_names.officer_id
+            LEFT JOIN tmp_officer_trr_counts AS trr_counts
+                ON trr_counts.officer_id = unique_names.officer_id
+            LEFT JOIN tmp_officer_current_badges AS current_badges
+                ON current_badges.officer_id = unique_names.officer_id
+            LEFT JOIN tmp_officer_last_units AS last_units
+                ON last_units.officer_id = unique_names.officer_id
+            LEFT JOIN tmp_officer_current_salaries AS current_salaries
+                ON current_salaries.officer_id = unique_names.officer_id
+            WHERE officer.id = unique_names.officer_id
+        """)
+        timings['update officers'] = time.time() - start_time
+
+        for _, table_name, _, _ in phases:
+            cursor.execute(f'DROP TABLE IF EXISTS {table_name}')
+
+    for phase, seconds in timings.items():
+        logger.info(f'build_cached_columns {phase}: {seconds:.2f}s')
+    return timings
 
-def build_cached_yearly_percentiles():
-    percentile_groups = [
-        PERCENTILE_ALLEGATION_GROUP,
-        PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP,
-        PERCENTILE_TRR_GROUP
-    ]
-
-    def _not_retired(officer):
-        return not officer.resignation_date or officer.year <= officer.resignation_date.year
 
-    results = []
-    for yr in tqdm(range(MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR + 1), desc='Prepare percentile data'):
-        officers = officer_percentile.top_percentile(yr, percentile_groups=percentile_groups)
-        results.extend(filter(_not_retired, officers))
+def build_cached_yearly_percentiles():
+    years = range(MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR + 1)
+    version = officer_percentile.yearly_percentile_snapshot_version(years)
+    if OfficerYearlyPercentileSnapshot.objects.latest_version() == version:
+        return
+    results = officer_percentile.yearly_top_percentile(years)
 
-    cursor = connection.cursor()
-    cursor.execute(f'TRUNCATE TABLE {OfficerYearlyPercentile._meta.db_table}')
+    with transaction.atomic():
+        cursor = connection.cursor()
+        cursor.execute(f'TRUNCATE TABLE {OfficerYearlyPercentile._meta.db_table}')
 
-    OfficerYearlyPercentile.objects.bulk_create(
-        OfficerYearlyPercentile(
-            officer=result,
-            year=result.year,
-            percentile_trr=getattr(result, 'percentile_trr', None),
-            percentile_allegation=getattr(result, 'percentile_allegation', None),
-            percentile_allegation_civilian=getattr(result, 'percentile_allegation_civilian', None),
-            percentile_allegation_internal=getattr(result, 'percentile_allegation_internal', None),
-        ) for result in results
-    )
+        OfficerYearlyPercentile.objects.bulk_create(results)
+        OfficerYearlyPercentileSnapshot.objects.all().delete()
+        OfficerYearlyPercentileSnapshot.objects.create(version=version)
 
 
 def build_cached_percentiles():
     percentile_values = officer_percentile.latest_year_percentile()
 
     if percentile_values:
-        Officer.objects.all().update(
-            complaint_percentile=None,
-            civilian_allegation_percentile=None,
-            internal_allegation_percentile=None,
-            trr_percentile=None,
-            honorable_mention_percentile=None,
-        )
-
         data = [{
             'id': officer.officer_id,
             'complaint_percentile': getattr(officer, 'percentile_allegation', None),
@@ -170,10 +198,6 @@ def build_cached_percentiles():
             'honorable_mention_percentile'
         ]
 
-        cursor = connection.cursor()
-
-        batch_size = 100
-        for i in tqdm(range(0, len(data), batch_size)):
-            batch_data = data[i:i + batch_size]
-            update_command = build_bulk_update_sql(Officer._meta.db_table, 'id', update_fields, batch_data)
-            cursor.execute(update_command)
+        with transaction.atomic():
+            Officer.objects.all().update(**{field: None for field in update_fields})
+            bulk_update(Officer._meta.db_table, 'id', update_fields, data)
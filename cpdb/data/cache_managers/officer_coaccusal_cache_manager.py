@@ -0,0 +1,71 @@
+from django.db import connection, transaction
+from django.db.models import Q
+
+from data.models import Allegation, OfficerAllegation, OfficerCoaccusal
+
+SOURCE_MODELS = [Allegation, OfficerAllegation]
+TARGET_MODELS = [OfficerCoaccusal]
+
+
+def _officer_ids_updated_since(since):
+    crids = set(Allegation.objects.filter(updated_at__gt=since).values_list('crid', flat=True))
+    crids.update(
+        OfficerAllegation.objects.filter(
+            updated_at__gt=since, allegation_id__isnull=False
+        ).values_list('allegation_id', flat=True)
+    )
+    return set(
+        OfficerAllegation.objects.filter(
+            allegation_id__in=crids, officer_id__isnull=False
+        ).values_list('officer_id', flat=True)
+    )
+
+
+def cache_data(since=None, changes=None):
+    """
+    Rebuild the officer_coaccusal edges with a single self join of data_officerallegation.
+    With `since`, only the edges of officers in allegations changed after it are rebuilt. Officer allegations
+    deleted since then are not seen, unless another officer remains accused in the allegation.
+    With `changes` of an update manager, only the edges of the officers of changed officer allegations, removed
+    ones included, and of the officers accused in changed allegations are rebuilt.
+    """
+    officer_ids = None
+    if changes is not None:
+        officer_ids = list(changes.affected_officer_ids())
+    elif since is not None:
+        officer_ids = list(_officer_ids_updated_since(since))
+    if officer_ids is not None and not officer_ids:
+        return
+
+    officers_filter = ''
+    params = []
+    if officer_ids is not None:
+        officers_filter = 'AND (A.officer_id = ANY(%s) OR B.officer_id = ANY(%s))'
+        params = [officer_ids, officer_ids]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if officer_ids is None:
+            cursor.execute(f'TRUNCATE TABLE {OfficerCoaccusal._meta.db_table}')
+        else:
+            OfficerCoaccusal.objects.filter(
+                Q(officer_a_id__in=officer_ids) | Q(officer_b_id__in=officer_ids)
+            ).delete()
+
+        cursor.execute(f"""
+            INSERT INTO {OfficerCoaccusal._meta.db_table} (
+                officer_a_id, officer_b_id, coaccusal_count, civilian_coaccusal_count, officer_coaccusal_count,
+                first_incident_date, last_incident_date
+            )
+            SELECT A.officer_id, B.officer_id,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE allegation.is_officer_complaint IS FALSE),
+                COUNT(*) FILTER (WHERE allegation.is_officer_complaint IS TRUE),
+                MIN(allegation.incident_date),
+                MAX(allegation.incident_date)
+            FROM {OfficerAllegation._meta.db_table} AS A
+            INNER JOIN {OfficerAllegation._meta.db_table} AS B
+                ON A.allegation_id = B.allegation_id AND A.officer_id <> B.officer_id
+            INNER JOIN {Allegation._meta.db_table} AS allegation ON allegation.crid = A.allegation_id
+            WHERE TRUE {officers_filter}
+            GROUP BY A.officer_id, B.officer_id
+        """, params)
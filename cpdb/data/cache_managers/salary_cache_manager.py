@@ -5,18 +5,29 @@ from tqdm import tqdm
 from data.models import Salary
 
 
-def cache_data():
-    build_cached_rank_changes()
+SOURCE_MODELS = [Salary]
+TARGET_MODELS = [Salary]
 
 
-def build_cached_rank_changes():
-    salaries = Salary.objects.exclude(spp_date__isnull=True).order_by('officer_id', 'year')
+def cache_data(since=None):
+    officer_ids = None
+    if since is not None:
+        officer_ids = set(Salary.objects.filter(updated_at__gt=since).values_list('officer_id', flat=True))
+    build_cached_rank_changes(officer_ids)
+
+
+def build_cached_rank_changes(officer_ids=None):
+    all_salaries = Salary.objects.all()
+    if officer_ids is not None:
+        all_salaries = all_salaries.filter(officer_id__in=officer_ids)
+
+    salaries = all_salaries.exclude(spp_date__isnull=True).order_by('officer_id', 'year')
     rank_change_ids = [
         list(grouped_salaries)[0].id
         for _, grouped_salaries in groupby(salaries, key=attrgetter('officer_id', 'rank'))
     ]
 
-    Salary.objects.update(rank_changed=False)
+    all_salaries.update(rank_changed=False)
 
     batch_size = 100
     for i in tqdm(range(0, len(rank_change_ids), batch_size)):
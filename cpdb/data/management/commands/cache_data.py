@@ -1,11 +1,37 @@
 import time
 
+import iso8601
 from django.core.management import BaseCommand
 from data import cache_managers
+from pinboard import cache as pinboard_cache
 
 
 class Command(BaseCommand):
+    # DataChanges reported by an update manager, passed by update_data
+    stealth_options = ('changes',)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            choices=[cache_managers.manager_name(manager) for manager in cache_managers.managers],
+            help='Only run these cache managers, e.g. --only officer allegation'
+        )
+        parser.add_argument(
+            '--since',
+            type=iso8601.parse_date,
+            help='Only refresh cached data depending on rows updated after this ISO 8601 datetime'
+        )
+
     def handle(self, *args, **kwargs):
         start_time = time.time()
-        cache_managers.cache_all()
+        timings = cache_managers.cache_all(
+            only=kwargs.get('only'), since=kwargs.get('since'), changes=kwargs.get('changes')
+        )
+        pinboard_cache.invalidate()
+        for name, seconds in timings.items():
+            if seconds is None:
+                self.stdout.write(f'{name}: skipped, no source data changed')
+            else:
+                self.stdout.write(f'{name}: {seconds:.2f} seconds')
         self.stdout.write(f'Finished on --- {time.time() - start_time} seconds ---')
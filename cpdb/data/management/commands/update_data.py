@@ -40,6 +40,8 @@ class Command(BaseCommand):
 
             if update_manager:
                 update_manager.update_data(update_holding_table=update_holding_table)
+                # only the cached data depending on the changed rows is refreshed, all of it if not tracked
+                call_command('cache_data', changes=update_manager.changes)
             else:
                 raise CommandError(f"Model {model} not found in update managers.")
         else:
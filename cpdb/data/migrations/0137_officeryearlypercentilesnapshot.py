@@ -0,0 +1,21 @@
+# Generated by Django 2.2.10 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0136_add_allegation_categories'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfficerYearlyPercentileSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.10 on 2026-10-18 14:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0137_officeryearlypercentilesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfficerCoaccusal',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('coaccusal_count', models.IntegerField(default=0)),
+                ('civilian_coaccusal_count', models.IntegerField(default=0)),
+                ('officer_coaccusal_count', models.IntegerField(default=0)),
+                ('first_incident_date', models.DateTimeField(null=True)),
+                ('last_incident_date', models.DateTimeField(null=True)),
+                ('officer_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coaccusal_edges', to='data.Officer')),
+                ('officer_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='data.Officer')),
+            ],
+            options={
+                'unique_together': {('officer_a', 'officer_b')},
+            },
+        ),
+    ]
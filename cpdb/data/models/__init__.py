@@ -15,8 +15,9 @@ from .officer import Officer
 from .officer_alias import OfficerAlias
 from .officer_allegation import OfficerAllegation
 from .officer_badge_number import OfficerBadgeNumber
+from .officer_coaccusal import OfficerCoaccusal
 from .officer_history import OfficerHistory
-from .officer_yearly_percentile import OfficerYearlyPercentile
+from .officer_yearly_percentile import OfficerYearlyPercentile, OfficerYearlyPercentileSnapshot
 from .police_unit import PoliceUnit
 from .police_witness import PoliceWitness
 from .race_population import RacePopulation
@@ -41,8 +42,10 @@ __all__ = [
     'OfficerAlias',
     'OfficerAllegation',
     'OfficerBadgeNumber',
+    'OfficerCoaccusal',
     'OfficerHistory',
     'OfficerYearlyPercentile',
+    'OfficerYearlyPercentileSnapshot',
     'PoliceUnit',
     'PoliceWitness',
     'RacePopulation',
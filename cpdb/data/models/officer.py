@@ -6,7 +6,7 @@ import botocore
 from django.apps import apps
 from django.conf import settings
 from django.contrib.gis.db import models
-from django.db.models import Q, Count
+from django.db.models import Q, F
 from django.db.models.functions import ExtractYear
 from django.utils import timezone
 from django.utils.text import slugify
@@ -256,8 +256,8 @@ class Officer(TimeStampsModel, TaggableModel):
     @property
     def coaccusals(self):
         return Officer.objects.filter(
-            officerallegation__allegation__officerallegation__officer=self
-        ).distinct().exclude(id=self.id).annotate(coaccusal_count=Count('id')).order_by('-coaccusal_count')
+            coaccusal_edges__officer_b=self
+        ).annotate(coaccusal_count=F('coaccusal_edges__coaccusal_count')).order_by('-coaccusal_count')
 
     @property
     def rank_histories(self):
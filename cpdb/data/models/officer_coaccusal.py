@@ -0,0 +1,19 @@
+from django.contrib.gis.db import models
+
+
+class OfficerCoaccusal(models.Model):
+    '''
+    Officers accused in the same allegations, materialized by officer_coaccusal_cache_manager.
+    Every pair is stored in both directions, so the coaccusals of an officer are the rows of its officer_a.
+    Counts are numbers of officer allegation pairs, as the self join of data_officerallegation counts them.
+    '''
+    officer_a = models.ForeignKey('data.Officer', on_delete=models.CASCADE, related_name='coaccusal_edges')
+    officer_b = models.ForeignKey('data.Officer', on_delete=models.CASCADE, related_name='+')
+    coaccusal_count = models.IntegerField(default=0)
+    civilian_coaccusal_count = models.IntegerField(default=0)
+    officer_coaccusal_count = models.IntegerField(default=0)
+    first_incident_date = models.DateTimeField(null=True)
+    last_incident_date = models.DateTimeField(null=True)
+
+    class Meta:
+        unique_together = (('officer_a', 'officer_b'),)
@@ -13,3 +13,16 @@ class OfficerYearlyPercentile(models.Model):
         indexes = [
             models.Index(fields=['year']),
         ]
+
+
+class OfficerYearlyPercentileSnapshotManager(models.Manager):
+    def latest_version(self):
+        snapshot = self.order_by('-created_at').first()
+        return snapshot.version if snapshot else None
+
+
+class OfficerYearlyPercentileSnapshot(models.Model):
+    version = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = OfficerYearlyPercentileSnapshotManager()
@@ -1,27 +1,35 @@
+import hashlib
+import json
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 
 from django.contrib.gis.db import models
 from django.db.models import F, Q, IntegerField, Func
+from django.utils import timezone
 from django.utils.timezone import now, timedelta
 
 from tqdm import tqdm
+import numpy as np
 import pytz
 
-from data.models import Officer, Award
+from data.models import (
+    Officer, Award, Allegation, OfficerAllegation, OfficerYearlyPercentile, OfficerYearlyPercentileSnapshot
+)
 from data.constants import (
     ALLEGATION_MAX_DATETIME, ALLEGATION_MIN_DATETIME,
     INTERNAL_CIVILIAN_ALLEGATION_MAX_DATETIME, INTERNAL_CIVILIAN_ALLEGATION_MIN_DATETIME,
     TRR_MAX_DATETIME, TRR_MIN_DATETIME,
     PERCENTILE_GROUPS, PERCENTILE_ALLEGATION_GROUP, PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP, PERCENTILE_TRR_GROUP,
-    PERCENTILE_HONORABLE_MENTION_GROUP
+    PERCENTILE_HONORABLE_MENTION_GROUP, VISUAL_TOKEN_PERCENTILE_GROUPS
 )
-from data.utils.percentile import percentile, merge_metric
+from data.utils.percentile import percentile, merge_metric, percentile_ranks
 from data.utils.round import Round
+from trr.models import TRR
 
 
 def latest_year_percentile(percentile_groups=PERCENTILE_GROUPS):
     dates = [date for percentile_group in percentile_groups
-             for date in PERCENTILE_MAP[percentile_group]['range']]
+             for date in get_percentile_map()[percentile_group]['range']]
     min_year = min(dates).year
     max_year = max(dates).year
 
@@ -55,7 +63,7 @@ def top_percentile(year=now().year, percentile_groups=PERCENTILE_GROUPS):
         raise ValueError("percentile_group is invalid")
     computed_data = []
     for percentile_group in percentile_groups:
-        percentile_types = PERCENTILE_MAP[percentile_group]['percentile_funcs'].keys()
+        percentile_types = get_percentile_map()[percentile_group]['percentile_funcs'].keys()
         new_data = _compute_metric(year, percentile_group)
         computed_data = merge_metric(computed_data, new_data, percentile_types)
         for percentile_type in percentile_types:
@@ -177,11 +185,27 @@ def create_percentile_map():
     }
 
 
-PERCENTILE_MAP = create_percentile_map()
+_percentile_map = None
+
+
+def get_percentile_map():
+    """
+    Build the percentile map on first use rather than at import time, the honorable mention range needs a
+    database query. The result is memoized until invalidate_percentile_map() is called.
+    """
+    global _percentile_map
+    if _percentile_map is None:
+        _percentile_map = create_percentile_map()
+    return _percentile_map
+
+
+def invalidate_percentile_map():
+    global _percentile_map
+    _percentile_map = None
 
 
 def _compute_metric(year_end, percentile_group):
-    data_range = PERCENTILE_MAP[percentile_group]['range']
+    data_range = get_percentile_map()[percentile_group]['range']
     if not data_range:
         return Officer.objects.none()
 
@@ -194,7 +218,7 @@ def _compute_metric(year_end, percentile_group):
     query = _officer_service_year(min_datetime.date(), max_datetime.date())
     query = query.annotate(year=models.Value(year_end, output_field=IntegerField()))
 
-    func_map = PERCENTILE_MAP[percentile_group]['percentile_funcs']
+    func_map = get_percentile_map()[percentile_group]['percentile_funcs']
     for metric, func in func_map.items():
         num_key = f'num_{metric}'
         metric_key = f'metric_{metric}'
@@ -237,3 +261,232 @@ def _officer_service_year(min_date, max_date):
             )  # in order to easy to test and calculate, we only get 4 decimal points
         )
     )
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
+_FOUR_DECIMAL_PLACES = Decimal('0.0001')
+_NO_DATE = np.iinfo(np.int64).max
+
+
+def _to_microseconds(value):
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _to_local_date(value):
+    # same conversion Django applies to both sides of a `__date` lookup
+    return timezone.make_naive(value, timezone.get_default_timezone()).date()
+
+
+def _round_numeric(value):
+    # Postgres ROUND(numeric, 4) rounds half away from zero
+    return value.quantize(_FOUR_DECIMAL_PLACES, rounding=ROUND_HALF_UP)
+
+
+def _allegation_events():
+    return OfficerAllegation.objects.filter(
+        officer_id__isnull=False,
+        allegation__incident_date__isnull=False
+    ).values_list('officer_id', 'allegation__incident_date', 'allegation__is_officer_complaint')
+
+
+def _trr_events():
+    return TRR.objects.filter(
+        officer_id__isnull=False,
+        trr_datetime__isnull=False
+    ).values_list('officer_id', 'trr_datetime')
+
+
+def _datetime_bounds(min_datetime, max_datetimes):
+    return _to_microseconds(min_datetime), [_to_microseconds(value) for value in max_datetimes]
+
+
+def _date_bounds(min_datetime, max_datetimes):
+    return (
+        _to_local_date(min_datetime).toordinal(),
+        [_to_local_date(value).toordinal() for value in max_datetimes]
+    )
+
+
+def _load_yearly_events(metrics):
+    """
+    Fetch every event needed by `metrics` once.
+    :return: dict of metric -> (officer_ids, keys, bounds function), keys being comparable with the bounds
+    """
+    events = dict()
+
+    if {'allegation', 'allegation_civilian', 'allegation_internal'} & set(metrics):
+        allegations = list(_allegation_events())
+        officer_ids = np.array([row[0] for row in allegations], dtype=np.int64)
+        keys = np.array([_to_microseconds(row[1]) for row in allegations], dtype=np.int64)
+        is_officer_complaint = np.array([row[2] for row in allegations], dtype=bool)
+        events['allegation'] = (officer_ids, keys, _datetime_bounds)
+        events['allegation_civilian'] = (
+            officer_ids[~is_officer_complaint], keys[~is_officer_complaint], _datetime_bounds
+        )
+        events['allegation_internal'] = (
+            officer_ids[is_officer_complaint], keys[is_officer_complaint], _datetime_bounds
+        )
+
+    if 'trr' in metrics:
+        trrs = list(_trr_events())
+        events['trr'] = (
+            np.array([row[0] for row in trrs], dtype=np.int64),
+            np.array([_to_local_date(row[1]).toordinal() for row in trrs], dtype=np.int64),
+            _date_bounds
+        )
+
+    return events
+
+
+def _cumulative_counts(officer_indexes, keys, lower_bound, upper_bounds, officer_count):
+    """
+    Count events per officer and per year where lower_bound <= key <= upper_bounds[year].
+    Upper bounds never decrease with the year, so every event is bucketed into the first year it
+    belongs to and the yearly counts are a cumulative sum over those buckets.
+    """
+    year_count = len(upper_bounds)
+    in_range = keys >= lower_bound
+    first_years = np.searchsorted(np.array(upper_bounds, dtype=np.int64), keys[in_range], side='left')
+    buckets = np.zeros((officer_count, year_count + 1), dtype=np.int64)
+    np.add.at(buckets, (officer_indexes[in_range], first_years), 1)
+    return np.cumsum(buckets, axis=1)[:, :year_count]
+
+
+def yearly_top_percentile(years, percentile_groups=VISUAL_TOKEN_PERCENTILE_GROUPS):
+    """
+    Single pass equivalent of calling `top_percentile(year, percentile_groups)` for every year.
+    Officer and event dates are fetched once, event counts of every year are cumulative sums and
+    each (year, metric) is ranked with the vectorized percentile engine.
+    :return: list of unsaved OfficerYearlyPercentile, ordered by year and officer id, excluding years
+    after officer resignation
+    """
+    if any(group not in VISUAL_TOKEN_PERCENTILE_GROUPS for group in percentile_groups):
+        raise ValueError("percentile_group is invalid")
+
+    years = sorted(years)
+    officers = sorted(Officer.objects.filter(appointed_date__isnull=False).values_list(
+        'id', 'appointed_date', 'resignation_date'
+    ))
+    officer_ids = np.array([officer[0] for officer in officers], dtype=np.int64)
+    appointed_dates = np.array([officer[1].toordinal() for officer in officers], dtype=np.int64)
+    resignation_dates = np.array(
+        [officer[2].toordinal() if officer[2] else _NO_DATE for officer in officers], dtype=np.int64
+    )
+    resignation_years = [officer[2].year if officer[2] else None for officer in officers]
+
+    percentile_map = get_percentile_map()
+    metrics = [
+        metric
+        for percentile_group in percentile_groups
+        for metric in percentile_map[percentile_group]['percentile_funcs'].keys()
+    ]
+    events = _load_yearly_events(metrics)
+
+    service_year_cache = dict()
+    metric_cache = dict()
+
+    def _service_year(days):
+        if days not in service_year_cache:
+            service_year_cache[days] = _round_numeric(Decimal('%.15g' % (days / 365.0)))
+        return service_year_cache[days]
+
+    def _metric(count, days):
+        if (count, days) not in metric_cache:
+            metric_cache[(count, days)] = float(_round_numeric(Decimal(count) / _service_year(days)))
+        return metric_cache[(count, days)]
+
+    yearly_results = [dict() for _ in years]
+    for percentile_group in percentile_groups:
+        data_range = percentile_map[percentile_group]['range']
+        if not data_range:
+            continue
+        min_datetime, max_datetime = data_range
+        max_datetimes = [min(max_datetime, datetime(year, 12, 31, tzinfo=pytz.utc)) for year in years]
+
+        group_counts = dict()
+        for metric in percentile_map[percentile_group]['percentile_funcs'].keys():
+            event_officer_ids, keys, bounds = events[metric]
+            officer_indexes = np.searchsorted(officer_ids, event_officer_ids)
+            known = officer_indexes < len(officer_ids)
+            known[known] = officer_ids[officer_indexes[known]] == event_officer_ids[known]
+            lower_bound, upper_bounds = bounds(min_datetime, max_datetimes)
+            group_counts[metric] = _cumulative_counts(
+                officer_indexes[known], keys[known], lower_bound, upper_bounds, len(officer_ids)
+            )
+
+        min_date = min_datetime.date().toordinal()
+        for year_index, year_max_datetime in enumerate(max_datetimes):
+            if min_datetime + timedelta(days=365) > year_max_datetime:
+                continue
+            max_date = year_max_datetime.date().toordinal()
+            end_dates = np.where(resignation_dates < max_date, resignation_dates, max_date)
+            start_dates = np.maximum(appointed_dates, min_date)
+            in_service = np.nonzero(end_dates >= start_dates + 365)[0]
+            if not len(in_service):
+                continue
+            service_days = (end_dates - start_dates)[in_service].tolist()
+
+            year_result = yearly_results[year_index]
+            for metric, counts in group_counts.items():
+                values = [
+                    _metric(count, days)
+                    for count, days in zip(counts[in_service, year_index].tolist(), service_days)
+                ]
+                ranks = percentile_ranks(values, decimal_places=4).tolist()
+                for officer_index, rank in zip(in_service.tolist(), ranks):
+                    year_result.setdefault(officer_index, dict())[f'percentile_{metric}'] = rank
+
+    results = []
+    for year, year_result in zip(years, yearly_results):
+        for officer_index in sorted(year_result.keys()):
+            resignation_year = resignation_years[officer_index]
+            if resignation_year and year > resignation_year:
+                continue
+            results.append(OfficerYearlyPercentile(
+                officer_id=int(officer_ids[officer_index]),
+                year=year,
+                **year_result[officer_index]
+            ))
+    return results
+
+
+YEARLY_PERCENTILE_SNAPSHOT_FORMAT = 1
+
+
+def yearly_percentile_snapshot_version(years):
+    """
+    Fingerprint of everything persisted yearly percentiles depend on: the computation format, the year and
+    dataset ranges and the row count and last update of every source table.
+    A persisted snapshot is stale as soon as this value differs from the version it was saved with.
+    """
+    years = sorted(years)
+    parts = [
+        YEARLY_PERCENTILE_SNAPSHOT_FORMAT,
+        years[0] if years else None,
+        years[-1] if years else None,
+        [get_percentile_map()[group]['range'] for group in VISUAL_TOKEN_PERCENTILE_GROUPS],
+    ]
+    for model in [Officer, Allegation, OfficerAllegation, TRR]:
+        parts.append(model.objects.aggregate(count=models.Count('pk'), updated_at=models.Max('updated_at')))
+    return hashlib.sha1(json.dumps(parts, default=str, sort_keys=True).encode()).hexdigest()
+
+
+def load_yearly_top_percentile(years, officer_ids=None):
+    """
+    Read yearly percentiles persisted by `cache_data` when the snapshot is still fresh,
+    otherwise compute them with `yearly_top_percentile`.
+    Percentiles are always ranked among all officers, `officer_ids` only restricts the returned rows.
+    """
+    years = sorted(years)
+    if OfficerYearlyPercentileSnapshot.objects.latest_version() == yearly_percentile_snapshot_version(years):
+        queryset = OfficerYearlyPercentile.objects.filter(year__in=years)
+        if officer_ids is not None:
+            queryset = queryset.filter(officer_id__in=officer_ids)
+        return list(queryset.order_by('year', 'officer_id'))
+    yearly_percentiles = yearly_top_percentile(years)
+    if officer_ids is None:
+        return yearly_percentiles
+    officer_ids = set(officer_ids)
+    return [
+        yearly_percentile for yearly_percentile in yearly_percentiles if yearly_percentile.officer_id in officer_ids
+    ]
@@ -10,6 +10,8 @@ from data.factories import (
     OfficerAllegationFactory,
     AllegationCategoryFactory
 )
+from data.models import OfficerAllegation
+from data.update_managers.changes import DataChanges
 
 
 class AllegationCacheManagerTestCase(TestCase):
@@ -24,6 +26,19 @@ class AllegationCacheManagerTestCase(TestCase):
         expect(allegation_1.coaccused_count).to.eq(6)
         expect(allegation_2.coaccused_count).to.eq(0)
 
+    def test_coaccused_count_of_changes(self):
+        allegation_1 = AllegationFactory(crid='1')
+        allegation_2 = AllegationFactory(crid='2')
+        OfficerAllegationFactory.create_batch(2, allegation=allegation_1)
+        OfficerAllegationFactory.create_batch(3, allegation=allegation_2)
+
+        allegation_cache_manager.cache_data(changes=DataChanges(OfficerAllegation, crids=['1']))
+        allegation_1.refresh_from_db()
+        allegation_2.refresh_from_db()
+
+        expect(allegation_1.coaccused_count).to.eq(2)
+        expect(allegation_2.coaccused_count).to.eq(0)
+
     def test_most_common_category(self):
         allegation = AllegationFactory()
         category1, category2 = AllegationCategoryFactory.create_batch(2)
@@ -1,29 +1,131 @@
+from datetime import datetime
+
+import pytz
 from django.test.testcases import TestCase
 
 from mock import patch
 from robber import expect
+from freezegun import freeze_time
 
 from data import cache_managers
+from data.factories import SalaryFactory
+from data.models import OfficerAllegation, Salary, Victim
+from data.update_managers.changes import DataChanges
 
 
 class CacheManagersTestCase(TestCase):
     @patch('data.cache_managers.allegation_cache_manager.cache_data')
     @patch('data.cache_managers.officer_cache_manager.cache_data')
     @patch('data.cache_managers.salary_cache_manager.cache_data')
+    @patch('data.cache_managers.officer_coaccusal_cache_manager.cache_data')
     @patch('activity_grid.cache_managers.activity_pair_card_cache_manager.cache_data')
     @patch('lawsuit.cache_managers.lawsuit_cache_manager.cache_data')
     def test_cache_all(
         self,
+        lawsuit_cache_mock,
+        activity_pair_card_cache_mock,
+        officer_coaccusal_cache_mock,
         salary_cache_mock,
         officer_cache_mock,
-        allegation_cache_mock,
-        activity_pair_card_cache_mock,
-        lawsuit_cache_mock
+        allegation_cache_mock
     ):
-        cache_managers.cache_all()
+        timings = cache_managers.cache_all()
         expect(salary_cache_mock).to.be.called_once()
         expect(officer_cache_mock).to.be.called_once()
         expect(allegation_cache_mock).to.be.called_once()
+        expect(officer_coaccusal_cache_mock).to.be.called_once()
         expect(activity_pair_card_cache_mock).to.be.called_once()
         expect(lawsuit_cache_mock).to.be.called_once()
-        expect(len(cache_managers.managers)).to.eq(5)
+        expect(len(cache_managers.managers)).to.eq(6)
+        expect(list(timings.keys())).to.eq([
+            'allegation', 'officer', 'salary', 'officer_coaccusal', 'activity_pair_card', 'lawsuit'
+        ])
+
+    @patch('data.cache_managers.allegation_cache_manager.cache_data')
+    @patch('data.cache_managers.officer_cache_manager.cache_data')
+    @patch('data.cache_managers.salary_cache_manager.cache_data')
+    def test_cache_all_only(self, salary_cache_mock, officer_cache_mock, allegation_cache_mock):
+        timings = cache_managers.cache_all(only=['officer', 'salary'])
+
+        expect(officer_cache_mock).to.be.called_once()
+        expect(salary_cache_mock).to.be.called_once()
+        expect(allegation_cache_mock).not_to.be.called()
+        expect(list(timings.keys())).to.eq(['officer', 'salary'])
+
+    @patch('data.cache_managers.allegation_cache_manager.cache_data')
+    @patch('data.cache_managers.officer_cache_manager.cache_data')
+    @patch('data.cache_managers.salary_cache_manager.cache_data')
+    @patch('data.cache_managers.officer_coaccusal_cache_manager.cache_data')
+    @patch('activity_grid.cache_managers.activity_pair_card_cache_manager.cache_data')
+    @patch('lawsuit.cache_managers.lawsuit_cache_manager.cache_data')
+    def test_cache_all_since(
+        self,
+        lawsuit_cache_mock,
+        activity_pair_card_cache_mock,
+        officer_coaccusal_cache_mock,
+        salary_cache_mock,
+        officer_cache_mock,
+        allegation_cache_mock
+    ):
+        with freeze_time('2020-01-01 00:00:00'):
+            SalaryFactory()
+        since = datetime(2019, 12, 31, tzinfo=pytz.utc)
+
+        timings = cache_managers.cache_all(since=since)
+
+        salary_cache_mock.assert_called_once_with(since=since)
+        officer_cache_mock.assert_called_once_with(since=since)
+        expect(allegation_cache_mock).not_to.be.called()
+        expect(officer_coaccusal_cache_mock).not_to.be.called()
+        expect(activity_pair_card_cache_mock).not_to.be.called()
+        expect(lawsuit_cache_mock).not_to.be.called()
+        expect(timings['allegation']).to.be.none()
+        expect(timings['activity_pair_card']).to.be.none()
+        expect(timings['lawsuit']).to.be.none()
+        expect(timings['salary']).not_to.be.none()
+
+    @patch('data.cache_managers.allegation_cache_manager.cache_data')
+    @patch('data.cache_managers.officer_cache_manager.cache_data')
+    @patch('data.cache_managers.salary_cache_manager.cache_data')
+    @patch('data.cache_managers.officer_coaccusal_cache_manager.cache_data')
+    @patch('activity_grid.cache_managers.activity_pair_card_cache_manager.cache_data')
+    @patch('lawsuit.cache_managers.lawsuit_cache_manager.cache_data')
+    def test_cache_all_changes(
+        self,
+        lawsuit_cache_mock,
+        activity_pair_card_cache_mock,
+        officer_coaccusal_cache_mock,
+        salary_cache_mock,
+        officer_cache_mock,
+        allegation_cache_mock
+    ):
+        changes = DataChanges(Salary, officer_ids=[1])
+
+        timings = cache_managers.cache_all(changes=changes)
+
+        salary_cache_mock.assert_called_once_with()
+        officer_cache_mock.assert_called_once_with(changes=changes)
+        expect(allegation_cache_mock).not_to.be.called()
+        expect(officer_coaccusal_cache_mock).not_to.be.called()
+        expect(activity_pair_card_cache_mock).not_to.be.called()
+        expect(lawsuit_cache_mock).not_to.be.called()
+        expect(timings['allegation']).to.be.none()
+        expect(timings['officer']).not_to.be.none()
+        expect(timings['salary']).not_to.be.none()
+
+    @patch('data.cache_managers.allegation_cache_manager.cache_data')
+    @patch('data.cache_managers.officer_cache_manager.cache_data')
+    @patch('data.cache_managers.officer_coaccusal_cache_manager.cache_data')
+    def test_cache_all_skip_empty_or_unrelated_changes(
+        self,
+        officer_coaccusal_cache_mock,
+        officer_cache_mock,
+        allegation_cache_mock
+    ):
+        timings = cache_managers.cache_all(changes=DataChanges(OfficerAllegation))
+        timings.update(cache_managers.cache_all(changes=DataChanges(Victim, crids=['1'])))
+
+        expect(allegation_cache_mock).not_to.be.called()
+        expect(officer_cache_mock).not_to.be.called()
+        expect(officer_coaccusal_cache_mock).not_to.be.called()
+        expect(set(timings.values())).to.eq({None})
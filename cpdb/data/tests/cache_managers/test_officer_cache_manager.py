@@ -17,8 +17,10 @@ from data.factories import (
     OfficerAllegationFactory,
     SalaryFactory
 )
+from data import officer_percentile
 from data.cache_managers import officer_cache_manager
-from data.models import Officer
+from data.constants import MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR
+from data.models import Officer, OfficerYearlyPercentile, OfficerYearlyPercentileSnapshot
 from shared.tests.utils import create_object
 from trr.factories import TRRFactory
 
@@ -198,6 +200,70 @@ class OfficerCacheManagerTestCase(TestCase):
         expect(officer_4.has_unique_name).to.be.true()
         expect(officer_5.has_unique_name).to.be.true()
 
+    def test_build_cached_columns_resets_stale_values(self):
+        officer = OfficerFactory(
+            allegation_count=3,
+            trr_count=2,
+            current_badge='123',
+            current_salary=1000,
+        )
+
+        officer_cache_manager.build_cached_columns()
+        officer.refresh_from_db()
+
+        expect(officer.allegation_count).to.eq(0)
+        expect(officer.trr_count).to.eq(0)
+        expect(officer.current_badge).to.be.none()
+        expect(officer.current_salary).to.be.none()
+
+    def test_build_cached_columns_officer_ids(self):
+        officer_1 = OfficerFactory(first_name='Jerome', last_name='Finnigan', has_unique_name=True)
+        officer_2 = OfficerFactory(first_name='Jerome', last_name='Finnigan', has_unique_name=True)
+        officer_3 = OfficerFactory(first_name='German', last_name='Piwinicki', has_unique_name=False)
+        OfficerAllegationFactory.create_batch(2, officer=officer_1)
+        OfficerAllegationFactory.create_batch(3, officer=officer_3)
+
+        officer_cache_manager.build_cached_columns(officer_ids=[officer_1.id])
+        officer_1.refresh_from_db()
+        officer_2.refresh_from_db()
+        officer_3.refresh_from_db()
+
+        expect(officer_1.allegation_count).to.eq(2)
+        expect(officer_1.has_unique_name).to.be.false()
+        expect(officer_2.has_unique_name).to.be.false()
+        expect(officer_3.has_unique_name).to.be.true()
+        expect(officer_3.allegation_count).to.eq(3)
+
+    def test_build_cached_columns_officer_ids_leave_other_officers(self):
+        officer_1 = OfficerFactory(first_name='Jerome', last_name='Finnigan')
+        officer_2 = OfficerFactory(first_name='German', last_name='Piwinicki')
+        officer_cache_manager.build_cached_columns()
+        OfficerAllegationFactory(officer=officer_1)
+        OfficerAllegationFactory(officer=officer_2)
+
+        officer_cache_manager.build_cached_columns(officer_ids=[officer_1.id])
+        officer_1.refresh_from_db()
+        officer_2.refresh_from_db()
+
+        expect(officer_1.allegation_count).to.eq(1)
+        expect(officer_2.allegation_count).to.eq(0)
+
+    def test_build_cached_columns_timings(self):
+        OfficerFactory()
+
+        timings = officer_cache_manager.build_cached_columns()
+
+        expect(list(timings.keys())).to.eq([
+            'unique names',
+            'allegation counts',
+            'award counts',
+            'trr counts',
+            'current badges',
+            'last units',
+            'current salaries',
+            'update officers',
+        ])
+
     @patch(
         'data.cache_managers.officer_cache_manager.officer_percentile.latest_year_percentile',
         Mock(return_value=[
@@ -271,6 +337,44 @@ class OfficerCacheManagerTestCase(TestCase):
         expect(officer_4.trr_percentile).to.eq(Decimal('66.6667'))
         expect(officer_4.honorable_mention_percentile).to.be.none()
 
+    def test_build_cached_yearly_percentiles(self):
+        OfficerFactory(id=1)
+        OfficerFactory(id=2)
+        OfficerYearlyPercentile.objects.create(officer_id=2, year=2010, percentile_trr=1)
+
+        with patch(
+            'data.cache_managers.officer_cache_manager.officer_percentile.yearly_top_percentile',
+            return_value=[
+                OfficerYearlyPercentile(officer_id=1, year=2015, percentile_allegation=66.6667, percentile_trr=0.0),
+                OfficerYearlyPercentile(officer_id=2, year=2015, percentile_allegation=33.3333),
+            ]
+        ):
+            officer_cache_manager.build_cached_yearly_percentiles()
+
+        rows = OfficerYearlyPercentile.objects.order_by('officer_id').values(
+            'officer_id', 'year', 'percentile_allegation', 'percentile_trr'
+        )
+        expect(list(rows)).to.eq([
+            {
+                'officer_id': 1,
+                'year': 2015,
+                'percentile_allegation': Decimal('66.6667'),
+                'percentile_trr': Decimal('0')
+            },
+            {
+                'officer_id': 2,
+                'year': 2015,
+                'percentile_allegation': Decimal('33.3333'),
+                'percentile_trr': None
+            },
+        ])
+        expect(OfficerYearlyPercentileSnapshot.objects.count()).to.eq(1)
+        expect(OfficerYearlyPercentileSnapshot.objects.latest_version()).to.eq(
+            officer_percentile.yearly_percentile_snapshot_version(
+                range(MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR + 1)
+            )
+        )
+
     # @override_settings(
     #     ALLEGATION_MIN='1988-01-01',
     #     ALLEGATION_MAX='2016-07-01',
@@ -0,0 +1,112 @@
+from datetime import datetime
+
+import pytz
+from django.test.testcases import TestCase
+
+from freezegun import freeze_time
+from robber import expect
+
+from data.cache_managers import officer_coaccusal_cache_manager
+from data.factories import AllegationFactory, OfficerAllegationFactory, OfficerFactory
+from data.models import OfficerAllegation, OfficerCoaccusal
+from data.update_managers.changes import DataChanges
+
+
+class OfficerCoaccusalCacheManagerTestCase(TestCase):
+    def test_cache_data(self):
+        officer_1 = OfficerFactory(id=1)
+        officer_2 = OfficerFactory(id=2)
+        officer_3 = OfficerFactory(id=3)
+        allegation_1 = AllegationFactory(
+            crid='1', is_officer_complaint=False, incident_date=datetime(2005, 12, 31, tzinfo=pytz.utc)
+        )
+        allegation_2 = AllegationFactory(
+            crid='2', is_officer_complaint=True, incident_date=datetime(2007, 12, 31, tzinfo=pytz.utc)
+        )
+        allegation_3 = AllegationFactory(crid='3', is_officer_complaint=False, incident_date=None)
+        OfficerAllegationFactory(officer=officer_1, allegation=allegation_1)
+        OfficerAllegationFactory(officer=officer_2, allegation=allegation_1)
+        OfficerAllegationFactory(officer=officer_3, allegation=allegation_1)
+        OfficerAllegationFactory(officer=officer_1, allegation=allegation_2)
+        OfficerAllegationFactory(officer=officer_2, allegation=allegation_2)
+        OfficerAllegationFactory(officer=officer_1, allegation=allegation_3)
+        OfficerAllegationFactory(officer=officer_2, allegation=allegation_3)
+        OfficerAllegationFactory(officer=officer_3, allegation=AllegationFactory())
+        OfficerAllegationFactory(officer=None, allegation=allegation_1)
+
+        officer_coaccusal_cache_manager.cache_data()
+
+        expect(OfficerCoaccusal.objects.count()).to.eq(6)
+        edge = OfficerCoaccusal.objects.get(officer_a=officer_1, officer_b=officer_2)
+        expect(edge.coaccusal_count).to.eq(3)
+        expect(edge.civilian_coaccusal_count).to.eq(2)
+        expect(edge.officer_coaccusal_count).to.eq(1)
+        expect(edge.first_incident_date).to.eq(datetime(2005, 12, 31, tzinfo=pytz.utc))
+        expect(edge.last_incident_date).to.eq(datetime(2007, 12, 31, tzinfo=pytz.utc))
+
+        reversed_edge = OfficerCoaccusal.objects.get(officer_a=officer_2, officer_b=officer_1)
+        expect(reversed_edge.coaccusal_count).to.eq(3)
+
+        edge = OfficerCoaccusal.objects.get(officer_a=officer_3, officer_b=officer_1)
+        expect(edge.coaccusal_count).to.eq(1)
+        expect(edge.civilian_coaccusal_count).to.eq(1)
+        expect(edge.officer_coaccusal_count).to.eq(0)
+
+    def test_cache_data_rebuild_all_edges(self):
+        officer_1 = OfficerFactory()
+        officer_2 = OfficerFactory()
+        allegation = AllegationFactory()
+        OfficerAllegationFactory(officer=officer_1, allegation=allegation)
+        officer_allegation = OfficerAllegationFactory(officer=officer_2, allegation=allegation)
+        officer_coaccusal_cache_manager.cache_data()
+        expect(OfficerCoaccusal.objects.count()).to.eq(2)
+
+        officer_allegation.delete()
+        officer_coaccusal_cache_manager.cache_data()
+        expect(OfficerCoaccusal.objects.count()).to.eq(0)
+
+    def test_cache_data_since(self):
+        officer_1 = OfficerFactory(id=1)
+        officer_2 = OfficerFactory(id=2)
+        officer_3 = OfficerFactory(id=3)
+        officer_4 = OfficerFactory(id=4)
+        with freeze_time('2019-01-01 00:00:00'):
+            old_allegation = AllegationFactory(crid='1')
+            OfficerAllegationFactory(officer=officer_1, allegation=old_allegation)
+            OfficerAllegationFactory(officer=officer_2, allegation=old_allegation)
+            OfficerAllegationFactory(officer=officer_3, allegation=old_allegation)
+            OfficerAllegationFactory(officer=officer_4, allegation=old_allegation)
+        officer_coaccusal_cache_manager.cache_data()
+        OfficerCoaccusal.objects.filter(officer_a_id__in=[3, 4], officer_b_id__in=[3, 4]).update(coaccusal_count=99)
+
+        with freeze_time('2020-01-01 00:00:00'):
+            new_allegation = AllegationFactory(crid='2')
+            OfficerAllegationFactory(officer=officer_1, allegation=new_allegation)
+            OfficerAllegationFactory(officer=officer_2, allegation=new_allegation)
+
+        officer_coaccusal_cache_manager.cache_data(since=datetime(2019, 6, 1, tzinfo=pytz.utc))
+
+        expect(OfficerCoaccusal.objects.get(officer_a=officer_1, officer_b=officer_2).coaccusal_count).to.eq(2)
+        expect(OfficerCoaccusal.objects.get(officer_a=officer_2, officer_b=officer_1).coaccusal_count).to.eq(2)
+        expect(OfficerCoaccusal.objects.get(officer_a=officer_1, officer_b=officer_3).coaccusal_count).to.eq(1)
+        expect(OfficerCoaccusal.objects.get(officer_a=officer_3, officer_b=officer_4).coaccusal_count).to.eq(99)
+        expect(OfficerCoaccusal.objects.count()).to.eq(12)
+
+    def test_cache_data_changes_with_removed_officer_allegation(self):
+        allegation = AllegationFactory(crid='1')
+        for officer_id in [1, 2, 3]:
+            OfficerAllegationFactory(officer=OfficerFactory(id=officer_id), allegation=allegation)
+        other_allegation = AllegationFactory(crid='2')
+        OfficerAllegationFactory(officer=OfficerFactory(id=4), allegation=other_allegation)
+        OfficerAllegationFactory(officer=OfficerFactory(id=5), allegation=other_allegation)
+        officer_coaccusal_cache_manager.cache_data()
+
+        OfficerAllegation.objects.filter(officer_id=3).delete()
+        OfficerCoaccusal.objects.filter(officer_a_id=4).update(coaccusal_count=9)
+        officer_coaccusal_cache_manager.cache_data(
+            changes=DataChanges(OfficerAllegation, officer_ids=[3], crids=['1'])
+        )
+
+        expect(set(OfficerCoaccusal.objects.values_list('officer_a_id', 'officer_b_id', 'coaccusal_count'))).to.eq({
+            (1, 2, 1), (2, 1, 1), (4, 5, 9), (5, 4, 1)
+        })
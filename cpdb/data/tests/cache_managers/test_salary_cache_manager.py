@@ -1,8 +1,10 @@
-from datetime import date
+from datetime import date, datetime
 
+import pytz
 from django.test.testcases import TestCase
 
 from robber import expect
+from freezegun import freeze_time
 
 from data.cache_managers import salary_cache_manager
 from data.factories import (
@@ -42,3 +44,22 @@ class SalaryCacheManagerTestCase(TestCase):
             officer_1_salary_1.id, officer_1_salary_2.id, officer_2_salary_1.id, officer_2_salary_2.id
         }
         expect(rank_changed_salary_ids).to.eq(expected_rank_changed_salary_ids)
+
+    def test_cache_data_since(self):
+        officer_1 = OfficerFactory()
+        officer_2 = OfficerFactory()
+        with freeze_time('2019-01-01 00:00:00'):
+            officer_1_salary = SalaryFactory(
+                officer=officer_1, year=2005, rank='Police Officer', spp_date=date(2005, 1, 1),
+            )
+        with freeze_time('2020-01-01 00:00:00'):
+            officer_2_salary = SalaryFactory(
+                officer=officer_2, year=2005, rank='Police Officer', spp_date=date(2005, 1, 1),
+            )
+
+        salary_cache_manager.cache_data(since=datetime(2019, 6, 1, tzinfo=pytz.utc))
+
+        officer_1_salary.refresh_from_db()
+        officer_2_salary.refresh_from_db()
+        expect(officer_1_salary.rank_changed).to.be.false()
+        expect(officer_2_salary.rank_changed).to.be.true()
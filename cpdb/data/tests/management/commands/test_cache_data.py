@@ -1,12 +1,40 @@
+from datetime import datetime
+from collections import OrderedDict
+
+import pytz
 from django.test.testcases import TestCase
 from django.core.management import call_command
 
 from mock import patch
 from robber import expect
 
+from data.models import Salary
+from data.update_managers.changes import DataChanges
+
 
 class CacheDataTestCase(TestCase):
-    @patch('data.cache_managers.cache_all')
+    @patch('data.cache_managers.cache_all', return_value=OrderedDict())
     def test_cache(self, cache_all_mock):
         call_command('cache_data')
-        expect(cache_all_mock).to.be.called_once()
+        expect(cache_all_mock).to.be.called_once_with(only=None, since=None, changes=None)
+
+    @patch('data.cache_managers.cache_all', return_value=OrderedDict([('officer', 1.5), ('salary', None)]))
+    def test_cache_only_since(self, cache_all_mock):
+        call_command('cache_data', '--only', 'officer', 'salary', '--since', '2020-01-01T00:00:00Z')
+        expect(cache_all_mock).to.be.called_once_with(
+            only=['officer', 'salary'],
+            since=datetime(2020, 1, 1, tzinfo=pytz.utc),
+            changes=None
+        )
+
+    @patch('data.cache_managers.cache_all', return_value=OrderedDict())
+    def test_cache_changes(self, cache_all_mock):
+        changes = DataChanges(Salary, officer_ids=[1])
+        call_command('cache_data', changes=changes)
+        expect(cache_all_mock).to.be.called_once_with(only=None, since=None, changes=changes)
+
+    @patch('data.cache_managers.cache_all', return_value=OrderedDict())
+    @patch('pinboard.cache.invalidate')
+    def test_cache_invalidate_pinboard_cache(self, invalidate_mock, _):
+        call_command('cache_data')
+        expect(invalidate_mock).to.be.called_once()
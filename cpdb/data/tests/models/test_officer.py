@@ -15,6 +15,7 @@ from data.factories import (
     AttachmentFileFactory, InvestigatorFactory, InvestigatorAllegationFactory,
 )
 from data.models import Officer
+from data.cache_managers import officer_coaccusal_cache_manager
 
 
 class OfficerTestCase(TestCase):
@@ -302,6 +303,7 @@ class OfficerTestCase(TestCase):
         OfficerAllegationFactory(officer=officer1, allegation=allegation1)
         OfficerAllegationFactory(officer=officer2, allegation=allegation2)
 
+        officer_coaccusal_cache_manager.cache_data()
         coaccusals = list(officer0.coaccusals)
         expect(coaccusals).to.have.length(2)
         expect(coaccusals).to.contain(officer1)
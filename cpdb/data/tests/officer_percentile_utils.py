@@ -31,6 +31,6 @@ def mock_percentile_map_range(
     @patch('data.officer_percentile._get_award_dataset_range', Mock(return_value=honorable_mention_range))
     def annotation(func):
         new_percentile_map = officer_percentile.create_percentile_map()
-        return patch('data.officer_percentile.PERCENTILE_MAP', new_percentile_map)(func)
+        return patch('data.officer_percentile._percentile_map', new_percentile_map)(func)
 
     return annotation
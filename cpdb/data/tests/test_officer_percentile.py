@@ -4,16 +4,18 @@ import pytz
 from django.test.testcases import TestCase
 
 from robber.expect import expect
-from mock import patch
+from mock import patch, Mock
 from freezegun import freeze_time
 
 from data.constants import (
     PERCENTILE_ALLEGATION_GROUP,
     PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP,
     PERCENTILE_TRR_GROUP,
-    PERCENTILE_HONORABLE_MENTION_GROUP
+    PERCENTILE_HONORABLE_MENTION_GROUP,
+    VISUAL_TOKEN_PERCENTILE_GROUPS
 )
 from data.factories import OfficerFactory, OfficerAllegationFactory, AwardFactory
+from data.models import OfficerYearlyPercentile, OfficerYearlyPercentileSnapshot
 from data.tests.officer_percentile_utils import mock_percentile_map_range
 from shared.tests.utils import validate_object
 from trr.factories import TRRFactory
@@ -701,7 +703,7 @@ class OfficerPercentileTestCase(TestCase):
         }
 
         new_percentile_map = officer_percentile.create_percentile_map()
-        with patch('data.officer_percentile.PERCENTILE_MAP', new_percentile_map):
+        with patch('data.officer_percentile._percentile_map', new_percentile_map):
             honorable_mention_metric_2017 = officer_percentile._compute_metric(2017, PERCENTILE_HONORABLE_MENTION_GROUP)
 
             expect(honorable_mention_metric_2017.count()).to.eq(4)
@@ -727,7 +729,7 @@ class OfficerPercentileTestCase(TestCase):
 
         # expect officer2 to be excluded cause he service less than 1 year
         new_percentile_map = officer_percentile.create_percentile_map()
-        with patch('data.officer_percentile.PERCENTILE_MAP', new_percentile_map):
+        with patch('data.officer_percentile._percentile_map', new_percentile_map):
 
             honorable_mention_metric_2016 = officer_percentile._compute_metric(2016, PERCENTILE_HONORABLE_MENTION_GROUP)
             expect(honorable_mention_metric_2016.count()).to.eq(1)
@@ -758,6 +760,36 @@ class OfficerPercentileTestCase(TestCase):
         AwardFactory(officer=officer2, award_type='Honorable Mention', start_date=date(2017, 10, 19))
         AwardFactory(officer=officer2, award_type='Honorable Mention', start_date=date(2017, 10, 19))
 
+    def test_get_percentile_map_is_memoized(self):
+        award_dataset_range = Mock(return_value=[])
+        with patch('data.officer_percentile._percentile_map', None), \
+                patch('data.officer_percentile._get_award_dataset_range', award_dataset_range):
+            percentile_map = officer_percentile.get_percentile_map()
+
+            expect(officer_percentile.get_percentile_map() is percentile_map).to.be.true()
+            expect(award_dataset_range.call_count).to.eq(1)
+            expect(percentile_map[PERCENTILE_HONORABLE_MENTION_GROUP]['range']).to.eq([])
+
+    def test_invalidate_percentile_map(self):
+        award_dataset_range = Mock(return_value=[])
+        with patch('data.officer_percentile._percentile_map', None), \
+                patch('data.officer_percentile._get_award_dataset_range', award_dataset_range):
+            percentile_map = officer_percentile.get_percentile_map()
+
+            award_dataset_range.return_value = (
+                datetime(2013, 1, 1, tzinfo=pytz.utc),
+                datetime(2017, 10, 19, tzinfo=pytz.utc)
+            )
+            officer_percentile.invalidate_percentile_map()
+            new_percentile_map = officer_percentile.get_percentile_map()
+
+            expect(new_percentile_map is percentile_map).to.be.false()
+            expect(award_dataset_range.call_count).to.eq(2)
+            expect(new_percentile_map[PERCENTILE_HONORABLE_MENTION_GROUP]['range']).to.eq((
+                datetime(2013, 1, 1, tzinfo=pytz.utc),
+                datetime(2017, 10, 19, tzinfo=pytz.utc)
+            ))
+
     def test_get_award_dataset_range(self):
         expect(officer_percentile._get_award_dataset_range()).to.be.empty()
 
@@ -776,7 +808,7 @@ class OfficerPercentileTestCase(TestCase):
         OfficerFactory(id=4, appointed_date=date(2015, 1, 1))
 
         new_percentile_map = officer_percentile.create_percentile_map()
-        with patch('data.officer_percentile.PERCENTILE_MAP', new_percentile_map):
+        with patch('data.officer_percentile._percentile_map', new_percentile_map):
             # current year
             annotated_officers = officer_percentile.top_percentile(
                 percentile_groups=[PERCENTILE_HONORABLE_MENTION_GROUP])
@@ -966,3 +998,185 @@ class OfficerPercentileTestCase(TestCase):
         expect(officers).to.have.length(3)
         for officer in officers:
             validate_object(officer, expected_dict[officer.id])
+
+    def _top_percentile_rows(self, years):
+        rows = []
+        for year in years:
+            for officer in officer_percentile.top_percentile(year, percentile_groups=VISUAL_TOKEN_PERCENTILE_GROUPS):
+                if officer.resignation_date and year > officer.resignation_date.year:
+                    continue
+                rows.append((
+                    year,
+                    officer.id,
+                    getattr(officer, 'percentile_allegation', None),
+                    getattr(officer, 'percentile_allegation_civilian', None),
+                    getattr(officer, 'percentile_allegation_internal', None),
+                    getattr(officer, 'percentile_trr', None),
+                ))
+        return sorted(rows)
+
+    def _yearly_top_percentile_rows(self, years):
+        return [
+            (
+                row.year,
+                row.officer_id,
+                row.percentile_allegation,
+                row.percentile_allegation_civilian,
+                row.percentile_allegation_internal,
+                row.percentile_trr,
+            )
+            for row in officer_percentile.yearly_top_percentile(years)
+        ]
+
+    @mock_percentile_map_range(
+        allegation_min=datetime(2012, 1, 1, tzinfo=pytz.utc),
+        allegation_max=datetime(2016, 7, 1, tzinfo=pytz.utc),
+        internal_civilian_min=datetime(2013, 1, 1, tzinfo=pytz.utc),
+        internal_civilian_max=datetime(2016, 7, 1, tzinfo=pytz.utc),
+        trr_min=datetime(2013, 1, 1, tzinfo=pytz.utc),
+        trr_max=datetime(2016, 7, 1, tzinfo=pytz.utc)
+    )
+    def test_yearly_top_percentile_same_as_top_percentile(self):
+        officer1 = OfficerFactory(id=1, appointed_date=date(1990, 3, 14))
+        officer2 = OfficerFactory(id=2, appointed_date=date(2011, 6, 1), resignation_date=date(2014, 12, 31))
+        officer3 = OfficerFactory(id=3, appointed_date=date(2013, 2, 1))
+        officer4 = OfficerFactory(id=4, appointed_date=date(2000, 1, 1), resignation_date=date(2016, 2, 1))
+        OfficerFactory(id=5, appointed_date=date(2005, 1, 1))
+        OfficerFactory(id=6, appointed_date=None)
+
+        OfficerAllegationFactory.create_batch(
+            2,
+            officer=officer1,
+            allegation__incident_date=datetime(2012, 12, 31, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=False
+        )
+        OfficerAllegationFactory(
+            officer=officer1,
+            allegation__incident_date=datetime(2013, 12, 31, 5, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=True
+        )
+        OfficerAllegationFactory(
+            officer=officer2,
+            allegation__incident_date=datetime(2011, 12, 31, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=False
+        )
+        OfficerAllegationFactory.create_batch(
+            3,
+            officer=officer2,
+            allegation__incident_date=datetime(2014, 5, 2, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=True
+        )
+        OfficerAllegationFactory(
+            officer=officer3,
+            allegation__incident_date=datetime(2015, 7, 2, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=False
+        )
+        OfficerAllegationFactory(
+            officer=officer4,
+            allegation__incident_date=datetime(2016, 7, 2, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=False
+        )
+        OfficerAllegationFactory(
+            officer=officer4,
+            allegation__incident_date=datetime(2014, 1, 1, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=True
+        )
+
+        TRRFactory(officer=officer1, trr_datetime=datetime(2013, 1, 1, tzinfo=pytz.utc))
+        TRRFactory(officer=officer1, trr_datetime=datetime(2014, 12, 31, 3, tzinfo=pytz.utc))
+        TRRFactory.create_batch(2, officer=officer3, trr_datetime=datetime(2015, 3, 1, tzinfo=pytz.utc))
+        TRRFactory(officer=officer4, trr_datetime=datetime(2016, 6, 30, 2, tzinfo=pytz.utc))
+
+        years = range(2012, 2018)
+        expect(self._yearly_top_percentile_rows(years)).to.eq(self._top_percentile_rows(years))
+
+    @mock_percentile_map_range(
+        allegation_min=datetime(2013, 1, 1, tzinfo=pytz.utc),
+        allegation_max=datetime(2014, 1, 1, tzinfo=pytz.utc),
+        internal_civilian_min=datetime(2015, 1, 1, tzinfo=pytz.utc),
+        internal_civilian_max=datetime(2016, 1, 1, tzinfo=pytz.utc),
+        trr_min=datetime(2015, 1, 1, tzinfo=pytz.utc),
+        trr_max=datetime(2016, 1, 1, tzinfo=pytz.utc)
+    )
+    def test_yearly_top_percentile(self):
+        officer1 = OfficerFactory(id=1, appointed_date=date(1990, 3, 14))
+        officer2 = OfficerFactory(id=2, appointed_date=date(1990, 3, 14))
+
+        OfficerAllegationFactory.create_batch(
+            2,
+            officer=officer1,
+            allegation__incident_date=datetime(2013, 12, 31, tzinfo=pytz.utc),
+        )
+        OfficerAllegationFactory(
+            officer=officer2,
+            allegation__incident_date=datetime(2015, 7, 2, tzinfo=pytz.utc),
+            allegation__is_officer_complaint=True
+        )
+        TRRFactory(officer=officer2, trr_datetime=datetime(2015, 2, 1, tzinfo=pytz.utc))
+
+        rows = officer_percentile.yearly_top_percentile([2014, 2016])
+
+        expect(self._yearly_top_percentile_rows([2014, 2016])).to.eq([
+            (2014, 1, 50.0, None, None, None),
+            (2014, 2, 0.0, None, None, None),
+            (2016, 1, 50.0, 0.0, 0.0, 0.0),
+            (2016, 2, 0.0, 0.0, 50.0, 50.0),
+        ])
+        expect(rows[0].pk).to.be.none()
+
+    def test_yearly_top_percentile_group_not_supported(self):
+        with self.assertRaisesRegex(ValueError, 'group is invalid'):
+            officer_percentile.yearly_top_percentile([2017], percentile_groups=[PERCENTILE_HONORABLE_MENTION_GROUP])
+
+    def test_yearly_percentile_snapshot_version(self):
+        officer = OfficerFactory(id=1, appointed_date=date(1990, 3, 14))
+        version = officer_percentile.yearly_percentile_snapshot_version(range(2014, 2017))
+
+        expect(officer_percentile.yearly_percentile_snapshot_version(range(2014, 2017))).to.eq(version)
+        expect(officer_percentile.yearly_percentile_snapshot_version(range(2014, 2018))).not_to.eq(version)
+
+        OfficerAllegationFactory(officer=officer)
+        expect(officer_percentile.yearly_percentile_snapshot_version(range(2014, 2017))).not_to.eq(version)
+
+    def test_load_yearly_top_percentile_from_fresh_snapshot(self):
+        OfficerFactory(id=1, appointed_date=date(1990, 3, 14))
+        OfficerYearlyPercentile.objects.create(officer_id=1, year=2015, percentile_allegation=50)
+        OfficerYearlyPercentile.objects.create(officer_id=1, year=2014, percentile_allegation=25)
+        OfficerYearlyPercentile.objects.create(officer_id=1, year=2010, percentile_allegation=10)
+        OfficerYearlyPercentileSnapshot.objects.create(
+            version=officer_percentile.yearly_percentile_snapshot_version(range(2014, 2016))
+        )
+
+        with patch('data.officer_percentile.yearly_top_percentile') as yearly_top_percentile_mock:
+            rows = officer_percentile.load_yearly_top_percentile(range(2014, 2016))
+
+        expect(yearly_top_percentile_mock.called).to.be.false()
+        expect([(row.year, row.percentile_allegation) for row in rows]).to.eq([(2014, 25), (2015, 50)])
+
+    def test_load_yearly_top_percentile_of_officers(self):
+        OfficerFactory(id=1, appointed_date=date(1990, 3, 14))
+        OfficerFactory(id=2, appointed_date=date(1990, 3, 14))
+        OfficerYearlyPercentile.objects.create(officer_id=1, year=2015, percentile_allegation=50)
+        OfficerYearlyPercentile.objects.create(officer_id=2, year=2015, percentile_allegation=25)
+        OfficerYearlyPercentileSnapshot.objects.create(
+            version=officer_percentile.yearly_percentile_snapshot_version(range(2014, 2016))
+        )
+
+        rows = officer_percentile.load_yearly_top_percentile(range(2014, 2016), officer_ids=[2])
+        expect([(row.officer_id, row.percentile_allegation) for row in rows]).to.eq([(2, 25)])
+
+        OfficerFactory(id=3, appointed_date=date(1990, 3, 14))
+        computed = [Mock(officer_id=1), Mock(officer_id=2)]
+        with patch('data.officer_percentile.yearly_top_percentile', return_value=computed):
+            rows = officer_percentile.load_yearly_top_percentile(range(2014, 2016), officer_ids=[2])
+        expect(rows).to.eq([computed[1]])
+
+    def test_load_yearly_top_percentile_from_stale_snapshot(self):
+        OfficerFactory(id=1, appointed_date=date(1990, 3, 14))
+        OfficerYearlyPercentileSnapshot.objects.create(
+            version=officer_percentile.yearly_percentile_snapshot_version(range(2014, 2016))
+        )
+        OfficerFactory(id=2, appointed_date=date(1990, 3, 14))
+
+        with patch('data.officer_percentile.yearly_top_percentile', return_value=['computed']):
+            expect(officer_percentile.load_yearly_top_percentile(range(2014, 2016))).to.eq(['computed'])
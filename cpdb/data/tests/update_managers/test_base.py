@@ -0,0 +1,185 @@
+from datetime import date, datetime
+
+import pytz
+from django.contrib.gis.geos import Point
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+
+from mock import patch
+from rest_framework import serializers
+from robber import expect
+
+from data.factories import OfficerFactory, OfficerHistoryFactory
+from data.models import Allegation, OfficerHistory, Victim
+from data.update_managers.base import UpdateManagerBase, _copy_value
+from data.update_managers.update_victim_manager import UpdateVictimManager
+
+
+class OfficerHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OfficerHistory
+        fields = ['officer', 'effective_date', 'end_date']
+
+
+class UpdateTestOfficerHistoryManager(UpdateManagerBase):
+    def __init__(self, batch_size=2):
+        super().__init__(table_name='csv_test_officer_history',
+                         filename='',
+                         Model=OfficerHistory,
+                         Serializer=OfficerHistorySerializer,
+                         batch_size=batch_size)
+
+    def query_data(self):
+        return f"""select
+                officer_id::int as officer_id,
+                nullif(effective_date, '') as effective_date,
+                nullif(end_date, '') as end_date
+            from {self.table_name}
+            order by row_number"""
+
+
+class CopyValueTestCase(TestCase):
+    def test_copy_value(self):
+        def copy_value(field_name, value):
+            return _copy_value(Allegation._meta.get_field(field_name), value)
+
+        expect(copy_value('summary', 'say "hi"')).to.eq('"say ""hi"""')
+        expect(copy_value('summary', 'line 1\nline 2')).to.eq('"line 1\nline 2"')
+        expect(copy_value('summary', 'a,b')).to.eq('"a,b"')
+        expect(copy_value('summary', '')).to.eq('""')
+        expect(copy_value('old_complaint_address', None)).to.eq('')
+        expect(copy_value('is_officer_complaint', True)).to.eq('"t"')
+        expect(copy_value('is_officer_complaint', False)).to.eq('"f"')
+        expect(copy_value('first_start_date', date(2020, 1, 2))).to.eq('"2020-01-02"')
+        expect(copy_value('subjects', ['a"b', 'c\\d', None])).to.eq('"{""a\\""b"",""c\\\\d"",NULL}"')
+        expect(copy_value('point', Point(1, 2))).to.eq(f'"{Point(1, 2, srid=4326).hexewkb.decode()}"')
+
+    def test_copy_objects_round_trip(self):
+        manager = UpdateManagerBase('', '', Allegation, OfficerHistorySerializer, 10)
+        manager.copy_objects([
+            Allegation(
+                crid='1',
+                summary='say "hi",\nline 2\\',
+                old_complaint_address='',
+                is_officer_complaint=True,
+                incident_date=datetime(2002, 2, 21, 10, 30, tzinfo=pytz.utc),
+                first_start_date=date(2002, 2, 21),
+                subjects=['a"b', 'c,d', 'NULL', ''],
+                point=Point(-87.6, 41.8),
+            ),
+            Allegation(crid='2', old_complaint_address=None, point=None),
+        ])
+
+        allegation_1 = Allegation.objects.get(crid='1')
+        expect(allegation_1.summary).to.eq('say "hi",\nline 2\\')
+        expect(allegation_1.old_complaint_address).to.eq('')
+        expect(allegation_1.is_officer_complaint).to.be.true()
+        expect(allegation_1.incident_date).to.eq(datetime(2002, 2, 21, 10, 30, tzinfo=pytz.utc))
+        expect(allegation_1.first_start_date).to.eq(date(2002, 2, 21))
+        expect(allegation_1.subjects).to.eq(['a"b', 'c,d', 'NULL', ''])
+        expect(allegation_1.point.coords).to.eq((-87.6, 41.8))
+
+        allegation_2 = Allegation.objects.get(crid='2')
+        expect(allegation_2.old_complaint_address).to.be.none()
+        expect(allegation_2.is_officer_complaint).to.be.false()
+        expect(allegation_2.subjects).to.eq([])
+        expect(allegation_2.point).to.be.none()
+
+
+class UpdateManagerBaseTestCase(TestCase):
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute("""create table csv_test_officer_history (
+                row_number int, officer_id text, effective_date text, end_date text
+            )""")
+
+    def insert_holding_rows(self, rows):
+        with connection.cursor() as cursor:
+            for row_number, row in enumerate(rows):
+                cursor.execute(
+                    'insert into csv_test_officer_history values (%s, %s, %s, %s)', [row_number] + list(row)
+                )
+
+    def test_update_data_streams_batches(self):
+        officer = OfficerFactory(id=1)
+        OfficerHistoryFactory(officer=officer, effective_date=date(2000, 1, 1))
+        self.insert_holding_rows([
+            ('1', f'2001-01-0{day}', '') for day in range(1, 6)
+        ])
+
+        manager = UpdateTestOfficerHistoryManager(batch_size=2)
+        with patch.object(manager, 'process_batch', wraps=manager.process_batch) as process_batch:
+            manager.update_data()
+
+        expect([len(call[0][0]) for call in process_batch.call_args_list]).to.eq([2, 2, 1])
+        expect(list(OfficerHistory.objects.order_by('effective_date').values_list(
+            'officer_id', 'effective_date', 'end_date'
+        ))).to.eq([(1, date(2001, 1, day), None) for day in range(1, 6)])
+
+    def test_update_data_collects_errors_and_rolls_back(self):
+        officer = OfficerFactory(id=1)
+        OfficerHistoryFactory(officer=officer, effective_date=date(2000, 1, 1))
+        self.insert_holding_rows([
+            ('1', '2001-01-01', ''),
+            ('1', 'invalid date', ''),
+            ('999', '2001-01-01', ''),
+            ('1', 'invalid date', '2001-13-01'),
+            ('999', '2001-01-01', ''),
+        ])
+
+        manager = UpdateTestOfficerHistoryManager(batch_size=2)
+        with self.assertRaises(ValidationError) as context:
+            manager.update_data()
+
+        errors = context.exception.message_dict
+        expect(errors).to.have.length(3)
+        expect(errors['officer']).to.eq(['Invalid pk "999" - object does not exist. (2 rows)'])
+        expect(errors['effective_date']).to.have.length(1)
+        expect(errors['effective_date'][0]).to.contain('invalid date')
+        expect(errors['effective_date'][0]).to.contain('(2 rows)')
+        expect(errors['end_date']).to.have.length(1)
+        expect(errors['end_date'][0]).to.contain('(1 rows)')
+
+        expect(list(OfficerHistory.objects.values_list('officer_id', 'effective_date'))).to.eq(
+            [(1, date(2000, 1, 1))]
+        )
+
+    def test_update_data_collects_changes(self):
+        for officer_id in [1, 2, 3, 4]:
+            OfficerFactory(id=officer_id)
+        OfficerHistoryFactory(officer_id=1, effective_date=date(2000, 1, 1), end_date=None)
+        OfficerHistoryFactory(officer_id=2, effective_date=date(2000, 1, 1), end_date=None)
+        OfficerHistoryFactory(officer_id=3, effective_date=date(2000, 1, 1), end_date=None)
+        self.insert_holding_rows([
+            ('1', '2000-01-01', ''),
+            ('2', '2000-01-02', ''),
+            ('4', '2000-01-01', ''),
+        ])
+
+        manager = UpdateTestOfficerHistoryManager()
+        manager.update_data()
+
+        expect(manager.changes.model).to.eq(OfficerHistory)
+        expect(manager.changes.officer_ids).to.eq({2, 3, 4})
+        expect(manager.changes.crids).to.eq(set())
+
+    def test_update_data_without_tracking_changes(self):
+        OfficerFactory(id=1)
+        self.insert_holding_rows([('1', '2000-01-01', '')])
+
+        manager = UpdateTestOfficerHistoryManager()
+        manager.track_changes = False
+        manager.update_data()
+
+        expect(manager.changes).to.be.none()
+
+    def test_validate_batch_with_declared_serializer_field(self):
+        manager = UpdateVictimManager()
+        manager.validate_batch([
+            Victim(gender='M', race='x' * 51, age=20),
+            Victim(gender='F', race='White', age=30),
+        ])
+
+        expect(manager.errors['race']).to.eq({'Ensure this field has no more than 50 characters.': 1})
+        expect(manager.errors['gender']).to.eq({})
@@ -0,0 +1,24 @@
+from django.test import TestCase
+
+from robber import expect
+
+from data.factories import OfficerFactory, OfficerAllegationFactory, AllegationFactory
+from data.models import OfficerAllegation, Salary
+from data.update_managers.changes import DataChanges
+
+
+class DataChangesTestCase(TestCase):
+    def test_empty(self):
+        expect(DataChanges(Salary).empty).to.be.true()
+        expect(DataChanges(Salary, officer_ids=[1]).empty).to.be.false()
+        expect(DataChanges(OfficerAllegation, crids=['1']).empty).to.be.false()
+
+    def test_affected_officer_ids(self):
+        allegation = AllegationFactory(crid='1')
+        OfficerAllegationFactory(officer=OfficerFactory(id=1), allegation=allegation)
+        OfficerAllegationFactory(officer=OfficerFactory(id=2), allegation=allegation)
+        OfficerAllegationFactory(officer=OfficerFactory(id=3))
+
+        changes = DataChanges(OfficerAllegation, officer_ids=[4], crids=['1'])
+
+        expect(changes.affected_officer_ids()).to.eq({1, 2, 4})
@@ -1,9 +1,8 @@
 from django.test import SimpleTestCase
 
 from robber import expect
-from mock import Mock
 
-from data.utils.percentile import percentile, merge_metric
+from data.utils.percentile import percentile, percentile_ranks, merge_metric
 from shared.tests.utils import create_object, validate_object
 
 
@@ -11,6 +10,17 @@ class PercentileTestCase(SimpleTestCase):
     def test_percentile_with_no_data(self):
         expect(percentile([], 0)).to.be.eq([])
 
+    def test_percentile_ranks(self):
+        expect(percentile_ranks([0.4, 0.1, 0.2, 0.2, 0.5, 0.1]).tolist()).to.eq([
+            100.0 * 4 / 6, 0.0, 100.0 * 2 / 6, 100.0 * 2 / 6, 100.0 * 5 / 6, 0.0
+        ])
+
+    def test_percentile_ranks_with_decimal_places(self):
+        expect(percentile_ranks([0.3, 0.2, 0.1], decimal_places=4).tolist()).to.eq([66.6667, 33.3333, 0.0])
+
+    def test_percentile_ranks_with_no_data(self):
+        expect(percentile_ranks([]).tolist()).to.eq([])
+
     def test_percentile(self):
         object1 = create_object({'id': 1, 'metric_value': 0.1})
         object2 = create_object({'id': 2, 'metric_value': 0.2})
@@ -74,21 +84,13 @@ class PercentileTestCase(SimpleTestCase):
             create_object({'id': 3, 'value_a': 0.4, 'metric_value_a': 0.3}),
         ]
 
-        new_metric_query_set = Mock(
-            exclude=Mock(return_value=[
-                create_object({'id': 4, 'value_b': 0.3, 'value_c': 0.4, 'metric_value_b': 0.3, 'metric_value_c': 0.4}),
-            ]),
-            filter=Mock(
-                return_value=Mock(
-                    in_bulk=Mock(return_value={
-                        2: create_object({'id': 2, 'metric_value_b': 0.3, 'metric_value_c': 0.4}),
-                        3: create_object({'id': 3, 'metric_value_b': 0.6, 'metric_value_c': 0.8}),
-                    })
-                )
-            )
-        )
-
-        results = merge_metric(objects, new_metric_query_set, ['value_b', 'value_c'])
+        new_objects = [
+            create_object({'id': 2, 'metric_value_b': 0.3, 'metric_value_c': 0.4}),
+            create_object({'id': 4, 'value_b': 0.3, 'value_c': 0.4, 'metric_value_b': 0.3, 'metric_value_c': 0.4}),
+            create_object({'id': 3, 'metric_value_b': 0.6, 'metric_value_c': 0.8}),
+        ]
+
+        results = merge_metric(objects, iter(new_objects), ['value_b', 'value_c'])
         validate_object(results[0], {
             'id': 1,
             'value_a': 0.1,
@@ -115,3 +117,16 @@ class PercentileTestCase(SimpleTestCase):
             'metric_value_b': 0.3,
             'metric_value_c': 0.4
         })
+
+    def test_percentile_with_percentile_rank(self):
+        object1 = create_object({'id': 1, 'metric_value': 0.1})
+        object2 = create_object({'id': 2, 'metric_value': 0.2})
+        object3 = create_object({'id': 3, 'metric_value': 0.2})
+        object4 = create_object({'id': 4, 'metric_value': 0.5})
+
+        percentile([object1, object2, object3, object4], percentile_type='value', percentile_rank=50.0)
+
+        expect(hasattr(object1, 'percentile_value')).to.be.false()
+        expect(hasattr(object2, 'percentile_value')).to.be.false()
+        expect(hasattr(object3, 'percentile_value')).to.be.false()
+        expect(object4.percentile_value).to.eq(75.0)
@@ -1,3 +1,9 @@
+import io
+from collections import Counter, defaultdict
+
+from django.contrib.gis.db.models import GeometryField
+from django.contrib.postgres.fields import ArrayField
+from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.db import connection
 from django.db import models
@@ -5,35 +11,79 @@ from tqdm import tqdm
 from typing import Type
 from rest_framework import serializers
 
+from .changes import DataChanges
+
+
+def _quote_array_item(value):
+    if value is None:
+        return 'NULL'
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _copy_value(field, value):
+    """Format a python value as a quoted CSV field for COPY, None stays empty which COPY reads as NULL"""
+    if value is None:
+        return ''
+    if isinstance(field, GeometryField):
+        value = field.get_prep_value(value).hexewkb.decode()
+    elif isinstance(field, ArrayField):
+        value = '{' + ','.join(_quote_array_item(item) for item in value) + '}'
+    else:
+        value = field.get_db_prep_save(value, connection)
+        if isinstance(value, bool):
+            value = 't' if value else 'f'
+    return '"' + str(value).replace('"', '""') + '"'
+
 
 class UpdateManagerBase:
     """
     A base class for managing updates to a database table from a file.
 
-    In most cases, subclasses should provide a serializer (for validation, since this is using bulk create),
+    In most cases, subclasses should provide a serializer (its fields are the columns to validate)
     and implement a query_data method to query the data from the holding table.
 
     Generally as much processing as possible should be done in the database for efficiency, but if there is
     additional processing that needs to be done in Python, it can be done in preprocess_batch.
 
+    The result of query_data is streamed through a server side cursor, each batch is validated column by column
+    and loaded with COPY FROM STDIN. Columns declared on the serializer are validated by the serializer field,
+    other columns by the model field, and related objects are checked to exist with one query per relation and
+    batch. Validation errors are collected per column over the whole run and raised at the end, which rolls back
+    the update.
+
+    With track_changes, the loaded columns of the existing rows are copied into a temp table before they are
+    deleted and compared with the reloaded rows, so that `changes` holds the officer ids and crids of the rows
+    which were added, removed or modified, for the cache managers to refresh only what depends on them.
+    Managers whose delete cascades into other tables should not track changes.
+
     Finally, in some cases where related models need to be updated, simply overwrite process_batch
 
     Attributes:
         table_name (str): The name of the holding table for the data.
         filename (str): The name of the file containing the data to update. Should be in data-updates/ folder.
         Model (models.Model): The Django model representing the database table.
-        Serializer (serializers.Serializer): The serializer for validating and deserializing the data.
+        Serializer (serializers.Serializer): The serializer whose Meta.fields are validated.
         batch_size (int): The number of records to process in each batch.
-        offset (int): The starting point for processing records.
-        row_count (int): The total number of rows processed.
+        use_copy (bool): Load batches with COPY, otherwise with bulk_create.
+        errors (dict): Validation error messages and their row counts by column.
+        track_changes (bool): Compare the reloaded rows with the deleted ones.
+        changes (DataChanges): Changed officer ids and crids after update_data, None if not tracked.
 
     Methods:
         delete_existing_data(): Deletes all existing data in the table, should cascade delete.
         query_data(): Abstract method to query data, must be implemented by subclasses.
         preprocess_batch(batch): Preprocesses a batch of data before processing.
+        validate_batch(objects): Validates a batch of model instances and collects errors.
+        validate_relations(objects): Collects errors of related objects which do not exist.
         process_batch(batch): Processes a batch of data and inserts it into the database.
         update_data(update_holding_table=False): Updates the database table with data from the file.
+        snapshot_existing_data(): Copies the columns compared by collect_changes into a temp table.
+        collect_changes(): Returns the DataChanges between the snapshot and the reloaded rows.
     """
+    use_copy = True
+    track_changes = True
+    change_key_columns = {'officer_id': 'officer_ids', 'allegation_id': 'crids'}
+
     def __init__(self, table_name: str, filename: str,
                  Model: Type[models.Model], Serializer: Type[serializers.ModelSerializer],
                  batch_size: int):
@@ -45,8 +95,9 @@ class UpdateManagerBase:
 
         self.model_name = Model._meta.model_name
 
-        self.offset = 0
         self.batch_size = batch_size
+        self.errors = defaultdict(Counter)
+        self.changes = None
 
     def delete_existing_data(self):
         # TODO: Implement cascade delete in a more efficient way, this is slow
@@ -57,20 +108,194 @@ class UpdateManagerBase:
         self.Model.objects.all().delete()
 
     def query_data(self):
-        # TODO: change this to give a base query that can then be select count(*) and offset limitted from
         raise NotImplementedError()
 
     def preprocess_batch(self, batch):
         return batch
 
+    @property
+    def serializer_model_fields(self):
+        return [self.Model._meta.get_field(name) for name in self.Serializer.Meta.fields]
+
+    @property
+    def validated_fields(self):
+        return [field for field in self.serializer_model_fields if not field.is_relation]
+
+    @property
+    def related_fields(self):
+        return [
+            field for field in self.serializer_model_fields
+            if field.is_relation and field.concrete and (field.many_to_one or field.one_to_one)
+        ]
+
+    def _validation_messages(self, field, value):
+        """
+        Fields declared on the serializer are validated by the serializer field, like ModelSerializer does,
+        other columns by the model field with its validators.
+        """
+        declared_field = self.Serializer._declared_fields.get(field.name)
+        try:
+            if declared_field is not None:
+                declared_field.run_validation(value)
+            else:
+                field.clean(value, None)
+        except ValidationError as e:
+            return e.messages
+        except serializers.ValidationError as e:
+            return [str(message) for message in e.detail]
+        return []
+
+    def validate_batch(self, objects):
+        for field in self.validated_fields:
+            column_errors = self.errors[field.name]
+            checked_values = dict()
+
+            for obj in objects:
+                value = getattr(obj, field.attname)
+                try:
+                    if value not in checked_values:
+                        checked_values[value] = self._validation_messages(field, value)
+                    messages = checked_values[value]
+                except TypeError:
+                    messages = self._validation_messages(field, value)
+
+                for message in messages:
+                    column_errors[message] += 1
+
+        self.validate_relations(objects)
+
+    def validate_relations(self, objects):
+        """Check that related objects exist with one query per relation and batch instead of one per row"""
+        for field in self.related_fields:
+            column_errors = self.errors[field.name]
+            target_field = field.target_field
+
+            values = dict()
+            for obj in objects:
+                value = getattr(obj, field.attname)
+                if value is not None and value not in values:
+                    try:
+                        values[value] = target_field.to_python(value)
+                    except ValidationError:
+                        values[value] = None
+            existing_values = set(
+                field.related_model._base_manager.filter(**{
+                    f'{target_field.attname}__in': [value for value in values.values() if value is not None]
+                }).values_list(target_field.attname, flat=True)
+            )
+
+            for obj in objects:
+                value = getattr(obj, field.attname)
+                if value is None:
+                    if not field.null:
+                        column_errors['This field may not be null.'] += 1
+                elif values[value] not in existing_values:
+                    column_errors[f'Invalid pk "{value}" - object does not exist.'] += 1
+
+    def copy_objects(self, objects):
+        pk_field = self.Model._meta.pk
+        objects_with_pk = [obj for obj in objects if obj.pk is not None]
+        objects_without_pk = [obj for obj in objects if obj.pk is None]
+        fields = self.Model._meta.concrete_fields
+
+        for group, group_fields in [
+            (objects_with_pk, fields),
+            (objects_without_pk, [field for field in fields if field is not pk_field])
+        ]:
+            if not group:
+                continue
+
+            rows = io.StringIO()
+            for obj in group:
+                rows.write(','.join(_copy_value(field, field.pre_save(obj, True)) for field in group_fields))
+                rows.write('\n')
+            rows.seek(0)
+
+            columns = ', '.join(connection.ops.quote_name(field.column) for field in group_fields)
+            with connection.cursor() as cursor:
+                cursor.copy_expert(f'copy {self.Model._meta.db_table} ({columns}) from stdin with csv', rows)
+
     def process_batch(self, batch):
-        serializer = self.Serializer(data=batch, many=True)
+        objects = [self.Model(**d) for d in batch]
+        self.validate_batch(objects)
+        if self.has_errors:
+            # the update is rolled back at the end, keep validating without writing invalid values
+            return
+
+        if self.use_copy:
+            self.copy_objects(objects)
+        else:
+            self.Model.objects.bulk_create(objects)
+
+    @property
+    def snapshot_table_name(self):
+        return f'tmp_{self.Model._meta.db_table}_before_update'
 
-        # TODO: improve error handling, should only show unique execptions
-        # maybe an example and counts
-        if serializer.is_valid(raise_exception=True):
-            self.Model.objects.bulk_create([self.Model(**d)
-                                            for d in batch])
+    @property
+    def snapshot_fields(self):
+        """Loaded fields: every concrete field but generated primary keys and timestamps"""
+        return [
+            field for field in self.Model._meta.concrete_fields
+            if not (field.primary_key and isinstance(field, models.AutoField))
+            and field.name not in ('created_at', 'updated_at')
+        ]
+
+    def snapshot_existing_data(self):
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in self.snapshot_fields)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {self.snapshot_table_name}')
+            cursor.execute(
+                f'CREATE TEMP TABLE {self.snapshot_table_name} ON COMMIT DROP AS '
+                f'SELECT {columns} FROM {self.Model._meta.db_table}'
+            )
+
+    def collect_changes(self):
+        """
+        Officer ids and crids of the rows in only one of the snapshot and the table, compared on the columns
+        the query loaded. Cached columns which the query does not load are not compared.
+        """
+        loaded_columns = getattr(self, 'columns', None) or []
+        compared_fields = [field for field in self.snapshot_fields if field.column in loaded_columns] or \
+            self.snapshot_fields
+        key_columns = [
+            column for column in self.change_key_columns if column in [field.column for field in compared_fields]
+        ]
+        changes = DataChanges(self.Model)
+        if not key_columns:
+            return changes
+
+        # geometries are compared by their EWKB, the = operator of older PostGIS only compares bounding boxes
+        columns = ', '.join(
+            f'{connection.ops.quote_name(field.column)}::text' if isinstance(field, GeometryField)
+            else connection.ops.quote_name(field.column)
+            for field in compared_fields
+        )
+        table_name = self.Model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT DISTINCT {', '.join(key_columns)} FROM (
+                    (SELECT {columns} FROM {self.snapshot_table_name} EXCEPT ALL SELECT {columns} FROM {table_name})
+                    UNION ALL
+                    (SELECT {columns} FROM {table_name} EXCEPT ALL SELECT {columns} FROM {self.snapshot_table_name})
+                ) AS changed_rows
+            """)
+            for row in cursor.fetchall():
+                for column, value in zip(key_columns, row):
+                    if value is not None:
+                        getattr(changes, self.change_key_columns[column]).add(value)
+        return changes
+
+    @property
+    def has_errors(self):
+        return any(self.errors.values())
+
+    def raise_validation_errors(self):
+        errors = {
+            column: [f'{message} ({count} rows)' for message, count in column_errors.items()]
+            for column, column_errors in self.errors.items() if column_errors
+        }
+        if errors:
+            raise ValidationError(errors)
 
     @transaction.atomic
     def update_data(self, update_holding_table=False):
@@ -84,23 +309,32 @@ class UpdateManagerBase:
         cursor.execute(f"select count(*) from {self.table_name}")
         row_count = cursor.fetchone()[0]
 
+        if self.track_changes:
+            self.snapshot_existing_data()
+
         print(f"Deleting existing {self.model_name} data and linked data")
         self.delete_existing_data()
 
         print(f"Total rows: {row_count}")
 
-        with tqdm(total=row_count, desc=f"Updating {self.model_name} data", unit=" rows") as pbar:
-            while self.offset < row_count:
-                cursor.execute(self.query_data())
-                self.columns = [col[0] for col in cursor.description]
-                batch = [dict(zip(self.columns, data)) for data in cursor.fetchall()]
+        with tqdm(total=row_count, desc=f"Updating {self.model_name} data", unit=" rows") as pbar, \
+                connection.chunked_cursor() as stream:
+            stream.execute(self.query_data())
+
+            rows = stream.fetchmany(self.batch_size)
+            self.columns = [col[0] for col in stream.description] if rows else []
+            while rows:
+                batch = [dict(zip(self.columns, data)) for data in rows]
 
                 batch = self.preprocess_batch(batch)
                 self.process_batch(batch)
 
-                self.offset += self.batch_size
-                pbar.update(len(batch))
+                pbar.update(len(rows))
+                rows = stream.fetchmany(self.batch_size)
 
+        self.raise_validation_errors()
+        if self.track_changes:
+            self.changes = self.collect_changes()
         print(f"Finished updating {self.model_name} data")
 
     @transaction.atomic
@@ -0,0 +1,27 @@
+from data.models import OfficerAllegation
+
+
+class DataChanges:
+    """
+    Rows changed by an update manager: the model it reloaded, and the officer ids and crids of the rows which
+    were added, removed or modified by the reload. Cache managers refresh only the cached data depending on them.
+    """
+    def __init__(self, model, officer_ids=(), crids=()):
+        self.model = model
+        self.officer_ids = set(officer_ids)
+        self.crids = set(crids)
+
+    @property
+    def empty(self):
+        return not self.officer_ids and not self.crids
+
+    def affected_officer_ids(self):
+        """Changed officers and the officers accused in a changed allegation"""
+        officer_ids = set(self.officer_ids)
+        if self.crids:
+            officer_ids.update(
+                OfficerAllegation.objects.filter(
+                    allegation_id__in=self.crids, officer_id__isnull=False
+                ).values_list('officer_id', flat=True)
+            )
+        return officer_ids
@@ -33,5 +33,4 @@ class UpdateActionResponseManager(UpdateManagerBase):
                     resistance_level
                 from {self.table_name} t
                 join trr_trr trr on trr.id = replace(t.trr_id, '-', '')::int
-                limit {self.batch_size} offset {self.offset}
                 """
@@ -16,6 +16,9 @@ class AllegationSerializer(serializers.ModelSerializer):
 
 
 class UpdateAllegationManager(UpdateManagerBase):
+    # delete_existing_data also deletes the officer allegations, complainants, victims and witnesses
+    track_changes = False
+
     def __init__(self, batch_size=100000):
         super().__init__(table_name='csv_complaints_complaints',
                          filename="data-updates/complaints/complaints-complaints.csv",
@@ -57,8 +60,7 @@ class UpdateAllegationManager(UpdateManagerBase):
                     on lpad(replace(t.beat, '.0', ''), 4, '0') = a.name::varchar
                     and a.area_type = 'beat'
                 where
-                    cr_id != ''
-                limit {self.batch_size} offset {self.offset}"""
+                    cr_id != ''"""
 
     def preprocess_batch(self, batch):
         for idx, row in enumerate(batch):
@@ -35,5 +35,4 @@ class UpdateAwardManager(UpdateManagerBase):
                 join csv_final_profiles o
                     on o.uid::float::int = t.uid::float::int
                 join data_officer d
-                    on d.id = o.officer_id::float::int
-                limit {self.batch_size} offset {self.offset}"""
+                    on d.id = o.officer_id::float::int"""
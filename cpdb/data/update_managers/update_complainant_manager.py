@@ -28,8 +28,7 @@ class UpdateComplainantManager(UpdateManagerBase):
                     '19MX'), '19FS'),'19FX'), '')::float::int as birth_year
                 from {self.table_name} t
                 join data_allegation a
-                    on a.crid = replace(t.cr_id, '-', '')
-                limit {self.batch_size} offset {self.offset}"""
+                    on a.crid = replace(t.cr_id, '-', '')"""
 
     def preprocess_batch(self, batch):
         batch = [{key: value for key, value in row.items() if value}
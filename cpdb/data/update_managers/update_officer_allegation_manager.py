@@ -46,8 +46,7 @@ class UpdateOfficerAllegationManager(UpdateManagerBase):
                 join data_allegation a
                     on a.crid = replace(t.cr_id, '-', '')
                 left join data_allegationcategory c
-                    on c.category_code = trim(t.complaint_code)
-                limit {self.batch_size} offset {self.offset}"""
+                    on c.category_code = trim(t.complaint_code)"""
 
     def preprocess_batch(self, batch):
         batch = [{key: value for key, value in row.items() if value}
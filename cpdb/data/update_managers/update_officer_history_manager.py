@@ -30,5 +30,4 @@ class UpdateOfficerHistoryManager(UpdateManagerBase):
                 join data_officer oo
                     on oo.id = o.officer_id::float::int
                 left join data_policeunit pu
-                    on lpad(t.unit::float::int::text, 3, '0') = pu.unit_name
-                limit {self.batch_size} offset {self.offset}"""
+                    on lpad(t.unit::float::int::text, 3, '0') = pu.unit_name"""
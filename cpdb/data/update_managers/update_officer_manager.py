@@ -14,6 +14,9 @@ class OfficerSerializer(serializers.ModelSerializer):
 
 
 class UpdateOfficerManager(UpdateManagerBase):
+    # deleting officers cascades into every table related to them
+    track_changes = False
+
     def __init__(self, batch_size=10000):
         super().__init__(table_name='csv_final_profiles',
                          filename="data-updates/officers/final-profiles.csv",
@@ -43,8 +46,7 @@ class UpdateOfficerManager(UpdateManagerBase):
         from {self.table_name} t
         left join data_policeunit u
             on u.unit_name = lpad(t.current_unit::float::int::text, 3, '0')
-            and u.active
-        limit {self.batch_size} offset {self.offset}"""
+            and u.active"""
 
     def preprocess_batch(self, batch):
         # create badge numbers for this batch of officers
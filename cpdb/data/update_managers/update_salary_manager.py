@@ -38,5 +38,4 @@ class UpdateSalaryManager(UpdateManagerBase):
             join data_officer d
                 on d.id = o.officer_id::float::int
             where
-                pay_grade is not null
-            limit {self.batch_size} offset {self.offset}"""
+                pay_grade is not null"""
@@ -26,5 +26,4 @@ class UpdateSubjectWeaponManager(UpdateManagerBase):
                     nullif(trim(weapon_description), '') as weapon_description
                 from {self.table_name} t
                 join trr_trr trr
-                    on trr.id = replace(t.trr_id, '-', '')::int
-                limit {self.batch_size} offset {self.offset}"""
+                    on trr.id = replace(t.trr_id, '-', '')::int"""
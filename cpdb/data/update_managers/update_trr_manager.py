@@ -132,8 +132,7 @@ class UpdateTRRManager(UpdateManagerBase):
                 left join data_policeunit du
                     on du.unit_name = case when officer_unit_detail_id = 'REDACTED' then null
                                         else lpad(officer_unit_detail_id::float::int::text, 3, '0') end
-                    and du.active
-                limit {self.batch_size} offset {self.offset}"""
+                    and du.active"""
 
     def preprocess_batch(self, batch):
         eastern = pytz.utc
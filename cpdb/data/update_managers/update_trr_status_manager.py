@@ -29,7 +29,6 @@ class UpdateTRRStatusManager(UpdateManagerBase):
                     (status_date::date || ' ' || status_time)::Timestamp as status_datetime
                 from {self.table_name} t
                 join trr_trr trr on trr.id = replace(t.trr_id, '-', '')::int
-                limit {self.batch_size} offset {self.offset}
                 """
 
     def preprocess_batch(self, batch):
@@ -28,5 +28,4 @@ class UpdateVictimManager(UpdateManagerBase):
                 nullif(birth_year, '')::float::int as birth_year
             from {self.table_name} t
             join data_allegation a
-                on a.crid = replace(t.cr_id, '-', '')
-            limit {self.batch_size} offset {self.offset}"""
+                on a.crid = replace(t.cr_id, '-', '')"""
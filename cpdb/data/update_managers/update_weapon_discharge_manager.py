@@ -48,5 +48,4 @@ class UpdateWeaponDischargeManager(UpdateManagerBase):
                 from {self.table_name} t
                 join trr_trr main
                     on main.id = replace(t.trr_id, '-', '')::int
-                limit {self.batch_size} offset {self.offset}
                 """
@@ -1,3 +1,27 @@
+import numpy as np
+
+
+def percentile_ranks(values, decimal_places=0):
+    """
+    Vectorized percentile rank: the percentage of values strictly lower than each value.
+    Equal values share the rank of their first occurrence in sorted order.
+    :param values: sequence of numeric metric values
+    :param decimal_places: how much we will round the rank, 0 means no round
+    :return: numpy array of ranks, in the same order as values
+    """
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return np.empty(0)
+
+    lower_counts = np.searchsorted(np.sort(values, kind='mergesort'), values, side='left')
+    ranks = 100.0 * lower_counts / len(values)
+    if decimal_places > 0:
+        # Python's round() is used on the distinct ranks to keep results identical to the scalar implementation
+        distinct_ranks, inverse = np.unique(ranks, return_inverse=True)
+        ranks = np.array([round(rank, decimal_places) for rank in distinct_ranks.tolist()])[inverse]
+    return ranks
+
+
 def percentile(objects, percentile_type='', key=None, percentile_rank=0.0, decimal_places=0):
     """
     :param objects: list of objects which have metric_{key} attribute
@@ -15,35 +39,34 @@ def percentile(objects, percentile_type='', key=None, percentile_rank=0.0, decim
     if not in_ranking:
         return objects
 
-    sorted_scores = sorted(in_ranking, key=lambda x: getattr(x, metric_key))
-    scores_length = len(sorted_scores)
-    previous_score = getattr(sorted_scores[0], metric_key)
-    current_rank = 0.0
-
-    for i, item in enumerate(sorted_scores):
-        if getattr(item, metric_key, 0.0) > previous_score:
-            current_rank = 100.0 * i / scores_length
-            current_rank = round(current_rank, decimal_places) if decimal_places > 0 else current_rank
-            previous_score = getattr(item, metric_key)
-        if current_rank >= percentile_rank:
-            setattr(item, percentile_key, current_rank)
+    ranks = percentile_ranks([getattr(obj, metric_key) for obj in in_ranking], decimal_places)
+    for item, rank in zip(in_ranking, ranks.tolist()):
+        if rank >= percentile_rank:
+            setattr(item, percentile_key, rank)
 
     return objects
 
 
-def merge_metric(objects, new_metric_query_set, percentile_types):
+def merge_metric(objects, new_objects, percentile_types):
+    """
+    Merge metric attributes of new_objects into objects by id.
+    Objects which only exist in new_objects are appended as they are.
+    :param objects: list of objects which already have metrics of previous percentile types
+    :param new_objects: iterable of objects having metric_{percentile_type} attributes, evaluated only once
+    :param percentile_types: percentile types to copy onto existing objects
+    """
     attr_names = [f'metric_{percentile_type}' for percentile_type in percentile_types]
 
-    existing_ids = [obj.id for obj in objects]
-    new_objects = list(new_metric_query_set.exclude(id__in=existing_ids))
-    old_object_dict = new_metric_query_set.filter(id__in=existing_ids).in_bulk()
+    new_object_dict = {obj.id: obj for obj in new_objects}
+    existing_ids = set()
 
     for obj in objects:
+        existing_ids.add(obj.id)
+        new_obj = new_object_dict.get(obj.id)
+        if new_obj is None:
+            continue
         for attr_name in attr_names:
-            try:
-                value = getattr(old_object_dict[obj.id], attr_name)
-                setattr(obj, attr_name, value)
-            except KeyError:
-                pass
+            if hasattr(new_obj, attr_name):
+                setattr(obj, attr_name, getattr(new_obj, attr_name))
 
-    return objects + new_objects
+    return objects + [obj for obj in new_object_dict.values() if obj.id not in existing_ids]
@@ -1,6 +1,10 @@
+import uuid
 from contextlib import contextmanager
 
 from django.conf import settings
+from django.core.cache import cache
+
+from elasticsearch import NotFoundError
 
 from . import es_client
 from .indices import Index
@@ -19,6 +23,30 @@ class IndexAlias:
             self.new_index_name = f'test_{self.new_index_name}'
             self.name = f'test_{self.name}'
 
+    def current_index_name(self):
+        '''
+        Name of the index the alias currently points to. It changes every time indexing() swaps the alias.
+        Returns None if the alias does not exist.
+        '''
+        try:
+            return next(iter(es_client.indices.get_alias(name=self.name)), None)
+        except NotFoundError:
+            return None
+
+    @property
+    def data_version_key(self):
+        return f'es-index:{self.name}:data-version'
+
+    def data_version(self):
+        '''
+        Version of the documents updated in place, without swapping the alias, e.g. by incremental indexing.
+        It is kept in the Django cache so that every process sees bump_data_version() of the indexing process.
+        '''
+        return cache.get(self.data_version_key)
+
+    def bump_data_version(self):
+        cache.set(self.data_version_key, uuid.uuid4().hex, timeout=None)
+
     def doc_type(self, doc_type):
         return self.read_index.doc_type(doc_type)
 
@@ -1,7 +1,9 @@
 import copy
 import types
+from time import time
 
-from elasticsearch.helpers import bulk
+from django.db import connections
+from elasticsearch.helpers import bulk, parallel_bulk
 from tqdm import tqdm
 
 from es_index import es_client
@@ -12,10 +14,22 @@ class BaseIndexer(object):
     index_alias = None
     parent_doc_type_property = None
     op_type = 'index'
+    incremental = False
+    parallel = False
+    thread_count = 4
+    chunk_size = 500
+    max_chunk_bytes = 100 * 1024 * 1024
 
     def get_queryset(self):
         raise NotImplementedError
 
+    def get_updated_queryset(self, since):
+        '''
+        Return the rows whose indexed documents may have changed since the given datetime.
+        Indexers that support incremental reindexing should override this.
+        '''
+        raise NotImplementedError
+
     def extract_datum(self, datum):
         raise NotImplementedError
 
@@ -41,9 +55,9 @@ class BaseIndexer(object):
             doc['_source'] = {'doc': raw_doc}
         return doc
 
-    def doc_dict(self, raw_doc):
+    def doc_dict(self, raw_doc, index_name=None):
         doc = self.doc_type_klass(**raw_doc).to_dict(include_meta=True)
-        doc['_index'] = self.index_alias.new_index_name
+        doc['_index'] = index_name or self.index_alias.new_index_name
         doc['_op_type'] = self.op_type
 
         if 'id' in raw_doc:
@@ -54,17 +68,18 @@ class BaseIndexer(object):
             doc = self._embed_update_script(doc)
         return doc
 
-    def docs(self):
+    def docs(self, queryset=None, index_name=None):
+        queryset = self.get_queryset() if queryset is None else queryset
         for datum in tqdm(
-            self.get_queryset(),
+            queryset,
             desc=f'Indexing {self.doc_type_klass._doc_type.name}({self.__class__.__name__})'
         ):
             result = self.extract_datum(datum)
             if isinstance(result, types.GeneratorType):
                 for obj in result:
-                    yield self.doc_dict(obj)
+                    yield self.doc_dict(obj, index_name)
             else:
-                yield self.doc_dict(result)
+                yield self.doc_dict(result, index_name)
 
     @classmethod
     def create_mapping(cls):
@@ -72,13 +87,79 @@ class BaseIndexer(object):
         if not cls.parent_doc_type_property:
             cls.doc_type_klass.init(index=cls.index_alias.new_index_name)
 
-    def add_new_data(self):
+    def _bulk(self, docs):
+        return bulk(es_client, docs, raise_on_error=False, stats_only=True)
+
+    @staticmethod
+    def _closing_connections(docs):
+        '''
+        parallel_bulk consumes docs in a thread of its pool, so the database connection the querysets open there
+        is not the one of the calling thread. Close it from the consuming thread once docs are exhausted.
+        '''
+        try:
+            yield from docs
+        finally:
+            connections.close_all()
+
+    def _parallel_bulk(self, docs, thread_count, chunk_size, max_chunk_bytes):
+        success, failed = 0, 0
+        for ok, _ in parallel_bulk(
+            es_client,
+            self._closing_connections(docs),
+            thread_count=thread_count,
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            raise_on_error=False
+        ):
+            if ok:
+                success += 1
+            else:
+                failed += 1
+        return success, failed
+
+    def add_new_data(self, parallel=None, thread_count=None, chunk_size=None, max_chunk_bytes=None):
+        parallel = self.parallel if parallel is None else parallel
+
         self.index_alias.write_index.settings(refresh_interval='-1')
         self.index_alias.write_index.open()
-        bulk(es_client, self.docs())
+        start_time = time()
+        if parallel:
+            success, failed = self._parallel_bulk(
+                self.docs(),
+                thread_count=thread_count or self.thread_count,
+                chunk_size=chunk_size or self.chunk_size,
+                max_chunk_bytes=max_chunk_bytes or self.max_chunk_bytes
+            )
+        else:
+            success, failed = self._bulk(self.docs())
+        elapsed_time = time() - start_time
         self.index_alias.write_index.settings(refresh_interval='1s')
         self.index_alias.write_index.refresh()
 
+        self._report(success, failed, elapsed_time)
+        return success, failed
+
+    def update_data(self, since):
+        '''
+        Upsert documents of rows changed since the given datetime directly into the live alias.
+        '''
+        start_time = time()
+        success, failed = self._bulk(
+            self.docs(queryset=self.get_updated_queryset(since), index_name=self.index_alias.name)
+        )
+        self.index_alias.read_index.refresh()
+        self.index_alias.bump_data_version()
+
+        self._report(success, failed, time() - start_time)
+        return success, failed
+
+    def _report(self, success, failed, elapsed_time):
+        docs_per_second = success / elapsed_time if elapsed_time else 0
+        print(
+            f'{self.__class__.__name__}: indexed {success} docs in {elapsed_time:.2f}s '
+            f'({docs_per_second:.1f} docs/sec), {failed} failed'
+        )
+
     def reindex(self):
         self.create_mapping()
         self.add_new_data()
@@ -1,22 +1,46 @@
 import json
 
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
 from django.utils.module_loading import autodiscover_modules
 
 from es_index import indexer_klasses, indexer_klasses_map
 from es_index.constants import DAILY_INDEXERS
+from es_index.models import IndexerWatermark
 
 
 class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--daily', dest='daily', action='store_true')
         parser.set_defaults(daily=False)
+        parser.add_argument(
+            '--incremental',
+            dest='incremental',
+            action='store_true',
+            help='Only reindex rows updated since the last run, directly into the live alias'
+        )
+        parser.set_defaults(incremental=False)
         parser.add_argument('app', nargs='*')
         parser.add_argument(
             '--from-file',
             dest='from_file',
             help='Read config json and choose which indexer to rebuild'
         )
+        parser.add_argument(
+            '--parallel',
+            dest='parallel',
+            action='store_true',
+            help='Ship bulk requests from a thread pool while documents are being built'
+        )
+        parser.set_defaults(parallel=False)
+        parser.add_argument('--thread-count', dest='thread_count', type=int, help='Number of bulk worker threads')
+        parser.add_argument('--chunk-size', dest='chunk_size', type=int, help='Number of docs per bulk request')
+        parser.add_argument(
+            '--max-chunk-bytes',
+            dest='max_chunk_bytes',
+            type=int,
+            help='Maximum size of a bulk request in bytes'
+        )
 
     def _get_indexer_names_from_json(self, file_name):
         with open(file_name) as f:
@@ -83,11 +107,47 @@ class Command(BaseCommand):
     def _get_distinct_doc_types_from_indexers(self, indexers):
         return list(set(x.doc_type_klass._doc_type.name for x in indexers))
 
+    def _get_bulk_options(self, options):
+        if not options.get('parallel'):
+            return {}
+        return {
+            'parallel': True,
+            'thread_count': options.get('thread_count'),
+            'chunk_size': options.get('chunk_size'),
+            'max_chunk_bytes': options.get('max_chunk_bytes'),
+        }
+
+    def update_indexers(self, indexers):
+        for indexer_klass in indexers:
+            if not getattr(indexer_klass, 'incremental', False):
+                print(f'{indexer_klass.__name__}: incremental reindexing is not supported, skipped')
+                continue
+
+            since = IndexerWatermark.objects.get_watermark(indexer_klass)
+            if since is None:
+                print(f'{indexer_klass.__name__}: no watermark found, run a full rebuild first')
+                continue
+
+            started_at = timezone.now()
+            _, failed = indexer_klass().update_data(since)
+            self.check_failed(indexer_klass, failed)
+            IndexerWatermark.objects.set_watermark(indexer_klass, started_at)
+
+    def check_failed(self, indexer_klass, failed):
+        if failed:
+            raise CommandError(f'{indexer_klass.__name__}: {failed} docs failed to index')
+
     def handle(self, *args, **options):
+        bulk_options = self._get_bulk_options(options)
         selected_indexers = self.get_indexers(**options)
+        if options.get('incremental'):
+            self.update_indexers(selected_indexers)
+            return
+
         alias_indexers_tuple = self.categorize_indexers_by_index_alias(selected_indexers)
 
         for alias, indexers, migrating_indexers in alias_indexers_tuple:
+            started_at = timezone.now()
             with alias.indexing():
                 list_migrate_doc_types = self._get_distinct_doc_types_from_indexers(migrating_indexers)
 
@@ -101,4 +161,8 @@ class Command(BaseCommand):
 
                 for indexer_klass in indexers:
                     indexer_instance = indexer_klass()
-                    indexer_instance.add_new_data()
+                    _, failed = indexer_instance.add_new_data(**bulk_options)
+                    self.check_failed(indexer_klass, failed)
+
+            for indexer_klass in indexers:
+                IndexerWatermark.objects.set_watermark(indexer_klass, started_at)
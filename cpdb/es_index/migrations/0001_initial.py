@@ -0,0 +1,22 @@
+# Generated by Django 2.2.10 on 2026-10-18 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexerWatermark',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('indexer_name', models.CharField(max_length=255, unique=True)),
+                ('indexed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
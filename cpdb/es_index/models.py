@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class IndexerWatermarkManager(models.Manager):
+    @staticmethod
+    def indexer_name(indexer_klass):
+        return f'{indexer_klass.__module__}.{indexer_klass.__name__}'
+
+    def get_watermark(self, indexer_klass):
+        watermark = self.filter(indexer_name=self.indexer_name(indexer_klass)).first()
+        return watermark.indexed_at if watermark else None
+
+    def set_watermark(self, indexer_klass, indexed_at):
+        self.update_or_create(
+            indexer_name=self.indexer_name(indexer_klass),
+            defaults={'indexed_at': indexed_at}
+        )
+
+
+class IndexerWatermark(models.Model):
+    indexer_name = models.CharField(max_length=255, unique=True)
+    indexed_at = models.DateTimeField()
+
+    objects = IndexerWatermarkManager()
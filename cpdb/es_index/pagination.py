@@ -1,20 +1,92 @@
-from django.db.models import Case, When
+import base64
+import binascii
+import json
+
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+from .utils import hydrate, serialize_from_source
 
 
 class ESBasePagination(LimitOffsetPagination):
+    '''
+    Paginate by limit/offset, or by cursor when the `cursor` query param is given (empty for the first page).
+    Cursor pagination uses search_after, so it is not limited by max_result_window and does not slow down
+    on deep pages. The cursor is opaque to clients, it holds the sort values of the last hit of the page.
+    '''
+    cursor_query_param = 'cursor'
+    tiebreaker_sort = {'_uid': 'asc'}
+    invalid_cursor_message = 'Invalid cursor'
+
     def paginate_es_query(self, query, request, queryset=None, view=None):
         self.limit = self.get_limit(request)
+        self.request = request
+        self.queryset = queryset
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        if self.cursor is not None:
+            return self.paginate_es_query_by_cursor(query)
+
         self.offset = self.get_offset(request)
         response = query[self.offset: self.offset + self.limit].execute()
         self.count = response.hits.total
-        self.request = request
-        self.queryset = queryset
 
         if self.count == 0 or self.offset > self.count:
             return []
         return self.get_response(response)
 
+    def paginate_es_query_by_cursor(self, query):
+        query = query.sort(*self.stable_sort(query))
+        if self.cursor:
+            query = query.extra(search_after=self.decode_cursor(self.cursor))
+
+        response = query[0:self.limit].execute()
+        self.count = response.hits.total
+
+        hits = list(response)
+        self.next_cursor = self.encode_cursor(hits[-1].meta.sort) if len(hits) == self.limit else None
+
+        if not hits:
+            return []
+        return self.get_response(response)
+
+    def stable_sort(self, query):
+        sort = query.to_dict().get('sort') or ['_score']
+        if '_uid' not in [field if isinstance(field, str) else next(iter(field)) for field in sort]:
+            sort = sort + [self.tiebreaker_sort]
+        return sort
+
+    @staticmethod
+    def encode_cursor(sort_values):
+        return base64.urlsafe_b64encode(json.dumps(list(sort_values)).encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded_cursor = cursor + '=' * (-len(cursor) % 4)
+            sort_values = json.loads(base64.urlsafe_b64decode(padded_cursor.encode('ascii')).decode('utf-8'))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(sort_values, list):
+            raise NotFound(self.invalid_cursor_message)
+        return sort_values
+
+    def get_next_link(self):
+        if self.cursor is None:
+            return super(ESBasePagination, self).get_next_link()
+        if self.next_cursor is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_previous_link(self):
+        if self.cursor is None:
+            return super(ESBasePagination, self).get_previous_link()
+        return None
+
     def get_response(self, response):
         raise NotImplementedError()
 
@@ -25,7 +97,19 @@ class ESQueryPagination(ESBasePagination):
 
 
 class ESQuerysetPagination(ESBasePagination):
+    '''
+    Return the objects of queryset matching the hits. When `source_fields` is given and every hit stores
+    them, return the serialized `_source` of the hits instead and set `from_source`, the database is skipped.
+    '''
+    def __init__(self, source_fields=None):
+        self.source_fields = source_fields
+        self.from_source = False
+
     def get_response(self, response):
-        pk_list = [item.id for item in response]
-        preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(pk_list)])
-        return self.queryset.filter(id__in=pk_list).order_by(preserved)
+        if self.source_fields:
+            sources = serialize_from_source(response, self.source_fields)
+            if sources is not None:
+                self.from_source = True
+                return sources
+        objects, _ = hydrate(self.queryset, [item.id for item in response])
+        return objects
@@ -1,11 +1,17 @@
+from datetime import datetime
+
 from django.test import TestCase
-from django.core.management import call_command
+from django.core.management import call_command, CommandError
 
+import pytz
+from freezegun import freeze_time
 from mock import Mock, patch, mock_open
+from robber import expect
 
 from es_index import indexer_klasses, indexer_klasses_map
 from es_index.management.commands.rebuild_index import Command
 from es_index.management.commands import rebuild_index
+from es_index.models import IndexerWatermark
 
 
 class RebuildIndexCommandTestCase(TestCase):
@@ -16,7 +22,7 @@ class RebuildIndexCommandTestCase(TestCase):
 
         Indexer.doc_type_klass._doc_type.name = 'a'
         Indexer.create_mapping = Mock()
-        Indexer.add_new_data = Mock()
+        Indexer.add_new_data = Mock(return_value=(1, 0))
         Indexer.index_alias.name = 'test'
         Indexer.index_alias.indexing.return_value.__exit__ = Mock()
         Indexer.index_alias.indexing.return_value.__enter__ = Mock()
@@ -61,14 +67,14 @@ class RebuildIndexCommandTestCase(TestCase):
             doc_type_klass = Mock(_doc_type=Mock())
 
         Indexer1.create_mapping = Mock()
-        Indexer1.add_new_data = Mock()
+        Indexer1.add_new_data = Mock(return_value=(1, 0))
 
         class Indexer2:
             index_alias = alias
             doc_type_klass = Mock(_doc_type=Mock(name='b'))
 
         Indexer2.create_mapping = Mock()
-        Indexer2.add_new_data = Mock()
+        Indexer2.add_new_data = Mock(return_value=(1, 0))
 
         indexer_klasses_map['alias'] = []
         indexer_klasses_map['alias'].append(Indexer1)
@@ -98,7 +104,7 @@ class RebuildIndexCommandTestCase(TestCase):
         Indexer2.index_alias.name = 'test'
         Indexer2.index_alias.migrate = Mock()
         Indexer2.create_mapping = Mock()
-        Indexer2.add_new_data = Mock()
+        Indexer2.add_new_data = Mock(return_value=(1, 0))
         indexer_klasses_map['test'].append(Indexer2)
         indexer_klasses.append(Indexer2)
 
@@ -125,7 +131,7 @@ class RebuildIndexCommandTestCase(TestCase):
         Indexer2.index_alias.name = 'test'
         Indexer2.index_alias.migrate = Mock()
         Indexer2.create_mapping = Mock()
-        Indexer2.add_new_data = Mock()
+        Indexer2.add_new_data = Mock(return_value=(1, 0))
         Indexer2.index_alias.indexing.return_value.__exit__ = Mock()
         Indexer2.index_alias.indexing.return_value.__enter__ = Mock()
         indexer_klasses_map['test'].append(Indexer2)
@@ -141,7 +147,7 @@ class RebuildIndexCommandTestCase(TestCase):
         Indexer3.index_alias.indexing.return_value.__exit__ = Mock()
         Indexer3.index_alias.indexing.return_value.__enter__ = Mock()
         Indexer3.create_mapping = Mock()
-        Indexer3.add_new_data = Mock()
+        Indexer3.add_new_data = Mock(return_value=(1, 0))
         indexer_klasses_map['test2'] = [Indexer3]
         indexer_klasses.append(Indexer3)
 
@@ -181,7 +187,7 @@ class RebuildIndexCommandTestCase(TestCase):
         Indexer2.index_alias.name = 'test'
         Indexer2.index_alias.migrate = Mock()
         Indexer2.create_mapping = Mock()
-        Indexer2.add_new_data = Mock()
+        Indexer2.add_new_data = Mock(return_value=(1, 0))
         Indexer2.index_alias.indexing.return_value.__exit__ = Mock()
         Indexer2.index_alias.indexing.return_value.__enter__ = Mock()
         indexer_klasses_map['test'].append(Indexer2)
@@ -200,3 +206,84 @@ class RebuildIndexCommandTestCase(TestCase):
             call_command('rebuild_index', '--daily')
             daily_index.create_mapping.assert_called_once()
             daily_index.add_new_data.assert_called_once()
+
+    def test_handle_with_parallel_option(self):
+        Indexer = self._prepare_data()
+
+        with patch('es_index.management.commands.rebuild_index.autodiscover_modules'):
+            call_command('rebuild_index', '--parallel', '--thread-count=8', '--chunk-size=200')
+
+        Indexer.add_new_data.assert_called_once_with(
+            parallel=True,
+            thread_count=8,
+            chunk_size=200,
+            max_chunk_bytes=None
+        )
+
+    def test_handle_set_watermark_of_rebuilt_indexers(self):
+        Indexer = self._prepare_data()
+
+        with freeze_time(datetime(2020, 1, 1, tzinfo=pytz.utc)):
+            with patch('es_index.management.commands.rebuild_index.autodiscover_modules'):
+                call_command('rebuild_index')
+
+        expect(IndexerWatermark.objects.get_watermark(Indexer)).to.eq(datetime(2020, 1, 1, tzinfo=pytz.utc))
+
+    def test_handle_with_incremental_option(self):
+        Indexer = self._prepare_data()
+        Indexer.incremental = True
+        Indexer.update_data = Mock(return_value=(1, 0))
+        IndexerWatermark.objects.set_watermark(Indexer, datetime(2020, 1, 1, tzinfo=pytz.utc))
+
+        with freeze_time(datetime(2020, 2, 1, tzinfo=pytz.utc)):
+            with patch('es_index.management.commands.rebuild_index.autodiscover_modules'):
+                call_command('rebuild_index', '--incremental')
+
+        Indexer.update_data.assert_called_once_with(datetime(2020, 1, 1, tzinfo=pytz.utc))
+        Indexer.create_mapping.assert_not_called()
+        Indexer.add_new_data.assert_not_called()
+        Indexer.index_alias.indexing.assert_not_called()
+        expect(IndexerWatermark.objects.get_watermark(Indexer)).to.eq(datetime(2020, 2, 1, tzinfo=pytz.utc))
+
+    def test_handle_with_incremental_option_skip_indexer_without_watermark(self):
+        Indexer = self._prepare_data()
+        Indexer.incremental = True
+        Indexer.update_data = Mock(return_value=(1, 0))
+
+        with patch('es_index.management.commands.rebuild_index.autodiscover_modules'):
+            call_command('rebuild_index', '--incremental')
+
+        Indexer.update_data.assert_not_called()
+        expect(IndexerWatermark.objects.get_watermark(Indexer)).to.be.none()
+
+    def test_handle_with_incremental_option_skip_unsupported_indexer(self):
+        Indexer = self._prepare_data()
+        Indexer.update_data = Mock(return_value=(1, 0))
+        IndexerWatermark.objects.set_watermark(Indexer, datetime(2020, 1, 1, tzinfo=pytz.utc))
+
+        with patch('es_index.management.commands.rebuild_index.autodiscover_modules'):
+            call_command('rebuild_index', '--incremental')
+
+        Indexer.update_data.assert_not_called()
+
+    def test_handle_fail_when_docs_failed_to_index(self):
+        Indexer = self._prepare_data()
+        Indexer.add_new_data = Mock(return_value=(1, 2))
+        Indexer.index_alias.indexing.return_value.__exit__ = Mock(return_value=False)
+
+        with patch('es_index.management.commands.rebuild_index.autodiscover_modules'):
+            expect(lambda: call_command('rebuild_index')).to.throw(CommandError)
+
+        expect(IndexerWatermark.objects.get_watermark(Indexer)).to.be.none()
+
+    def test_handle_with_incremental_option_fail_when_docs_failed_to_index(self):
+        Indexer = self._prepare_data()
+        Indexer.incremental = True
+        Indexer.update_data = Mock(return_value=(1, 2))
+        IndexerWatermark.objects.set_watermark(Indexer, datetime(2020, 1, 1, tzinfo=pytz.utc))
+
+        with freeze_time(datetime(2020, 2, 1, tzinfo=pytz.utc)):
+            with patch('es_index.management.commands.rebuild_index.autodiscover_modules'):
+                expect(lambda: call_command('rebuild_index', '--incremental')).to.throw(CommandError)
+
+        expect(IndexerWatermark.objects.get_watermark(Indexer)).to.eq(datetime(2020, 1, 1, tzinfo=pytz.utc))
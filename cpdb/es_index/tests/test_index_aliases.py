@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from elasticsearch_dsl import DocType
 from mock import Mock, patch
@@ -49,6 +49,30 @@ class IndexAliasTestCase(TestCase):
         expect(self.TestDocType.search().count()).to.eq(1)
         expect(self.old_read_index.search().count()).to.eq(1)
 
+    def test_current_index_name(self):
+        expect(self.alias.current_index_name()).to.eq(self.old_read_index._name)
+
+        with self.alias.indexing():
+            pass
+
+        expect(self.alias.current_index_name()).to.eq(self.alias.new_index_name)
+
+    def test_current_index_name_without_alias(self):
+        expect(IndexAlias('not_exist').current_index_name()).to.be.none()
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_bump_data_version(self):
+        alias = IndexAlias('data_version_test')
+        expect(alias.data_version()).to.be.none()
+
+        alias.bump_data_version()
+        version = alias.data_version()
+        alias.bump_data_version()
+
+        expect(version).not_to.be.none()
+        expect(alias.data_version()).not_to.eq(version)
+        expect(IndexAlias('other').data_version()).to.be.none()
+
     def test_remove_write_index_if_exception(self):
         class MyException(Exception):
             pass
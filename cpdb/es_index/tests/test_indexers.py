@@ -2,7 +2,7 @@ from django.test import SimpleTestCase
 
 from elasticsearch_dsl import DocType
 from robber import expect
-from mock import Mock, patch
+from mock import ANY, Mock, patch
 
 from es_index.indexers import BaseIndexer, es_client
 
@@ -15,6 +15,9 @@ class IndexersTestCase(SimpleTestCase):
     def test_extract_datum(self):
         expect(lambda: BaseIndexer().extract_datum(None)).to.throw(NotImplementedError)
 
+    def test_get_updated_queryset(self):
+        expect(lambda: BaseIndexer().get_updated_queryset(None)).to.throw(NotImplementedError)
+
     def test_docs_when_extract_datum_is_generator(self):
         class MyDocType(DocType):
             pass
@@ -167,6 +170,7 @@ class IndexersTestCase(SimpleTestCase):
 
         indexer = TestIndexer()
         indexer.docs = Mock(return_value=[1])
+        mock_bulk.return_value = (1, 0)
 
         indexer.reindex()
 
@@ -174,4 +178,112 @@ class IndexersTestCase(SimpleTestCase):
         expect(mock_write_index.close.called).to.be.true()
         expect(mock_write_index.settings.called).to.be.true()
         expect(mock_init.called).to.be.true()
-        expect(mock_bulk).to.be.called_with(es_client, [1])
+        expect(mock_bulk).to.be.called_with(es_client, [1], raise_on_error=False, stats_only=True)
+
+    @patch('es_index.indexers.parallel_bulk')
+    @patch('es_index.indexers.bulk')
+    def test_add_new_data_in_parallel(self, mock_bulk, mock_parallel_bulk):
+        mock_write_index = Mock()
+
+        class TestIndexer(BaseIndexer):
+            index_alias = Mock(write_index=mock_write_index, new_index_name='new_index_name')
+            doc_type_klass = Mock()
+
+        indexer = TestIndexer()
+        indexer.docs = Mock(return_value=[1, 2, 3])
+        mock_parallel_bulk.return_value = iter([(True, {}), (False, {}), (True, {})])
+
+        with patch.object(BaseIndexer, '_closing_connections', return_value='closing_docs') as mock_closing:
+            expect(indexer.add_new_data(parallel=True, thread_count=2, chunk_size=100)).to.eq((2, 1))
+        expect(mock_closing).to.be.called_with([1, 2, 3])
+        expect(mock_bulk).not_to.be.called()
+        expect(mock_parallel_bulk).to.be.called_with(
+            es_client,
+            'closing_docs',
+            thread_count=2,
+            chunk_size=100,
+            max_chunk_bytes=100 * 1024 * 1024,
+            raise_on_error=False
+        )
+        expect(mock_write_index.refresh.called).to.be.true()
+
+    @patch('es_index.indexers.parallel_bulk')
+    @patch('es_index.indexers.bulk')
+    def test_add_new_data_in_parallel_when_indexer_opted_in(self, mock_bulk, mock_parallel_bulk):
+        class TestIndexer(BaseIndexer):
+            index_alias = Mock(new_index_name='new_index_name')
+            doc_type_klass = Mock()
+            parallel = True
+            thread_count = 8
+
+        indexer = TestIndexer()
+        indexer.docs = Mock(return_value=[1])
+        mock_parallel_bulk.return_value = iter([(True, {})])
+
+        expect(indexer.add_new_data()).to.eq((1, 0))
+        expect(mock_bulk).not_to.be.called()
+        expect(mock_parallel_bulk).to.be.called_with(
+            es_client,
+            ANY,
+            thread_count=8,
+            chunk_size=500,
+            max_chunk_bytes=100 * 1024 * 1024,
+            raise_on_error=False
+        )
+
+    @patch('es_index.indexers.connections')
+    def test_closing_connections(self, mock_connections):
+        docs = BaseIndexer._closing_connections(iter([1, 2]))
+
+        expect(next(docs)).to.eq(1)
+        expect(mock_connections.close_all.called).to.be.false()
+        expect(list(docs)).to.eq([2])
+        expect(mock_connections.close_all.called).to.be.true()
+
+    @patch('es_index.indexers.bulk')
+    def test_add_new_data_count_failed_docs(self, mock_bulk):
+        class TestIndexer(BaseIndexer):
+            index_alias = Mock(new_index_name='new_index_name')
+            doc_type_klass = Mock()
+
+        indexer = TestIndexer()
+        indexer.docs = Mock(return_value=[1, 2, 3])
+        mock_bulk.return_value = (2, 1)
+
+        expect(indexer.add_new_data()).to.eq((2, 1))
+        expect(mock_bulk).to.be.called_with(es_client, [1, 2, 3], raise_on_error=False, stats_only=True)
+
+    @patch('es_index.indexers.bulk')
+    def test_update_data(self, mock_bulk):
+        class MyDocType(DocType):
+            pass
+
+        mock_read_index = Mock()
+        index_alias = Mock(new_index_name='new_index_name', read_index=mock_read_index)
+        index_alias.name = 'index_name'
+
+        class ConcreteIndexer(BaseIndexer):
+            doc_type_klass = MyDocType
+
+            def get_queryset(self):
+                return [1, 2]
+
+            def get_updated_queryset(self, since):
+                return [2]
+
+            def extract_datum(self, datum):
+                return {'id': datum}
+
+        ConcreteIndexer.index_alias = index_alias
+        mock_bulk.side_effect = lambda client, docs, **kwargs: (len(list(docs)), 0)
+
+        expect(ConcreteIndexer().update_data('2020-01-01')).to.eq((1, 0))
+        expect(mock_read_index.refresh.called).to.be.true()
+        expect(index_alias.bump_data_version.called).to.be.true()
+        expect(list(ConcreteIndexer().docs(queryset=[2], index_name='index_name'))).to.eq([{
+            '_id': 2,
+            '_type': 'my_doc_type',
+            '_source': {'id': 2},
+            '_index': 'index_name',
+            '_op_type': 'index'
+        }])
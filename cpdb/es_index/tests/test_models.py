@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from django.test import TestCase
+
+import pytz
+from robber import expect
+
+from es_index.indexers import BaseIndexer
+from es_index.models import IndexerWatermark
+
+
+class MyIndexer(BaseIndexer):
+    pass
+
+
+class IndexerWatermarkManagerTestCase(TestCase):
+    def test_indexer_name(self):
+        expect(IndexerWatermark.objects.indexer_name(MyIndexer)).to.eq('es_index.tests.test_models.MyIndexer')
+
+    def test_get_watermark_when_indexer_has_never_been_indexed(self):
+        expect(IndexerWatermark.objects.get_watermark(MyIndexer)).to.be.none()
+
+    def test_set_watermark(self):
+        IndexerWatermark.objects.set_watermark(MyIndexer, datetime(2020, 1, 1, tzinfo=pytz.utc))
+        expect(IndexerWatermark.objects.get_watermark(MyIndexer)).to.eq(datetime(2020, 1, 1, tzinfo=pytz.utc))
+
+        IndexerWatermark.objects.set_watermark(MyIndexer, datetime(2020, 2, 1, tzinfo=pytz.utc))
+        expect(IndexerWatermark.objects.get_watermark(MyIndexer)).to.eq(datetime(2020, 2, 1, tzinfo=pytz.utc))
+        expect(IndexerWatermark.objects.count()).to.eq(1)
@@ -1,6 +1,7 @@
 from django.test import SimpleTestCase, TestCase
 
 from mock import Mock
+from rest_framework.exceptions import NotFound
 from robber import expect
 
 from data.factories import AttachmentFileFactory, AllegationFactory
@@ -14,6 +15,30 @@ class ESBasePaginationTestCase(SimpleTestCase):
         pagination = ESBasePagination()
         expect(lambda: pagination.get_response(response)).to.throw(NotImplementedError)
 
+    def test_stable_sort(self):
+        pagination = ESBasePagination()
+
+        expect(pagination.stable_sort(Mock(to_dict=Mock(return_value={})))).to.eq(['_score', {'_uid': 'asc'}])
+        expect(pagination.stable_sort(Mock(to_dict=Mock(return_value={
+            'sort': [{'allegation_count': {'order': 'desc'}}, '_score']
+        })))).to.eq([{'allegation_count': {'order': 'desc'}}, '_score', {'_uid': 'asc'}])
+        expect(pagination.stable_sort(Mock(to_dict=Mock(return_value={
+            'sort': ['_score', {'_uid': {'order': 'desc'}}]
+        })))).to.eq(['_score', {'_uid': {'order': 'desc'}}])
+
+    def test_encode_and_decode_cursor(self):
+        pagination = ESBasePagination()
+        cursor = pagination.encode_cursor([1.5, 'cr#123'])
+
+        expect(pagination.decode_cursor(cursor)).to.eq([1.5, 'cr#123'])
+
+    def test_decode_invalid_cursor(self):
+        pagination = ESBasePagination()
+
+        expect(lambda: pagination.decode_cursor('invalid')).to.throw(NotFound)
+        expect(lambda: pagination.decode_cursor('_w')).to.throw(NotFound)
+        expect(lambda: pagination.decode_cursor('eyJhIjogMX0')).to.throw(NotFound)
+
 
 class ESQueryPaginationTestCase(SimpleTestCase):
     def test_paginate_es_query(self):
@@ -36,6 +61,58 @@ class ESQueryPaginationTestCase(SimpleTestCase):
         expect(pagination.offset).to.eq(30)
         expect(pagination.request).to.eq(request)
 
+    def test_paginate_es_query_by_cursor(self):
+        request = Mock()
+        request.query_params = {'limit': 2, 'cursor': ESBasePagination.encode_cursor([0.5, 'cr#1'])}
+        request.build_absolute_uri.return_value = 'http://cpdp.co/api/v2/search/?term=abc&offset=4'
+        search_result = Mock()
+        search_result.hits = Mock()
+        search_result.hits.total = 50
+        search_result.__iter__ = Mock(side_effect=lambda: iter([
+            Mock(meta=Mock(sort=[0.6, 'cr#2'])), Mock(meta=Mock(sort=[0.4, 'cr#3']))
+        ]))
+        query = Mock()
+        query.to_dict.return_value = {}
+        query.sort.return_value = query
+        query.extra.return_value = query
+        query.__getitem__ = Mock(return_value=query)
+        query.execute.return_value = search_result
+
+        pagination = ESQueryPagination()
+        paginated_query = pagination.paginate_es_query(query, request)
+
+        query.sort.assert_called_with('_score', {'_uid': 'asc'})
+        query.extra.assert_called_with(search_after=[0.5, 'cr#1'])
+        query.__getitem__.assert_called_with(slice(0, 2))
+        expect(paginated_query).to.have.length(2)
+        expect(pagination.count).to.eq(50)
+        expect(pagination.next_cursor).to.eq(ESBasePagination.encode_cursor([0.4, 'cr#3']))
+        expect(pagination.get_previous_link()).to.be.none()
+        expect(pagination.get_next_link()).to.eq(
+            f'http://cpdp.co/api/v2/search/?cursor={pagination.next_cursor}&limit=2&term=abc'
+        )
+
+    def test_paginate_es_query_by_cursor_last_page(self):
+        request = Mock()
+        request.query_params = {'limit': 2, 'cursor': ''}
+        search_result = Mock()
+        search_result.hits = Mock()
+        search_result.hits.total = 1
+        search_result.__iter__ = Mock(side_effect=lambda: iter([Mock(meta=Mock(sort=[0.6, 'cr#2']))]))
+        query = Mock()
+        query.to_dict.return_value = {}
+        query.sort.return_value = query
+        query.__getitem__ = Mock(return_value=query)
+        query.execute.return_value = search_result
+
+        pagination = ESQueryPagination()
+        paginated_query = pagination.paginate_es_query(query, request)
+
+        expect(query.extra.called).to.be.false()
+        expect(paginated_query).to.have.length(1)
+        expect(pagination.next_cursor).to.be.none()
+        expect(pagination.get_next_link()).to.be.none()
+
     def test_pagination_es_query_no_data(self):
         request = Mock()
         request.query_params = {'limit': 20, 'offset': 30}
@@ -82,8 +159,8 @@ class ESQuerysetPaginationTestCase(TestCase):
 
         returned_value_1 = MockObject()
         returned_value_2 = MockObject()
-        setattr(returned_value_1, 'id', 1)
-        setattr(returned_value_2, 'id', 2)
+        setattr(returned_value_1, 'id', 2)
+        setattr(returned_value_2, 'id', 1)
 
         request = Mock()
         request.query_params = {'limit': 20, 'offset': 30}
@@ -97,7 +174,7 @@ class ESQuerysetPaginationTestCase(TestCase):
 
         pagination = ESQuerysetPagination()
         paginated_query = pagination.paginate_es_query(query, request, queryset)
-        expect(list(paginated_query)).to.eq([attachment_1, attachment_2])
+        expect(paginated_query).to.eq([attachment_2, attachment_1])
         expect(pagination.count).to.eq(50)
         expect(pagination.limit).to.eq(20)
         expect(pagination.offset).to.eq(30)
@@ -147,3 +224,48 @@ class ESQuerysetPaginationTestCase(TestCase):
         pagination = ESQuerysetPagination()
         paginated_query = pagination.paginate_es_query(query, request, queryset)
         expect(list(paginated_query)).to.eq([])
+
+    def test_paginate_es_query_from_source(self):
+        request = Mock()
+        request.query_params = {'limit': 20, 'offset': 0}
+        search_result = Mock()
+        search_result.hits = Mock()
+        search_result.hits.total = 2
+        search_result.__iter__ = Mock(return_value=iter([
+            Mock(id=2, to_dict=Mock(return_value={'id': 2, 'title': 'Document Title 2', 'text_content': 'Text'})),
+            Mock(id=1, to_dict=Mock(return_value={'id': 1, 'title': 'Document Title 1', 'text_content': 'Text'})),
+        ]))
+        query = Mock()
+        query.__getitem__ = Mock(return_value=query)
+        query.execute.return_value = search_result
+
+        pagination = ESQuerysetPagination(source_fields=['id', 'title'])
+        with self.assertNumQueries(0):
+            paginated_query = pagination.paginate_es_query(query, request, AttachmentFile.objects.all())
+
+        expect(paginated_query).to.eq([{'id': 2, 'title': 'Document Title 2'}, {'id': 1, 'title': 'Document Title 1'}])
+        expect(pagination.from_source).to.be.true()
+
+    def test_paginate_es_query_from_database_when_source_fields_missing(self):
+        allegation = AllegationFactory(crid=123456)
+        attachment_1 = AttachmentFileFactory(id=1, owner=allegation, title='Document Title 1')
+        attachment_2 = AttachmentFileFactory(id=2, owner=allegation, title='Document Title 2')
+
+        request = Mock()
+        request.query_params = {'limit': 20, 'offset': 0}
+        search_result = Mock()
+        search_result.hits = Mock()
+        search_result.hits.total = 2
+        search_result.__iter__ = Mock(return_value=iter([
+            Mock(id=2, to_dict=Mock(return_value={'id': 2, 'title': 'Document Title 2'})),
+            Mock(id=1, to_dict=Mock(return_value={'id': 1})),
+        ]))
+        query = Mock()
+        query.__getitem__ = Mock(return_value=query)
+        query.execute.return_value = search_result
+
+        pagination = ESQuerysetPagination(source_fields=['id', 'title'])
+        paginated_query = pagination.paginate_es_query(query, request, AttachmentFile.objects.all())
+
+        expect(paginated_query).to.eq([attachment_2, attachment_1])
+        expect(pagination.from_source).to.be.false()
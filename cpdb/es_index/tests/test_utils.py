@@ -0,0 +1,57 @@
+from django.test import SimpleTestCase, TestCase
+
+from mock import Mock
+from robber import expect
+
+from data.factories import OfficerFactory
+from data.models import Officer
+from es_index.utils import hydrate, serialize_from_source
+
+
+class HydrateTestCase(TestCase):
+    def test_hydrate(self):
+        officer_1 = OfficerFactory(id=1)
+        officer_2 = OfficerFactory(id=2)
+        OfficerFactory(id=3)
+
+        with self.assertNumQueries(1):
+            objects, missing_ids = hydrate(Officer.objects.all(), ['2', '4', '1'])
+
+        expect(objects).to.eq([officer_2, officer_1])
+        expect(missing_ids).to.eq([4])
+
+    def test_hydrate_filtered_queryset(self):
+        officer_1 = OfficerFactory(id=1, first_name='Jerome')
+        OfficerFactory(id=2, first_name='Edward')
+
+        objects, missing_ids = hydrate(Officer.objects.filter(first_name='Jerome'), [2, 1])
+
+        expect(objects).to.eq([officer_1])
+        expect(missing_ids).to.eq([2])
+
+    def test_hydrate_empty_ids(self):
+        objects, missing_ids = hydrate(Officer.objects.all(), [])
+
+        expect(objects).to.eq([])
+        expect(missing_ids).to.eq([])
+
+
+class SerializeFromSourceTestCase(SimpleTestCase):
+    def test_serialize_from_source(self):
+        hits = [
+            Mock(to_dict=Mock(return_value={'id': 2, 'title': 'b', 'text_content': 'x'})),
+            Mock(to_dict=Mock(return_value={'id': 1, 'title': 'a'})),
+        ]
+
+        expect(serialize_from_source(hits, ['id', 'title'])).to.eq([
+            {'id': 2, 'title': 'b'},
+            {'id': 1, 'title': 'a'},
+        ])
+
+    def test_serialize_from_source_missing_fields(self):
+        hits = [
+            Mock(to_dict=Mock(return_value={'id': 2, 'title': 'b'})),
+            Mock(to_dict=Mock(return_value={'id': 1})),
+        ]
+
+        expect(serialize_from_source(hits, ['id', 'title'])).to.be.none()
@@ -1,7 +1,10 @@
+import logging
 import uuid
 from time import time
 
 
+logger = logging.getLogger(__name__)
+
 per_run_uuid = str(uuid.uuid4())
 
 
@@ -15,3 +18,30 @@ def timing_validate(message):
             return return_value
         return wrapper
     return real_decorator
+
+
+def hydrate(queryset, ids):
+    '''
+    Fetch objects of queryset by ids (e.g. ids of Elasticsearch hits) and return them in the order of ids
+    along with the ids which are not in queryset anymore. Ids are converted to the primary key type so
+    string `_id`s of hits can be passed as they are.
+    '''
+    to_pk = queryset.model._meta.pk.to_python
+    pks = [to_pk(pk) for pk in ids]
+    objects = queryset.in_bulk(pks)
+
+    missing_ids = [pk for pk in pks if pk not in objects]
+    if missing_ids:
+        logger.warning(f'{queryset.model.__name__} ids are indexed but missing from database: {missing_ids}')
+    return [objects[pk] for pk in pks if pk in objects], missing_ids
+
+
+def serialize_from_source(hits, fields):
+    '''
+    Serialize Elasticsearch hits from their `_source` when every hit stores all of the serialized fields,
+    so the database can be skipped. Return None if any hit lacks one of the fields.
+    '''
+    sources = [hit.to_dict() for hit in hits]
+    if not all(set(fields).issubset(source) for source in sources):
+        return None
+    return [{field: source[field] for field in fields} for source in sources]
@@ -1,11 +1,21 @@
 from django.db.models import Subquery, OuterRef, Sum, F
 from django.db.models.functions import Coalesce
 
-from lawsuit.models import Lawsuit
+from lawsuit.models import Lawsuit, Payment
 
+SOURCE_MODELS = [Lawsuit, Payment]
+TARGET_MODELS = [Lawsuit]
 
-def cache_data():
-    Lawsuit.objects.update(
+
+def _lawsuits_updated_since(since):
+    lawsuit_ids = set(Lawsuit.objects.filter(updated_at__gt=since).values_list('id', flat=True))
+    lawsuit_ids.update(Payment.objects.filter(updated_at__gt=since).values_list('lawsuit_id', flat=True))
+    return Lawsuit.objects.filter(id__in=lawsuit_ids)
+
+
+def cache_data(since=None):
+    lawsuits = Lawsuit.objects.all() if since is None else _lawsuits_updated_since(since)
+    lawsuits.update(
         total_settlement=Subquery(
             Lawsuit.objects.filter(
                 id=OuterRef('id')
@@ -22,6 +32,6 @@ def cache_data():
         )
     )
 
-    Lawsuit.objects.update(
+    lawsuits.update(
         total_payments=F('total_settlement') + F('total_legal_fees')
     )
@@ -1,6 +1,7 @@
 from elasticsearch_dsl import (
     DocType, Integer, Date, Float, Nested, InnerObjectWrapper, Text, Long, Boolean, Keyword
 )
+from elasticsearch_dsl.query import Q
 
 from .index_aliases import officers_index_alias
 
@@ -48,6 +49,19 @@ class OfficerInfoDocType(DocType):
         'description': Text(analyzer=autocomplete, search_analyzer=autocomplete_search),
     })
 
+    @staticmethod
+    def allegation_count_score(query):
+        '''
+        Bool `should` clause adding 3 * allegation_count to the score of the officers matching `query`,
+        the former `_score + doc['allegation_count'].value * 3` script without running a script per hit.
+        '''
+        return Q(
+            'function_score',
+            query=Q('constant_score', filter=query),
+            field_value_factor={'field': 'allegation_count', 'factor': 3, 'missing': 0},
+            boost_mode='replace'
+        )
+
     @staticmethod
     def get_top_officers(percentile=99.0, size=40):
         query = OfficerInfoDocType.search().query(
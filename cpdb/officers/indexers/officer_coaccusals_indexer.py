@@ -11,6 +11,7 @@ from officers.doc_types import (
     OfficerCoaccusalsDocType,
 )
 from officers.index_aliases import officers_index_alias
+from officers.query_helpers.officer_updated_since import get_officer_ids_updated_since
 from officers.serializers.officer_coaccusals_serializer import OfficerCoaccusalSerializer
 
 app_name = __name__.split('.')[0]
@@ -21,23 +22,32 @@ class OfficerCoaccusalsIndexer(BaseIndexer):
     doc_type_klass = OfficerCoaccusalsDocType
     index_alias = officers_index_alias
     serializer = OfficerCoaccusalSerializer()
+    incremental = True
 
     @timing_validate('OfficerCoaccusalsIndexer: Populating coaccusal dict...')
-    def _populate_coaccusal_dict(self):
+    def _populate_coaccusal_dict(self, officer_ids=None):
+        '''
+        Count coaccusals of every officer, or only of officer_ids by loading the allegations they are accused in.
+        '''
         self._coaccusal_dict = dict()
         allegation_dict = dict()
-        for obj in OfficerAllegation.objects.all():
-            allegation_dict.setdefault(obj.allegation_id, []).append(obj.officer_id)
+        queryset = OfficerAllegation.objects.all()
+        if officer_ids is not None:
+            queryset = queryset.filter(
+                allegation_id__in=OfficerAllegation.objects.filter(officer_id__in=officer_ids).values('allegation_id')
+            )
+        for obj in queryset.values('allegation_id', 'officer_id'):
+            allegation_dict.setdefault(obj['allegation_id'], []).append(obj['officer_id'])
 
-        for officer_ids in allegation_dict.values():
-            if len(officer_ids) < 2:
+        for allegation_officer_ids in allegation_dict.values():
+            if len(allegation_officer_ids) < 2:
                 continue
-            for id_1, id_2 in itertools.permutations(officer_ids, 2):
+            for id_1, id_2 in itertools.permutations(allegation_officer_ids, 2):
                 d1 = self._coaccusal_dict.setdefault(id_1, dict())
                 d1[id_2] = d1.get(id_2, 0) + 1
 
     @timing_validate('OfficerCoaccusalsIndexer: Populating officers dict...')
-    def _populate_officers_dict(self):
+    def _populate_officers_dict(self, officer_ids=None):
         self._officer_dict = dict()
         allegation_count = OfficerAllegation.objects.filter(
             officer=models.OuterRef('id')
@@ -46,7 +56,10 @@ class OfficerCoaccusalsIndexer(BaseIndexer):
             officer=models.OuterRef('id'),
             final_finding='SU'
         )
-        queryset = Officer.objects.all()\
+        queryset = Officer.objects.all()
+        if officer_ids is not None:
+            queryset = queryset.filter(id__in=officer_ids)
+        queryset = queryset\
             .annotate(complaint_count=SQCount(allegation_count.values('id')))\
             .annotate(sustained_complaint_count=SQCount(sustained_count.values('id')))
         for officer in queryset:
@@ -57,6 +70,15 @@ class OfficerCoaccusalsIndexer(BaseIndexer):
         self._populate_officers_dict()
         return Officer.objects.all()
 
+    def get_updated_queryset(self, since):
+        officer_ids = list(get_officer_ids_updated_since(since))
+        self._populate_coaccusal_dict(officer_ids)
+        coaccused_ids = set(itertools.chain.from_iterable(
+            self._coaccusal_dict.get(officer_id, dict()).keys() for officer_id in officer_ids
+        ))
+        self._populate_officers_dict(coaccused_ids)
+        return Officer.objects.filter(id__in=officer_ids)
+
     def extract_datum(self, officer):
         return {
             'id': officer.id,
@@ -4,10 +4,7 @@ from django.db import models
 from django.contrib.postgres.aggregates import ArrayAgg
 
 from data import officer_percentile
-from data.constants import (
-    MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR,
-    PERCENTILE_TRR_GROUP, PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP, PERCENTILE_ALLEGATION_GROUP
-)
+from data.constants import MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR
 from data.models import (
     Officer, Award, OfficerAllegation, Complainant, Allegation, OfficerHistory,
     OfficerBadgeNumber, Salary
@@ -19,6 +16,7 @@ from es_index.indexers import BaseIndexer
 from es_index.serializers import get_gender, get_age_range
 from officers.doc_types import OfficerInfoDocType
 from officers.index_aliases import officers_index_alias
+from officers.query_helpers.officer_updated_since import get_officer_ids_updated_since
 from officers.serializers.officer_serializer import OfficerSerializer
 from trr.models import TRR
 
@@ -30,11 +28,7 @@ class OfficersIndexer(BaseIndexer):
     doc_type_klass = OfficerInfoDocType
     index_alias = officers_index_alias
     serializer = OfficerSerializer()
-    percentile_groups = [
-        PERCENTILE_ALLEGATION_GROUP,
-        PERCENTILE_ALLEGATION_INTERNAL_CIVILIAN_GROUP,
-        PERCENTILE_TRR_GROUP
-    ]
+    incremental = True
 
     def __del__(self):
         del self.allegation_dict
@@ -45,39 +39,51 @@ class OfficersIndexer(BaseIndexer):
         del self.badgenumber_dict
         del self.salary_dict
 
+    @staticmethod
+    def filter_ids(queryset, ids, field='officer_id'):
+        '''
+        Restrict a preload queryset to the rows whose `field` is in ids, or keep every row when ids is None.
+        '''
+        if ids is None:
+            return queryset
+        return queryset.filter(**{f'{field}__in': ids})
+
     @timing_validate('OfficersIndexer: Preparing percentile data...')
-    def populate_top_percentile_dict(self):
+    def populate_top_percentile_dict(self, officer_ids=None):
         self.yearly_top_percentile = dict()
-        for yr in range(MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR + 1):
-            for officer in officer_percentile.top_percentile(yr, percentile_groups=self.percentile_groups):
-                if officer.resignation_date and yr > officer.resignation_date.year:
-                    continue
-                officer_list = self.yearly_top_percentile.setdefault(officer.id, [])
-                officer_dict = {
-                    'id': officer.id,
-                    'year': yr
-                }
-                for attr in [
-                        'percentile_trr',
-                        'percentile_allegation',
-                        'percentile_allegation_civilian',
-                        'percentile_allegation_internal']:
-                    if hasattr(officer, attr):
-                        officer_dict[attr] = f'{getattr(officer, attr):.4f}'
-                officer_list.append(officer_dict)
-
-    def get_complainant_dict(self):
+        yearly_percentiles = officer_percentile.load_yearly_top_percentile(
+            range(MIN_VISUAL_TOKEN_YEAR, MAX_VISUAL_TOKEN_YEAR + 1), officer_ids=officer_ids
+        )
+        for yearly_percentile in yearly_percentiles:
+            officer_list = self.yearly_top_percentile.setdefault(yearly_percentile.officer_id, [])
+            officer_dict = {
+                'id': yearly_percentile.officer_id,
+                'year': yearly_percentile.year
+            }
+            for attr in [
+                    'percentile_trr',
+                    'percentile_allegation',
+                    'percentile_allegation_civilian',
+                    'percentile_allegation_internal']:
+                value = getattr(yearly_percentile, attr)
+                if value is not None:
+                    officer_dict[attr] = f'{value:.4f}'
+            officer_list.append(officer_dict)
+
+    def get_complainant_dict(self, crids=None):
         complainant_dict = dict()
-        complainant_queryset = Complainant.objects.all().values(
+        complainant_queryset = self.filter_ids(Complainant.objects.all(), crids, 'allegation_id').values(
             'allegation_id', 'gender', 'race', 'age'
         )
         for obj in complainant_queryset:
             complainant_dict.setdefault(obj['allegation_id'], []).append(obj)
         return complainant_dict
 
-    def get_officer_allegation_dict(self):
+    def get_officer_allegation_dict(self, crids=None):
         officer_allegation_dict = dict()
-        officer_allegation_queryset = OfficerAllegation.objects.all().select_related('allegation_category').values(
+        officer_allegation_queryset = self.filter_ids(
+            OfficerAllegation.objects.all(), crids, 'allegation_id'
+        ).select_related('allegation_category').values(
             'id', 'allegation_id', 'officer_id', 'start_date', 'allegation_category__category', 'final_finding'
         )
         for obj in officer_allegation_queryset:
@@ -103,10 +109,17 @@ class OfficersIndexer(BaseIndexer):
             dict_b[officer_id_a] = dict_b.get(officer_id_a, 0) + 1
 
     @timing_validate('OfficersIndexer: Populating allegation dict...')
-    def populate_allegation_dict(self):
-        complainant_dict = self.get_complainant_dict()
-        officer_allegation_dict = self.get_officer_allegation_dict()
-        allegations = Allegation.objects.all().values('crid')
+    def populate_allegation_dict(self, officer_ids=None):
+        '''
+        With officer_ids, only the allegations of these officers are loaded, with all of their officers so that
+        the coaccusals of the given officers are complete.
+        '''
+        crids = None
+        if officer_ids is not None:
+            crids = OfficerAllegation.objects.filter(officer_id__in=officer_ids).values('allegation_id')
+        complainant_dict = self.get_complainant_dict(crids)
+        officer_allegation_dict = self.get_officer_allegation_dict(crids)
+        allegations = self.filter_ids(Allegation.objects.all(), crids, 'crid').values('crid')
         self.allegation_dict = dict()
         self.coaccusals = dict()
         for allegation in allegations:
@@ -118,53 +131,60 @@ class OfficersIndexer(BaseIndexer):
             self.populate_coaccusal(allegation)
 
     @timing_validate('OfficersIndexer: Populating award dict...')
-    def populate_award_dict(self):
+    def populate_award_dict(self, officer_ids=None):
         self.award_dict = dict()
-        queryset = Award.objects.all().values('officer_id', 'award_type')
+        queryset = self.filter_ids(Award.objects.all(), officer_ids).values('officer_id', 'award_type')
         for award in queryset:
             self.award_dict.setdefault(award['officer_id'], []).append(award)
 
     @timing_validate('OfficersIndexer: Populating history dict...')
-    def populate_history_dict(self):
+    def populate_history_dict(self, officer_ids=None):
         self.history_dict = dict()
-        queryset = OfficerHistory.objects.all().select_related('unit').values(
+        queryset = self.filter_ids(OfficerHistory.objects.all(), officer_ids).select_related('unit').values(
             'officer_id', 'unit_id', 'unit__unit_name', 'unit__description', 'end_date', 'effective_date'
         )
         for obj in queryset:
             self.history_dict.setdefault(obj['officer_id'], []).append(obj)
 
     @timing_validate('OfficersIndexer: Populating badgenumber dict...')
-    def populate_badgenumber_dict(self):
+    def populate_badgenumber_dict(self, officer_ids=None):
         self.badgenumber_dict = dict()
-        queryset = OfficerBadgeNumber.objects.all().values(
+        queryset = self.filter_ids(OfficerBadgeNumber.objects.all(), officer_ids).values(
             'officer_id', 'star', 'current'
         )
         for obj in queryset:
             self.badgenumber_dict.setdefault(obj['officer_id'], []).append(obj)
 
     @timing_validate('OfficersIndexer: Populating salary dict...')
-    def populate_salary_dict(self):
+    def populate_salary_dict(self, officer_ids=None):
         self.salary_dict = dict()
-        queryset = Salary.objects.all().values(
+        queryset = self.filter_ids(Salary.objects.all(), officer_ids).values(
             'officer_id', 'salary', 'year'
         )
         for obj in queryset:
             self.salary_dict.setdefault(obj['officer_id'], []).append(obj)
 
     @timing_validate('OfficersIndexer: Populating tags dict...')
-    def populate_tags_dict(self):
+    def populate_tags_dict(self, officer_ids=None):
         self.tags_dict = dict()
-        for officer in Officer.objects.exclude(tags__isnull=True).prefetch_related('tags'):
+        officers = self.filter_ids(Officer.objects.exclude(tags__isnull=True), officer_ids, 'id')
+        for officer in officers.prefetch_related('tags'):
             self.tags_dict[officer.id] = [tag.name for tag in officer.tags.all()]
 
+    def populate_dicts(self, officer_ids=None):
+        self.populate_top_percentile_dict(officer_ids)
+        self.populate_allegation_dict(officer_ids)
+        self.populate_award_dict(officer_ids)
+        self.populate_history_dict(officer_ids)
+        self.populate_badgenumber_dict(officer_ids)
+        self.populate_salary_dict(officer_ids)
+        self.populate_tags_dict(officer_ids)
+
     def get_queryset(self):
-        self.populate_top_percentile_dict()
-        self.populate_allegation_dict()
-        self.populate_award_dict()
-        self.populate_history_dict()
-        self.populate_badgenumber_dict()
-        self.populate_salary_dict()
-        self.populate_tags_dict()
+        self.populate_dicts()
+        return self.annotate_officers(Officer.objects.all())
+
+    def annotate_officers(self, queryset):
         allegation_count = OfficerAllegation.objects.filter(
             officer=models.OuterRef('id')
         )
@@ -183,7 +203,7 @@ class OfficersIndexer(BaseIndexer):
         trr_count = TRR.objects.filter(
             officer=models.OuterRef('id')
         )
-        return Officer.objects.all()\
+        return queryset\
             .annotate(complaint_count=SQCount(allegation_count.values('id')))\
             .annotate(sustained_complaint_count=SQCount(sustained_count.values('id')))\
             .annotate(discipline_complaint_count=SQCount(discipline_count.values('id')))\
@@ -192,6 +212,11 @@ class OfficersIndexer(BaseIndexer):
             .annotate(trr_datetimes=ArrayAgg('trr__trr_datetime'))\
             .annotate(cr_incident_dates=ArrayAgg('officerallegation__allegation__incident_date'))
 
+    def get_updated_queryset(self, since):
+        officer_ids = list(get_officer_ids_updated_since(since))
+        self.populate_dicts(officer_ids)
+        return self.annotate_officers(Officer.objects.filter(id__in=officer_ids))
+
     def extract_datum(self, obj):
         datum = obj.__dict__
         datum['allegations'] = self.allegation_dict.get(datum['id'], [])
@@ -1,9 +1,15 @@
-from operator import itemgetter
+import copy
+from datetime import datetime
+from itertools import accumulate
+from operator import attrgetter, itemgetter
 
-from django.db.models import Q, Subquery, OuterRef, Prefetch
-from django.db.models.functions import TruncDate
+from django.db.models import Q, Prefetch
+from django.utils import timezone
+from django.utils.functional import cached_property
 
-from data.models import OfficerHistory, Salary, Officer, AttachmentFile
+from sortedcontainers import SortedKeyList
+
+from data.models import AttachmentFile
 from data.utils.attachment_file import filter_attachments
 from officers.serializers.response_serializers import (
     CRNewTimelineSerializer,
@@ -25,6 +31,64 @@ from officers.serializers.response_mobile_serializers import (
 )
 
 
+def _to_date(d):
+    if d is not None and type(d) is datetime:
+        d = d.date()
+    return d
+
+
+def _local_date_of(field_name):
+    def local_date(obj):
+        value = getattr(obj, field_name)
+        return timezone.localdate(value) if value is not None else None
+    return local_date
+
+
+def _rank_order(salary):
+    return salary.year, salary.spp_date
+
+
+class OfficerUnitRankLookup(object):
+    '''
+    Unit and rank of one officer at any date, resolved with bisect over their sorted unit history and
+    rank changes like get_officer_unit_by_date does for the indexer.
+    '''
+    def __init__(self, officer_histories, rank_changes):
+        self.dated_histories = SortedKeyList(
+            [history for history in officer_histories if history.effective_date is not None],
+            key=attrgetter('effective_date')
+        )
+        self.undated_histories = [history for history in officer_histories if history.effective_date is None]
+        self.rank_changes = SortedKeyList(
+            [salary for salary in rank_changes if salary.spp_date is not None], key=attrgetter('spp_date')
+        )
+        # the rank at a date is the one of the latest salary year among rank changes on or before it
+        self.ranks_by_date = list(
+            accumulate(self.rank_changes, lambda latest, salary: max(latest, salary, key=_rank_order))
+        )
+
+    def unit_at(self, d):
+        d = _to_date(d)
+        if d is not None:
+            ind = self.dated_histories.bisect_key_right(d)
+            if ind > 0:
+                history = self.dated_histories[ind-1]
+                if history.end_date is None or history.end_date >= d:
+                    return history.unit
+        for history in self.undated_histories:
+            if history.end_date is None or (d is not None and history.end_date >= d):
+                return history.unit
+        return None
+
+    def rank_at(self, d):
+        d = _to_date(d)
+        if d is not None:
+            ind = self.rank_changes.bisect_key_right(d)
+            if ind > 0:
+                return self.ranks_by_date[ind-1].rank
+        return None
+
+
 class OfficerTimelineBaseQuery(object):
     cr_new_timeline_serializer = None
     unit_change_new_timeline_serializer = None
@@ -37,32 +101,32 @@ class OfficerTimelineBaseQuery(object):
     def __init__(self, officer):
         self.officer = officer
 
-    def unit_subqueries(self, outer_ref_field):
-        return {
-            'unit_name': Subquery(
-                OfficerHistory.objects.filter(officer_id=self.officer.id).filter(
-                    Q(effective_date__lte=OuterRef(outer_ref_field)) | Q(effective_date__isnull=True),
-                    Q(end_date__gte=OuterRef(outer_ref_field)) | Q(end_date__isnull=True)
-                ).order_by('effective_date').values('unit__unit_name')[:1]
-            ),
-            'unit_description': Subquery(
-                OfficerHistory.objects.filter(officer_id=self.officer.id).filter(
-                    Q(effective_date__lte=OuterRef(outer_ref_field)) | Q(effective_date__isnull=True),
-                    Q(end_date__gte=OuterRef(outer_ref_field)) | Q(end_date__isnull=True)
-                ).values('unit__description')[:1]
-            )
-        }
-
-    def rank_subquery(self, outer_ref_field):
-        return {
-            'rank_name': Subquery(
-                Salary.objects.filter(
-                    officer_id=self.officer.id,
-                    rank_changed=True,
-                    spp_date__lte=OuterRef(outer_ref_field),
-                ).order_by('-year', '-spp_date').values('rank')[:1]
-            )
-        }
+    @cached_property
+    def _officer_histories(self):
+        return list(self.officer.officerhistory_set.select_related('unit').order_by('effective_date'))
+
+    @cached_property
+    def _rank_changes(self):
+        return list(self.officer.salary_set.filter(rank_changed=True).order_by('year'))
+
+    @cached_property
+    def _unit_rank_lookup(self):
+        return OfficerUnitRankLookup(self._officer_histories, self._rank_changes)
+
+    def _with_unit(self, items, get_date):
+        for item in items:
+            unit = self._unit_rank_lookup.unit_at(get_date(item))
+            item.unit_name = unit.unit_name if unit else None
+            item.unit_description = unit.description if unit else None
+        return items
+
+    def _with_rank(self, items, get_date):
+        for item in items:
+            item.rank_name = self._unit_rank_lookup.rank_at(get_date(item))
+        return items
+
+    def _with_unit_and_rank(self, items, get_date):
+        return self._with_rank(self._with_unit(items, get_date), get_date)
 
     @property
     def _cr_timeline(self):
@@ -77,38 +141,31 @@ class OfficerTimelineBaseQuery(object):
                 queryset=filter_attachments(AttachmentFile.objects),
                 to_attr='prefetch_filtered_attachments'
             )
-        ).annotate(
-            **self.unit_subqueries('allegation__incident_date')
-        ).annotate(
-            **self.rank_subquery('allegation__incident_date')
         )
+        cr_timeline = list(cr_timeline_queryset)
+        self._with_unit_and_rank(cr_timeline, attrgetter('allegation.incident_date'))
 
-        return self.cr_new_timeline_serializer(cr_timeline_queryset, many=True).data
+        return self.cr_new_timeline_serializer(cr_timeline, many=True).data
 
     @property
     def _unit_change_timeline(self):
-        unit_change_timeline_queryset = self.officer.officerhistory_set.filter(
-            effective_date__isnull=False,
-        ).exclude(
-            effective_date=self.officer.appointed_date
-        ).order_by('effective_date').select_related('unit').annotate(
-            **self.rank_subquery('effective_date')
-        )
+        unit_change_timeline = [
+            history for history in self._officer_histories
+            if history.effective_date is not None and history.effective_date != self.officer.appointed_date
+        ]
+        self._with_rank(unit_change_timeline, attrgetter('effective_date'))
 
         return self.unit_change_new_timeline_serializer(
-            unit_change_timeline_queryset,
+            unit_change_timeline,
             many=True
         ).data
 
     @property
     def _rank_change_timeline(self):
-        salary_timeline = self.officer.salary_set.filter(
-            rank_changed=True
-        ).exclude(
-            spp_date=self.officer.appointed_date
-        ).order_by('year').annotate(
-            **self.unit_subqueries('spp_date')
-        )
+        salary_timeline = [
+            salary for salary in self._rank_changes if salary.spp_date != self.officer.appointed_date
+        ]
+        self._with_unit(salary_timeline, attrgetter('spp_date'))
 
         return self.rank_change_new_timeline_serializer(
             salary_timeline, many=True
@@ -117,52 +174,36 @@ class OfficerTimelineBaseQuery(object):
     @property
     def _join_timeline(self):
         if self.officer.appointed_date:
-            joined_timeline_query = Officer.objects.filter(id=self.officer.id).annotate(
-                **self.unit_subqueries('appointed_date')
-            ).annotate(
-                **self.rank_subquery('appointed_date')
-            )[:1]
-            return self.joined_new_timeline_serializer(joined_timeline_query, many=True).data
+            joined_timeline = [copy.copy(self.officer)]
+            self._with_unit_and_rank(joined_timeline, attrgetter('appointed_date'))
+            return self.joined_new_timeline_serializer(joined_timeline, many=True).data
         else:
             return []
 
     @property
     def _award_timeline(self):
-        award_timeline_queryset = self.officer.award_set.filter(
+        award_timeline = list(self.officer.award_set.filter(
             Q(start_date__isnull=False),
             ~Q(award_type__contains='Honorable Mention'),
             ~Q(award_type__in=['Complimentary Letter', 'Department Commendation'])
-        ).annotate(
-            **self.unit_subqueries('start_date')
-        ).annotate(
-            **self.rank_subquery('start_date')
-        )
-        return self.award_new_timeline_serializer(award_timeline_queryset, many=True).data
+        ))
+        self._with_unit_and_rank(award_timeline, attrgetter('start_date'))
+        return self.award_new_timeline_serializer(award_timeline, many=True).data
 
     @property
     def _trr_timeline(self):
-        trr_timeline_queryset = self.officer.trr_set.all().annotate(
-            trr_date=TruncDate('trr_datetime')
-        ).annotate(
-            **self.unit_subqueries('trr_date')
-        ).annotate(
-            **self.rank_subquery('trr_date')
-        )
-        return self.trr_new_timeline_serializer(trr_timeline_queryset, many=True).data
+        trr_timeline = list(self.officer.trr_set.all())
+        self._with_unit_and_rank(trr_timeline, _local_date_of('trr_datetime'))
+        return self.trr_new_timeline_serializer(trr_timeline, many=True).data
 
     @property
     def _lawsuit_timeline(self):
-        lawsuit_timeline = self.officer.lawsuits.filter(
+        lawsuit_timeline = list(self.officer.lawsuits.filter(
             incident_date__isnull=False,
         ).prefetch_related(
             'attachment_files',
-        ).annotate(
-            date=TruncDate('incident_date')
-        ).annotate(
-            **self.unit_subqueries('date')
-        ).annotate(
-            **self.rank_subquery('date')
-        )
+        ))
+        self._with_unit_and_rank(lawsuit_timeline, _local_date_of('incident_date'))
 
         return self.lawsuit_new_timeline_serializer(
             lawsuit_timeline, many=True
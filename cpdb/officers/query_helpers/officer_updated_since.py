@@ -0,0 +1,30 @@
+from data.models import (
+    Officer, OfficerAllegation, Allegation, Complainant, Award, OfficerHistory, OfficerBadgeNumber, Salary
+)
+from trr.models import TRR
+
+
+def get_officer_ids_updated_since(since):
+    '''
+    Ids of officers whose own row or any row they are indexed from changed after `since`.
+    Every officer of a changed allegation is included so that coaccusals stay in sync.
+    '''
+    officer_ids = set(Officer.objects.filter(updated_at__gt=since).values_list('id', flat=True))
+    for model in [OfficerAllegation, Award, OfficerHistory, OfficerBadgeNumber, Salary, TRR]:
+        officer_ids.update(
+            model.objects.filter(updated_at__gt=since, officer_id__isnull=False).values_list('officer_id', flat=True)
+        )
+
+    allegation_ids = set(Allegation.objects.filter(updated_at__gt=since).values_list('crid', flat=True))
+    for model in [OfficerAllegation, Complainant]:
+        allegation_ids.update(
+            model.objects.filter(updated_at__gt=since, allegation_id__isnull=False).values_list(
+                'allegation_id', flat=True
+            )
+        )
+    officer_ids.update(
+        OfficerAllegation.objects.filter(
+            allegation_id__in=allegation_ids, officer_id__isnull=False
+        ).values_list('officer_id', flat=True)
+    )
+    return officer_ids
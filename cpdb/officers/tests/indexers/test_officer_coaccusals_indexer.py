@@ -2,6 +2,7 @@ from datetime import datetime, date
 
 from django.test import TestCase
 
+from mock import Mock, patch
 from robber import expect
 import pytz
 
@@ -116,3 +117,31 @@ class OfficerCoaccusalsIndexerTestCase(TestCase):
             'id': 3232,
             'coaccusals': []
         })
+
+    def test_get_updated_queryset_preloads_only_updated_officers_and_coaccused(self):
+        officer = OfficerFactory(id=1101)
+        coaccused_officer = OfficerFactory(id=1102)
+        other_officer = OfficerFactory(id=1103)
+        unrelated_officer = OfficerFactory(id=1104)
+        allegation = AllegationFactory()
+        other_allegation = AllegationFactory()
+        OfficerAllegationFactory(officer=officer, allegation=allegation)
+        OfficerAllegationFactory(officer=coaccused_officer, allegation=allegation)
+        OfficerAllegationFactory(officer=coaccused_officer, allegation=other_allegation)
+        OfficerAllegationFactory(officer=other_officer, allegation=other_allegation)
+        OfficerAllegationFactory(officer=unrelated_officer)
+
+        indexer = OfficerCoaccusalsIndexer()
+        with patch(
+            'officers.indexers.officer_coaccusals_indexer.get_officer_ids_updated_since',
+            Mock(return_value={1101})
+        ):
+            officers = list(indexer.get_updated_queryset(datetime(2020, 2, 1, tzinfo=pytz.utc)))
+
+        expect([officer.id for officer in officers]).to.eq([1101])
+        expect(indexer._coaccusal_dict).to.eq({1101: {1102: 1}, 1102: {1101: 1}})
+        expect(set(indexer._officer_dict.keys())).to.eq({1102})
+
+        row = indexer.extract_datum(officers[0])
+        expect([coaccusal['id'] for coaccusal in row['coaccusals']]).to.eq([1102])
+        expect(row['coaccusals'][0]['allegation_count']).to.eq(2)
@@ -26,7 +26,7 @@ class OfficersIndexerTestCase(TestCase):
 
     @override_settings(V1_URL='http://test.com')
     @patch(
-        'officers.indexers.officers_indexer.officer_percentile.top_percentile',
+        'officers.indexers.officers_indexer.officer_percentile.yearly_top_percentile',
         Mock(return_value=[])
     )
     def test_extract_info(self):
@@ -411,6 +411,35 @@ class OfficersIndexerTestCase(TestCase):
             }
         ])
 
+    @patch(
+        'officers.indexers.officers_indexer.officer_percentile.yearly_top_percentile',
+        Mock(return_value=[])
+    )
+    def test_get_updated_queryset_preloads_only_updated_officers(self):
+        officer = OfficerFactory(id=1101)
+        other_officer = OfficerFactory(id=1102)
+        not_updated_officer = OfficerFactory(id=1103)
+        allegation = AllegationFactory()
+        OfficerAllegationFactory(officer=officer, allegation=allegation)
+        OfficerAllegationFactory(officer=other_officer, allegation=allegation)
+        OfficerAllegationFactory(officer=not_updated_officer)
+        AwardFactory(officer=officer, award_type='Honorable Mention')
+        AwardFactory(officer=not_updated_officer, award_type='Honorable Mention')
+        SalaryFactory(officer=not_updated_officer)
+
+        indexer = OfficersIndexer()
+        with patch(
+            'officers.indexers.officers_indexer.get_officer_ids_updated_since',
+            Mock(return_value={1101})
+        ):
+            officers = list(indexer.get_updated_queryset(datetime(2020, 2, 1, tzinfo=pytz.utc)))
+
+        expect([officer.id for officer in officers]).to.eq([1101])
+        expect(set(indexer.allegation_dict.keys())).to.eq({1101, 1102})
+        expect(indexer.coaccusals).to.eq({1101: {1102: 1}, 1102: {1101: 1}})
+        expect(set(indexer.award_dict.keys())).to.eq({1101})
+        expect(indexer.salary_dict).to.eq({})
+
     # @override_settings(ALLEGATION_MIN='1988-01-01')
     # @override_settings(ALLEGATION_MAX='2016-07-01')
     # @override_settings(INTERNAL_CIVILIAN_ALLEGATION_MIN='2000-01-01')
@@ -519,7 +548,7 @@ class OfficersIndexerTestCase(TestCase):
     # @patch('officers.indexers.officers_indexer.MIN_VISUAL_TOKEN_YEAR', 2016)
     # @patch('officers.indexers.officers_indexer.MAX_VISUAL_TOKEN_YEAR', 2016)
     # @patch(
-    #     'officers.indexers.officers_indexer.officer_percentile.top_percentile',
+    #     'officers.indexers.officers_indexer.officer_percentile.yearly_top_percentile',
     #     Mock(return_value=[Mock(
     #         spec=[
     #             'id',
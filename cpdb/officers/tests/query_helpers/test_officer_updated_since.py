@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from django.test import TestCase
+
+import pytz
+from freezegun import freeze_time
+from robber import expect
+
+from data.factories import OfficerFactory, AllegationFactory, OfficerAllegationFactory, AwardFactory
+from officers.query_helpers.officer_updated_since import get_officer_ids_updated_since
+
+
+class OfficerUpdatedSinceTestCase(TestCase):
+    def test_get_officer_ids_updated_since(self):
+        with freeze_time(datetime(2020, 1, 1, tzinfo=pytz.utc)):
+            officer_1 = OfficerFactory(id=1)
+            officer_2 = OfficerFactory(id=2)
+            officer_3 = OfficerFactory(id=3)
+            officer_4 = OfficerFactory(id=4)
+            OfficerFactory(id=5)
+            allegation = AllegationFactory(crid='123')
+            OfficerAllegationFactory(officer=officer_3, allegation=allegation)
+
+        with freeze_time(datetime(2020, 3, 1, tzinfo=pytz.utc)):
+            officer_1.first_name = 'Jerome'
+            officer_1.save()
+            AwardFactory(officer=officer_2)
+            OfficerAllegationFactory(officer=officer_4, allegation=allegation)
+
+        expect(
+            get_officer_ids_updated_since(datetime(2020, 2, 1, tzinfo=pytz.utc))
+        ).to.eq({1, 2, 3, 4})
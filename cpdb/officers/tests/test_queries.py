@@ -2,7 +2,7 @@ import pytz
 from datetime import date, datetime
 from operator import attrgetter
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
 from mock import patch, Mock, PropertyMock
 from robber import expect
@@ -11,10 +11,43 @@ from data.factories import (
     OfficerFactory, OfficerAllegationFactory, PoliceUnitFactory, OfficerHistoryFactory, SalaryFactory,
     AwardFactory)
 from lawsuit.factories import LawsuitFactory
-from officers.queries import OfficerTimelineQuery
+from officers.queries import OfficerTimelineQuery, OfficerUnitRankLookup
 from trr.factories import TRRFactory
 
 
+class OfficerUnitRankLookupTestCase(SimpleTestCase):
+    def test_unit_at(self):
+        unit_1 = Mock(unit_name='001')
+        unit_2 = Mock(unit_name='002')
+        unit_3 = Mock(unit_name='003')
+        lookup = OfficerUnitRankLookup([
+            Mock(unit=unit_2, effective_date=date(2003, 1, 3), end_date=None),
+            Mock(unit=unit_1, effective_date=date(2002, 1, 3), end_date=date(2002, 12, 31)),
+            Mock(unit=unit_3, effective_date=None, end_date=date(2001, 12, 31)),
+        ], [])
+
+        expect(lookup.unit_at(date(2001, 6, 1))).to.eq(unit_3)
+        expect(lookup.unit_at(date(2002, 1, 3))).to.eq(unit_1)
+        expect(lookup.unit_at(datetime(2002, 12, 31, 10, tzinfo=pytz.utc))).to.eq(unit_1)
+        expect(lookup.unit_at(date(2003, 1, 2))).to.be.none()
+        expect(lookup.unit_at(date(2020, 1, 1))).to.eq(unit_2)
+        expect(lookup.unit_at(None)).to.be.none()
+
+    def test_rank_at(self):
+        lookup = OfficerUnitRankLookup([], [
+            Mock(rank='Police Officer', year=2001, spp_date=date(2001, 5, 3)),
+            Mock(rank='Sergeant', year=2003, spp_date=date(2002, 1, 1)),
+            Mock(rank='Senior Police Officer', year=2002, spp_date=date(2002, 5, 3)),
+            Mock(rank='No Date', year=2004, spp_date=None),
+        ])
+
+        expect(lookup.rank_at(date(2001, 5, 2))).to.be.none()
+        expect(lookup.rank_at(date(2001, 5, 3))).to.eq('Police Officer')
+        expect(lookup.rank_at(datetime(2002, 1, 1, 10, tzinfo=pytz.utc))).to.eq('Sergeant')
+        expect(lookup.rank_at(date(2010, 1, 1))).to.eq('Sergeant')
+        expect(lookup.rank_at(None)).to.be.none()
+
+
 class OfficerTimelineQueryTestCase(TestCase):
     @patch(
         'officers.queries.OfficerTimelineQuery.cr_new_timeline_serializer',
@@ -27,7 +27,7 @@ from lawsuit.factories import LawsuitFactory, PaymentFactory
 from officers.tests.mixins import OfficerSummaryTestCaseMixin
 from analytics.models import AttachmentTracking
 from analytics import constants
-from data.cache_managers import officer_cache_manager, allegation_cache_manager
+from data.cache_managers import officer_cache_manager, allegation_cache_manager, officer_coaccusal_cache_manager
 from lawsuit.cache_managers import lawsuit_cache_manager
 from data import cache_managers
 
@@ -634,6 +634,7 @@ class OfficersViewSetTestCase(OfficerSummaryTestCaseMixin, APITestCase):
             'coaccusal_count': 1,
             'rank': 'Police Officer',
         }]
+        officer_coaccusal_cache_manager.cache_data()
         response = self.client.get(reverse('api-v2:officers-coaccusals', kwargs={'pk': officer1.id}))
         expect(response.status_code).to.eq(status.HTTP_200_OK)
         expect(response.data).to.eq(expected_response_data)
@@ -707,6 +708,7 @@ class OfficersViewSetTestCase(OfficerSummaryTestCaseMixin, APITestCase):
         OfficerAllegationFactory(officer=officer, allegation=allegation)
         OfficerAllegationFactory(officer=coaccused, allegation=allegation)
 
+        officer_coaccusal_cache_manager.cache_data()
         response = self.client.get(reverse('api-v2:officers-coaccusals', kwargs={'pk': 123}))
         expect(response.status_code).to.eq(status.HTTP_200_OK)
         expect(response.data[0]['id']).to.eq(333)
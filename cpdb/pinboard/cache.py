@@ -0,0 +1,43 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+DATA_VERSION_KEY = 'pinboard:data-version'
+
+
+def data_version():
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def invalidate():
+    '''
+    Drop every cached pinboard computation, e.g. when a data import finished.
+    Old entries are not deleted, they are unreachable under the new data version and expire on their own.
+    '''
+    cache.set(DATA_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def cache_key(pinboard, name, *variant):
+    return ':'.join(['pinboard', str(data_version()), pinboard.content_hash, name] + [str(part) for part in variant])
+
+
+def get_or_compute(pinboard, name, compute, *variant):
+    '''
+    Return the result of `compute` for the content of the pinboard, computing it only on a cache miss.
+    Pinboards with the same officers, complaints and TRRs share entries, so shared or duplicated pinboards are
+    computed once, and editing a pinboard moves it to new entries.
+    :param name: name of the computation
+    :param compute: callable returning a picklable result
+    :param variant: extra key parts the result depends on, e.g. serializer or page
+    '''
+    key = cache_key(pinboard, name, *variant)
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result, settings.PINBOARD_CACHE_TIMEOUT)
+    return result
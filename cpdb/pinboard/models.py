@@ -1,15 +1,20 @@
+import hashlib
+import json
 import re
 from random import sample
 
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.gis.db import models
-from django.db.models import Q, Count, Prefetch, Value, IntegerField, F
+from django.db.models import Q, Count, Prefetch, Value, IntegerField, F, OuterRef, Subquery, Case, When
+from django.db.models.functions import Coalesce
 from django.utils.functional import cached_property
 
 from sortedm2m.fields import SortedManyToManyField
 
 from data.constants import MEDIA_TYPE_DOCUMENT
-from data.models import Officer, AttachmentFile, OfficerAllegation, Allegation
+from data.models import (
+    Officer, AttachmentFile, OfficerAllegation, Allegation, OfficerCoaccusal, InvestigatorAllegation, PoliceWitness
+)
 from data.models.common import TimeStampsModel
 from pinboard.fields import HexField
 from pinboard.constants import PINBOARD_TITLE_DUPLICATE_PATTERN
@@ -103,6 +108,11 @@ class Pinboard(TimeStampsModel):
     def trr_ids(self):
         return list(self.trrs.values_list('id', flat=True))
 
+    @cached_property
+    def content_hash(self):
+        content = json.dumps([sorted(self.officer_ids), sorted(self.crids), sorted(self.trr_ids)])
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
     def relevant_documents_query(self, **kwargs):
         return AttachmentFile.objects.showing().filter(
             file_type=MEDIA_TYPE_DOCUMENT,
@@ -143,7 +153,7 @@ class Pinboard(TimeStampsModel):
     def relevant_coaccusals(self):
         officer_ids = self.officers.all().values_list('id', flat=True)
         crids = self.allegations.all().values_list('crid', flat=True)
-        trr_officer_ids = self.trrs.all().values_list('officer_id', flat=True).distinct()
+        trr_officer_ids = self.trrs.all().values_list('officer_id', flat=True)
 
         columns = [
             'id',
@@ -156,7 +166,6 @@ class Pinboard(TimeStampsModel):
             'gender',
             'birth_year',
             'race',
-            'rank',
             'trr_percentile',
             'complaint_percentile',
             'civilian_allegation_percentile',
@@ -172,51 +181,35 @@ class Pinboard(TimeStampsModel):
             'civilian_compliment_count'
         ]
 
-        related_renamed_columns = (
-            ('unit_id', 'last_unit__id'),
-            ('unit_name', 'last_unit__unit_name'),
-            ('unit_description', 'last_unit__description')
-        )
-
-        content_columns = columns + [col[1] for col in related_renamed_columns]
-        officer_qs = Officer.objects.annotate(**{
-            annotated_column: F(column) for annotated_column, column in related_renamed_columns
-        })
-
-        via_officer = officer_qs.filter(
-            officerallegation__allegation__officerallegation__officer_id__in=officer_ids
-        ).exclude(id__in=officer_ids).only(*content_columns).annotate(
-            sub_coaccusal_count=Count('officerallegation', distinct=True)
-        )
-
-        via_allegation = officer_qs.filter(
-            officerallegation__allegation__in=crids
-        ).exclude(id__in=officer_ids).only(*content_columns).annotate(
-            sub_coaccusal_count=Count('officerallegation', distinct=True)
-        )
+        via_officer_edges = OfficerCoaccusal.objects.filter(officer_b__in=officer_ids)
+        via_allegation_officer_allegations = OfficerAllegation.objects.filter(allegation__in=crids)
 
-        via_trr = officer_qs.filter(
-            id__in=trr_officer_ids
-        ).exclude(id__in=officer_ids).only(*content_columns).annotate(
-            sub_coaccusal_count=Value(1, output_field=IntegerField())
-        )
-        sub_query = via_officer.union(via_allegation, all=True).union(via_trr, all=True)
+        pinned_officer_crids = OfficerAllegation.objects.filter(officer__in=officer_ids).values('allegation')
 
-        select_columns = ', '.join(
-            [f'"{col}"' for col in columns] +
-            [f'"{col[0]}"' for col in related_renamed_columns]
+        via_officer_count = OfficerAllegation.objects.filter(
+            officer=OuterRef('id'), allegation__in=pinned_officer_crids
+        ).values('officer').annotate(count=Count('allegation', distinct=True)).values('count')
+        via_allegation_count = via_allegation_officer_allegations.filter(
+            officer=OuterRef('id')
+        ).values('officer').annotate(count=Count('id')).values('count')
+        via_trr_count = Case(
+            When(id__in=trr_officer_ids, then=Value(1)), default=Value(0), output_field=IntegerField()
         )
 
-        raw_query = f'''
-            WITH cte AS ({sub_query.query})
-            SELECT {select_columns},
-                SUM("sub_coaccusal_count") "coaccusal_count"
-            FROM cte
-            GROUP BY {select_columns}
-            ORDER BY "coaccusal_count" DESC
-        '''
-        query = Officer.objects.raw(raw_query)
-        return query
+        return Officer.objects.filter(
+            Q(id__in=via_officer_edges.values('officer_a')) |
+            Q(id__in=via_allegation_officer_allegations.values('officer')) |
+            Q(id__in=trr_officer_ids)
+        ).exclude(id__in=officer_ids).only(*columns).annotate(
+            unit_id=F('last_unit__id'),
+            unit_name=F('last_unit__unit_name'),
+            unit_description=F('last_unit__description'),
+            coaccusal_count=(
+                Coalesce(Subquery(via_officer_count, output_field=IntegerField()), 0) +
+                Coalesce(Subquery(via_allegation_count, output_field=IntegerField()), 0) +
+                via_trr_count
+            )
+        ).order_by('-coaccusal_count', 'id')
 
     def relevant_complaints_query(self, **kwargs):
         crids = self.allegations.all().values_list('crid', flat=True)
@@ -244,40 +237,32 @@ class Pinboard(TimeStampsModel):
             'victims'
         )
 
-    def relevant_complaints_count_query(self, **kwargs):
-        crids = self.allegations.all().values_list('crid', flat=True)
-        return Allegation.objects.filter(**kwargs).exclude(crid__in=crids).only('crid')
-
     @property
-    def relevant_complaints_count(self):
-        officer_ids = self.officers.all().values_list('id', flat=True)
-        via_officer = self.relevant_complaints_count_query(
-            officerallegation__officer__in=officer_ids
-        )
-        via_investigator = self.relevant_complaints_count_query(
-            investigatorallegation__investigator__officer__in=officer_ids
+    def relevant_complaint_crids(self):
+        '''
+        Crids of the not pinned complaints in which pinned officers are accused, investigators or police witnesses,
+        newest first. Collected by one query over the allegation_id of the officer tables, without hydrating
+        any allegation.
+        '''
+        officer_ids = self.officer_ids
+        if not officer_ids:
+            return []
+        related_crids = (
+            Q(crid__in=OfficerAllegation.objects.filter(officer_id__in=officer_ids).values('allegation_id')) |
+            Q(crid__in=InvestigatorAllegation.objects.filter(
+                investigator__officer_id__in=officer_ids
+            ).values('allegation_id')) |
+            Q(crid__in=PoliceWitness.objects.filter(officer_id__in=officer_ids).values('allegation_id'))
         )
-        via_police_witness = self.relevant_complaints_count_query(
-            police_witnesses__in=officer_ids
+        return list(
+            Allegation.objects.filter(related_crids).exclude(
+                crid__in=self.crids
+            ).order_by('-incident_date', 'crid').values_list('crid', flat=True)
         )
-        return via_officer.union(via_investigator, via_police_witness).distinct().count
 
-    @property
-    def relevant_complaints(self):
-        officer_ids = self.officers.all().values_list('id', flat=True)
-        via_officer = self.relevant_complaints_query(
-            officerallegation__officer__in=officer_ids
-        )
-        via_investigator = self.relevant_complaints_query(
-            investigatorallegation__investigator__officer__in=officer_ids
-        )
-        via_police_witness = self.relevant_complaints_query(
-            police_witnesses__in=officer_ids
-        )
-        query = via_officer.union(via_investigator, via_police_witness).distinct().order_by('-incident_date')
-        # LimitOffsetPagination need count and we optimize it with a more simple query
-        setattr(query, 'count', self.relevant_complaints_count)
-        return query
+    def relevant_complaints_by_crids(self, crids):
+        allegations = self.relevant_complaints_query().in_bulk(crids)
+        return [allegations[crid] for crid in crids if crid in allegations]
 
 
 class ExamplePinboard(TimeStampsModel):
@@ -0,0 +1,43 @@
+from rest_framework.exceptions import NotFound
+
+from es_index.pagination import ESBasePagination
+
+
+class KeysetListPagination(ESBasePagination):
+    '''
+    Paginate an ordered list of keys, by limit/offset or by keyset when the `cursor` query param is given
+    (empty for the first page), with the same cursor format and links as Elasticsearch cursor pagination.
+    The cursor holds the last key of the page so following pages stay put when keys are added or removed.
+    Only the keys of the page are hydrated into objects.
+    '''
+    def paginate_keys(self, keys, hydrate, request):
+        '''
+        :param keys: ordered list of keys, e.g. primary keys
+        :param hydrate: callable taking the keys of the page and returning their objects in the same order
+        '''
+        self.limit = self.get_limit(request)
+        self.request = request
+        self.count = len(keys)
+        self.cursor = request.query_params.get(self.cursor_query_param)
+
+        if self.cursor is None:
+            self.offset = self.get_offset(request)
+        elif self.cursor:
+            self.offset = self.key_position(keys, self.decode_cursor(self.cursor)) + 1
+        else:
+            self.offset = 0
+
+        page_keys = keys[self.offset:self.offset + self.limit]
+        has_next = self.offset + self.limit < self.count
+        self.next_cursor = self.encode_cursor(page_keys[-1:]) if page_keys and has_next else None
+
+        if not page_keys:
+            return []
+        return hydrate(page_keys)
+
+    def key_position(self, keys, cursor_keys):
+        try:
+            [last_key] = cursor_keys
+            return keys.index(last_key)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
@@ -1,7 +1,9 @@
-from django.db.models import Count, Q, F
+from collections import defaultdict
 
-from data.models import Allegation, OfficerAllegation, Complainant
-from trr.models import ActionResponse
+from django.db import connection
+
+from data.models import AllegationCategory, Complainant, Officer, OfficerAllegation
+from trr.models import ActionResponse, TRR
 
 
 DISPLAYED_RACES = ['Black', 'White', 'Hispanic']
@@ -41,52 +43,104 @@ class BaseSummaryQuery(object):
         raise NotImplementedError
 
 
+class PinboardSummaryQuery(BaseSummaryQuery):
+    '''
+    Compute complaint, TRR, officers and complainants summaries of a pinboard in one round trip.
+    The officer set of the pinboard is resolved once in a CTE and shared by every aggregate.
+    '''
+    def _rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                WITH pinboard_officers AS (
+                    SELECT officer_id FROM {OfficerAllegation._meta.db_table}
+                    WHERE allegation_id = ANY(%(crids)s) AND officer_id IS NOT NULL
+                    UNION
+                    SELECT officer_id FROM {TRR._meta.db_table}
+                    WHERE id = ANY(%(trr_ids)s) AND officer_id IS NOT NULL
+                    UNION
+                    SELECT id FROM {Officer._meta.db_table} WHERE id = ANY(%(officer_ids)s)
+                ), pinboard_allegations AS (
+                    SELECT UNNEST(%(crids)s::varchar[]) AS crid
+                    UNION
+                    SELECT allegation_id FROM {OfficerAllegation._meta.db_table}
+                    WHERE officer_id IN (SELECT officer_id FROM pinboard_officers)
+                )
+                SELECT 'complaint', category.category, COUNT(*)
+                FROM {OfficerAllegation._meta.db_table} AS officer_allegation
+                LEFT OUTER JOIN {AllegationCategory._meta.db_table} AS category
+                    ON category.id = officer_allegation.allegation_category_id
+                WHERE officer_allegation.officer_id IN (SELECT officer_id FROM pinboard_officers)
+                GROUP BY category.category
+                UNION ALL
+                SELECT 'trr', action_response.force_type, COUNT(*)
+                FROM {ActionResponse._meta.db_table} AS action_response
+                INNER JOIN {TRR._meta.db_table} AS trr ON trr.id = action_response.trr_id
+                WHERE trr.id = ANY(%(trr_ids)s) OR trr.officer_id IN (SELECT officer_id FROM pinboard_officers)
+                GROUP BY action_response.force_type
+                UNION ALL
+                SELECT 'officer_race', race, COUNT(*) FROM {Officer._meta.db_table}
+                WHERE id IN (SELECT officer_id FROM pinboard_officers)
+                GROUP BY race
+                UNION ALL
+                SELECT 'officer_gender', gender, COUNT(*) FROM {Officer._meta.db_table}
+                WHERE id IN (SELECT officer_id FROM pinboard_officers)
+                GROUP BY gender
+                UNION ALL
+                SELECT 'complainant_race', race, COUNT(*) FROM {Complainant._meta.db_table}
+                WHERE allegation_id IN (SELECT crid FROM pinboard_allegations)
+                GROUP BY race
+                UNION ALL
+                SELECT 'complainant_gender', gender, COUNT(*) FROM {Complainant._meta.db_table}
+                WHERE allegation_id IN (SELECT crid FROM pinboard_allegations)
+                GROUP BY gender
+                ORDER BY 3 DESC, 2
+            """, {
+                'crids': self.pinboard.crids,
+                'trr_ids': self.pinboard.trr_ids,
+                'officer_ids': self.pinboard.officer_ids,
+            })
+            return cursor.fetchall()
+
+    def _percentages(self, race_count, gender_count):
+        return {
+            'race': self._calculate_percentage(self._group_race_data(race_count)),
+            'gender': self._calculate_percentage(self._group_gender_data(gender_count))
+        }
+
+    def query(self):
+        counts = defaultdict(list)
+        for summary, name, count in self._rows():
+            counts[summary].append((name, count))
+
+        return {
+            'complaint_summary': [{'category': name, 'count': count} for name, count in counts['complaint']],
+            'trr_summary': [{'force_type': name, 'count': count} for name, count in counts['trr']],
+            'officers_summary': self._percentages(
+                [{'race': name, 'count': count} for name, count in counts['officer_race']],
+                [{'gender': name, 'count': count} for name, count in counts['officer_gender']],
+            ),
+            'complainants_summary': self._percentages(
+                [{'race': name, 'count': count} for name, count in counts['complainant_race']],
+                [{'gender': name, 'count': count} for name, count in counts['complainant_gender']],
+            ),
+        }
+
+
 class ComplaintSummaryQuery(BaseSummaryQuery):
     def query(self):
-        return OfficerAllegation.objects.filter(
-            officer_id__in=self.pinboard.all_officer_ids
-        ).annotate(
-            category=F('allegation_category__category')
-        ).values(
-            'category'
-        ).annotate(
-            count=Count('id', distinct=True)
-        ).order_by('-count')
+        return PinboardSummaryQuery(self.pinboard).query()['complaint_summary']
 
 
 class TrrSummaryQuery(BaseSummaryQuery):
     def query(self):
-        return ActionResponse.objects.filter(
-            Q(trr_id__in=self.pinboard.trr_ids) | Q(trr__officer_id__in=self.pinboard.all_officer_ids)
-        ).values(
-            'force_type'
-        ).annotate(
-            count=Count('id', distinct=True)
-        ).order_by('-count')
+        return PinboardSummaryQuery(self.pinboard).query()['trr_summary']
 
 
 class OfficersSummaryQuery(BaseSummaryQuery):
     def query(self):
-        race_count = self.pinboard.all_officers.values('race').annotate(count=Count('id'))
-        gender_count = self.pinboard.all_officers.values('gender').annotate(count=Count('id')).order_by('-count')
-        return {
-            'race': self._calculate_percentage(self._group_race_data(race_count)),
-            'gender': self._calculate_percentage(self._group_gender_data(gender_count))
-        }
+        return PinboardSummaryQuery(self.pinboard).query()['officers_summary']
 
 
 class ComplainantsSummaryQuery(BaseSummaryQuery):
-    def all_allegation_ids(self):
-        return Allegation.objects.filter(
-            Q(crid__in=self.pinboard.crids) |
-            Q(officerallegation__officer_id__in=list(self.pinboard.all_officer_ids))
-        ).distinct().values_list('crid', flat=True)
-
     def query(self):
-        all_complainants = Complainant.objects.filter(allegation_id__in=self.all_allegation_ids())
-        race_count = all_complainants.values('race').annotate(count=Count('id'))
-        gender_count = all_complainants.values('gender').annotate(count=Count('id')).order_by('-count')
-        return {
-            'race': self._calculate_percentage(self._group_race_data(race_count)),
-            'gender': self._calculate_percentage(self._group_gender_data(gender_count))
-        }
+        return PinboardSummaryQuery(self.pinboard).query()['complainants_summary']
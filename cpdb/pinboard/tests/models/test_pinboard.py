@@ -10,6 +10,7 @@ from data.factories import (
     PoliceWitnessFactory,
     AttachmentFileFactory,
 )
+from data.cache_managers import officer_coaccusal_cache_manager
 from pinboard.factories import PinboardFactory, ExamplePinboardFactory
 from trr.factories import TRRFactory
 
@@ -338,6 +339,18 @@ class PinboardTestCase(TestCase):
         pinboard.trrs.set([pinned_trr_1, pinned_trr_2])
         expect(list(pinboard.trr_ids)).to.eq([1, 2])
 
+    def test_content_hash(self):
+        officer_1 = OfficerFactory(id=1)
+        officer_2 = OfficerFactory(id=2)
+        allegation = AllegationFactory(crid='123')
+        pinboard = PinboardFactory(officers=[officer_1, officer_2], allegations=[allegation])
+        same_content_pinboard = PinboardFactory(officers=[officer_2, officer_1], allegations=[allegation])
+        other_pinboard = PinboardFactory(officers=[officer_1], allegations=[allegation])
+
+        expect(pinboard.content_hash).to.have.length(40)
+        expect(same_content_pinboard.content_hash).to.eq(pinboard.content_hash)
+        expect(other_pinboard.content_hash).to.ne(pinboard.content_hash)
+
     def test_relevant_coaccusals(self):
         pinned_officer_1 = OfficerFactory(id=1)
         pinned_officer_2 = OfficerFactory(id=2)
@@ -390,6 +403,7 @@ class PinboardTestCase(TestCase):
         OfficerAllegationFactory(allegation=pinned_allegation_2, officer=allegation_coaccusal_22)
         OfficerAllegationFactory(allegation=not_relevant_allegation, officer=allegation_coaccusal_22)
 
+        officer_coaccusal_cache_manager.cache_data()
         relevant_coaccusals = list(pinboard.relevant_coaccusals)
 
         expect(relevant_coaccusals).to.have.length(5)
@@ -403,6 +417,28 @@ class PinboardTestCase(TestCase):
         expect(relevant_coaccusals[3].coaccusal_count).to.eq(1)
         expect(relevant_coaccusals[4].coaccusal_count).to.eq(1)
 
+    def test_relevant_coaccusals_count_allegation_shared_by_pinned_officers_once(self):
+        pinned_officer_1 = OfficerFactory(id=1)
+        pinned_officer_2 = OfficerFactory(id=2)
+        pinboard = PinboardFactory()
+        pinboard.officers.set([pinned_officer_1, pinned_officer_2])
+
+        coaccused_officer = OfficerFactory(id=11)
+        shared_allegation = AllegationFactory(crid='11')
+        allegation = AllegationFactory(crid='12')
+        OfficerAllegationFactory(allegation=shared_allegation, officer=pinned_officer_1)
+        OfficerAllegationFactory(allegation=shared_allegation, officer=pinned_officer_2)
+        OfficerAllegationFactory(allegation=shared_allegation, officer=coaccused_officer)
+        OfficerAllegationFactory(allegation=allegation, officer=pinned_officer_2)
+        OfficerAllegationFactory(allegation=allegation, officer=coaccused_officer)
+
+        officer_coaccusal_cache_manager.cache_data()
+        relevant_coaccusals = list(pinboard.relevant_coaccusals)
+
+        expect(relevant_coaccusals).to.have.length(1)
+        expect(relevant_coaccusals[0].id).to.eq(11)
+        expect(relevant_coaccusals[0].coaccusal_count).to.eq(2)
+
     def test_relevant_complaints_coaccusal_count_via_trr(self):
         officer_coaccusal_11 = OfficerFactory(id=11)
         officer_coaccusal_21 = OfficerFactory(id=21)
@@ -456,6 +492,7 @@ class PinboardTestCase(TestCase):
         OfficerAllegationFactory(allegation=pinned_allegation_2, officer=allegation_coaccusal_22)
         OfficerAllegationFactory(allegation=not_relevant_allegation, officer=allegation_coaccusal_22)
 
+        officer_coaccusal_cache_manager.cache_data()
         relevant_coaccusals = list(pinboard.relevant_coaccusals)
 
         expect(relevant_coaccusals).to.have.length(5)
@@ -469,96 +506,7 @@ class PinboardTestCase(TestCase):
         expect(relevant_coaccusals[3].coaccusal_count).to.eq(1)
         expect(relevant_coaccusals[4].coaccusal_count).to.eq(1)
 
-    def test_relevant_complaints_via_accused_officers(self):
-        pinned_officer_1 = OfficerFactory(id=1)
-        pinned_officer_2 = OfficerFactory(id=2)
-        pinned_officer_3 = OfficerFactory(id=3)
-        relevant_allegation_1 = AllegationFactory(crid='1', incident_date=datetime(2002, 2, 21, tzinfo=pytz.utc))
-        relevant_allegation_2 = AllegationFactory(crid='2', incident_date=datetime(2002, 2, 22, tzinfo=pytz.utc))
-        AllegationFactory(crid='not relevant')
-        pinboard = PinboardFactory(
-            title='Test pinboard',
-            description='Test description',
-        )
-        pinboard.officers.set([pinned_officer_1, pinned_officer_2, pinned_officer_3])
-        OfficerAllegationFactory(officer=pinned_officer_1, allegation=relevant_allegation_1)
-        OfficerAllegationFactory(officer=pinned_officer_2, allegation=relevant_allegation_2)
-
-        relevant_complaints = list(pinboard.relevant_complaints)
-
-        expect(relevant_complaints).to.have.length(2)
-        expect(relevant_complaints[0].crid).to.eq('2')
-        expect(relevant_complaints[1].crid).to.eq('1')
-
-    def test_relevant_complaints_filter_out_pinned_allegations(self):
-        pinned_officer_1 = OfficerFactory(id=1)
-        pinned_officer_2 = OfficerFactory(id=2)
-        pinned_allegation_1 = AllegationFactory(crid='1')
-        pinned_allegation_2 = AllegationFactory(crid='2')
-        pinboard = PinboardFactory(
-            title='Test pinboard',
-            description='Test description',
-        )
-        pinboard.officers.set([pinned_officer_1, pinned_officer_2])
-        pinboard.allegations.set([pinned_allegation_1, pinned_allegation_2])
-        OfficerAllegationFactory(officer=pinned_officer_1, allegation=pinned_allegation_1)
-        OfficerAllegationFactory(officer=pinned_officer_2, allegation=pinned_allegation_2)
-        AllegationFactory(crid='not relevant')
-
-        expect(list(pinboard.relevant_complaints)).to.have.length(0)
-
-    def test_relevant_complaints_via_investigator(self):
-        pinned_investigator_1 = OfficerFactory(id=1)
-        pinned_investigator_2 = OfficerFactory(id=2)
-        pinned_investigator_3 = OfficerFactory(id=3)
-        not_relevant_officer = OfficerFactory(id=999)
-        relevant_allegation_1 = AllegationFactory(crid='1', incident_date=datetime(2002, 2, 21, tzinfo=pytz.utc))
-        relevant_allegation_2 = AllegationFactory(crid='2', incident_date=datetime(2002, 2, 22, tzinfo=pytz.utc))
-        relevant_allegation_3 = AllegationFactory(crid='3', incident_date=datetime(2002, 2, 23, tzinfo=pytz.utc))
-        not_relevant_allegation = AllegationFactory(crid='999')
-        pinboard = PinboardFactory(
-            title='Test pinboard',
-            description='Test description',
-        )
-        pinboard.officers.set([pinned_investigator_1, pinned_investigator_2, pinned_investigator_3])
-        InvestigatorAllegationFactory(investigator__officer=pinned_investigator_1, allegation=relevant_allegation_1)
-        InvestigatorAllegationFactory(investigator__officer=pinned_investigator_2, allegation=relevant_allegation_2)
-        InvestigatorAllegationFactory(investigator__officer=pinned_investigator_3, allegation=relevant_allegation_3)
-        InvestigatorAllegationFactory(investigator__officer=not_relevant_officer, allegation=not_relevant_allegation)
-
-        relevant_complaints = list(pinboard.relevant_complaints)
-
-        expect(relevant_complaints).to.have.length(3)
-        expect(relevant_complaints[0].crid).to.eq('3')
-        expect(relevant_complaints[1].crid).to.eq('2')
-        expect(relevant_complaints[2].crid).to.eq('1')
-
-    def test_relevant_complaints_via_police_witnesses(self):
-        pinned_officer_1 = OfficerFactory(id=1)
-        pinned_officer_2 = OfficerFactory(id=2)
-        not_relevant_officer = OfficerFactory(id=999)
-        relevant_allegation_11 = AllegationFactory(crid='11', incident_date=datetime(2002, 2, 21, tzinfo=pytz.utc))
-        relevant_allegation_12 = AllegationFactory(crid='12', incident_date=datetime(2002, 2, 22, tzinfo=pytz.utc))
-        relevant_allegation_21 = AllegationFactory(crid='21', incident_date=datetime(2002, 2, 23, tzinfo=pytz.utc))
-        not_relevant_allegation = AllegationFactory(crid='999')
-        pinboard = PinboardFactory(
-            title='Test pinboard',
-            description='Test description',
-        )
-        pinboard.officers.set([pinned_officer_1, pinned_officer_2])
-        PoliceWitnessFactory(allegation=relevant_allegation_11, officer=pinned_officer_1)
-        PoliceWitnessFactory(allegation=relevant_allegation_12, officer=pinned_officer_1)
-        PoliceWitnessFactory(allegation=relevant_allegation_21, officer=pinned_officer_2)
-        PoliceWitnessFactory(allegation=not_relevant_allegation, officer=not_relevant_officer)
-
-        relevant_complaints = list(pinboard.relevant_complaints)
-
-        expect(relevant_complaints).to.have.length(3)
-        expect(relevant_complaints[0].crid).to.eq('21')
-        expect(relevant_complaints[1].crid).to.eq('12')
-        expect(relevant_complaints[2].crid).to.eq('11')
-
-    def test_relevant_complaints_order_officers(self):
+    def test_relevant_complaints_by_crids_order_officers(self):
         pinned_officer_1 = OfficerFactory(id=1, allegation_count=3)
         pinned_officer_2 = OfficerFactory(id=2)
         pinned_officer_3 = OfficerFactory(id=3)
@@ -577,7 +525,7 @@ class PinboardTestCase(TestCase):
         OfficerAllegationFactory(officer=officer_5, allegation=relevant_allegation_1)
         OfficerAllegationFactory(officer=pinned_officer_2, allegation=relevant_allegation_2)
 
-        relevant_complaints = list(pinboard.relevant_complaints)
+        relevant_complaints = pinboard.relevant_complaints_by_crids(['2', '1'])
 
         expect(relevant_complaints).to.have.length(2)
         expect(relevant_complaints[0].crid).to.eq('2')
@@ -590,6 +538,44 @@ class PinboardTestCase(TestCase):
         expect(relevant_complaints[1].prefetched_officer_allegations[1].officer.id).to.eq(1)
         expect(relevant_complaints[1].prefetched_officer_allegations[2].officer.id).to.eq(4)
 
+    def test_relevant_complaint_crids(self):
+        pinned_officer = OfficerFactory(id=1)
+        pinned_allegation = AllegationFactory(crid='1', incident_date=datetime(2002, 2, 24, tzinfo=pytz.utc))
+        accused_allegation = AllegationFactory(crid='2', incident_date=datetime(2002, 2, 21, tzinfo=pytz.utc))
+        investigated_allegation = AllegationFactory(crid='3', incident_date=datetime(2002, 2, 23, tzinfo=pytz.utc))
+        witnessed_allegation = AllegationFactory(crid='4', incident_date=datetime(2002, 2, 22, tzinfo=pytz.utc))
+        AllegationFactory(crid='not relevant')
+        OfficerAllegationFactory(officer=pinned_officer, allegation=pinned_allegation)
+        OfficerAllegationFactory(officer=pinned_officer, allegation=accused_allegation)
+        OfficerAllegationFactory(officer=OfficerFactory(), allegation=accused_allegation)
+        InvestigatorAllegationFactory(investigator__officer=pinned_officer, allegation=investigated_allegation)
+        InvestigatorAllegationFactory(investigator__officer=pinned_officer, allegation=accused_allegation)
+        PoliceWitnessFactory(officer=pinned_officer, allegation=witnessed_allegation)
+        pinboard = PinboardFactory(officers=[pinned_officer], allegations=[pinned_allegation])
+        pinboard.content_hash
+
+        with self.assertNumQueries(1):
+            crids = pinboard.relevant_complaint_crids
+
+        expect(crids).to.eq(['3', '4', '2'])
+
+    def test_relevant_complaint_crids_without_pinned_officer(self):
+        allegation = AllegationFactory()
+        pinboard = PinboardFactory(officers=[], allegations=[allegation])
+
+        expect(pinboard.relevant_complaint_crids).to.eq([])
+
+    def test_relevant_complaints_by_crids(self):
+        pinned_officer = OfficerFactory(id=1)
+        pinboard = PinboardFactory(officers=[pinned_officer])
+        for crid in ['1', '2', '3']:
+            OfficerAllegationFactory(officer=pinned_officer, allegation=AllegationFactory(crid=crid))
+
+        relevant_complaints = pinboard.relevant_complaints_by_crids(['3', '1', 'missing'])
+
+        expect([allegation.crid for allegation in relevant_complaints]).to.eq(['3', '1'])
+        expect(relevant_complaints[0].prefetched_officer_allegations[0].officer.id).to.eq(1)
+
     def test_relevant_documents_via_accused_officers(self):
         pinned_officer_1 = OfficerFactory(id=1)
         pinned_officer_2 = OfficerFactory(id=2)
@@ -54,8 +54,10 @@ class AllegationSerializerTestCase(TestCase):
         pinboard.officers.set([pinned_officer])
         OfficerAllegationFactory(officer=pinned_officer, allegation=relevant_allegation)
 
-        expect(pinboard.relevant_complaints.count()).to.eq(1)
-        expect(AllegationSerializer(pinboard.relevant_complaints.first()).data).to.eq({
+        relevant_complaints = pinboard.relevant_complaints_by_crids(pinboard.relevant_complaint_crids)
+
+        expect(relevant_complaints).to.have.length(1)
+        expect(AllegationSerializer(relevant_complaints[0]).data).to.eq({
             'crid': '1',
             'address': '',
             'category': 'Operation/Personnel Violations',
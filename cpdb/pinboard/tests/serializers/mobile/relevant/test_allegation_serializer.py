@@ -54,8 +54,10 @@ class AllegationSerializerTestCase(TestCase):
         pinboard.officers.set([pinned_officer])
         OfficerAllegationFactory(officer=pinned_officer, allegation=relevant_allegation)
 
-        expect(pinboard.relevant_complaints.count()).to.eq(1)
-        expect(AllegationMobileSerializer(pinboard.relevant_complaints.first()).data).to.eq({
+        relevant_complaints = pinboard.relevant_complaints_by_crids(pinboard.relevant_complaint_crids)
+
+        expect(relevant_complaints).to.have.length(1)
+        expect(AllegationMobileSerializer(relevant_complaints[0]).data).to.eq({
             'crid': '1',
             'category': 'Operation/Personnel Violations',
             'incident_date': '2002-02-21',
@@ -12,6 +12,7 @@ from data.factories import (
     PoliceUnitFactory,
     OfficerHistoryFactory,
 )
+from data.cache_managers import officer_coaccusal_cache_manager
 from pinboard.factories import PinboardFactory
 
 
@@ -63,6 +64,7 @@ class OfficerSerializerTestCase(TestCase):
         OfficerAllegationFactory(allegation=allegation, officer=officer_coaccusal)
         OfficerHistoryFactory(officer=officer_coaccusal, unit=unit, effective_date=date(2004, 1, 2))
 
+        officer_coaccusal_cache_manager.cache_data()
         pinboard_relevant_coaccusals = [c for c in pinboard.relevant_coaccusals]
         expect(pinboard_relevant_coaccusals).to.have.length(1)
 
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from mock import Mock
+from robber import expect
+
+from data.factories import OfficerFactory, AllegationFactory
+from pinboard import cache as pinboard_cache
+from pinboard.factories import PinboardFactory
+from pinboard.models import Pinboard
+from trr.factories import TRRFactory
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PinboardCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_get_or_compute(self):
+        pinboard = PinboardFactory(officers=[OfficerFactory()])
+        compute = Mock(return_value={'count': 1})
+
+        expect(pinboard_cache.get_or_compute(pinboard, 'summary', compute)).to.eq({'count': 1})
+        expect(pinboard_cache.get_or_compute(pinboard, 'summary', compute)).to.eq({'count': 1})
+        expect(compute.call_count).to.eq(1)
+
+        pinboard_cache.get_or_compute(pinboard, 'summary', compute, 'limit', 10)
+        pinboard_cache.get_or_compute(pinboard, 'other-summary', compute)
+        expect(compute.call_count).to.eq(3)
+
+    def test_get_or_compute_share_entries_between_pinboards_with_same_content(self):
+        officer = OfficerFactory()
+        allegation = AllegationFactory()
+        trr = TRRFactory()
+        pinboard = PinboardFactory(officers=[officer], allegations=[allegation], trrs=[trr])
+        duplicated_pinboard = pinboard.clone(is_duplicated=True)
+        compute = Mock(return_value=[])
+
+        pinboard_cache.get_or_compute(pinboard, 'summary', compute)
+        pinboard_cache.get_or_compute(duplicated_pinboard, 'summary', compute)
+        expect(compute.call_count).to.eq(1)
+
+    def test_get_or_compute_after_pinboard_changed(self):
+        pinboard = PinboardFactory(officers=[OfficerFactory()])
+        compute = Mock(return_value=[])
+        pinboard_cache.get_or_compute(pinboard, 'summary', compute)
+
+        pinboard.officers.add(OfficerFactory())
+        pinboard = Pinboard.objects.get(id=pinboard.id)
+        pinboard_cache.get_or_compute(pinboard, 'summary', compute)
+        expect(compute.call_count).to.eq(2)
+
+    def test_invalidate(self):
+        pinboard = PinboardFactory(officers=[OfficerFactory()])
+        compute = Mock(return_value=[])
+        pinboard_cache.get_or_compute(pinboard, 'summary', compute)
+
+        pinboard_cache.invalidate()
+        pinboard_cache.get_or_compute(pinboard, 'summary', compute)
+        expect(compute.call_count).to.eq(2)
+
+    def test_data_version(self):
+        version = pinboard_cache.data_version()
+        expect(pinboard_cache.data_version()).to.eq(version)
+
+        pinboard_cache.invalidate()
+        expect(pinboard_cache.data_version()).to.ne(version)
@@ -0,0 +1,68 @@
+from django.test import SimpleTestCase
+
+from mock import Mock
+from rest_framework.exceptions import NotFound
+from robber import expect
+
+from pinboard.pagination import KeysetListPagination
+
+
+class KeysetListPaginationTestCase(SimpleTestCase):
+    def test_paginate_keys(self):
+        request = Mock()
+        request.query_params = {'limit': 2, 'offset': 1}
+        hydrate = Mock(return_value=['object b', 'object c'])
+
+        pagination = KeysetListPagination()
+        page = pagination.paginate_keys(['a', 'b', 'c', 'd'], hydrate, request)
+
+        hydrate.assert_called_with(['b', 'c'])
+        expect(page).to.eq(['object b', 'object c'])
+        expect(pagination.count).to.eq(4)
+        expect(pagination.offset).to.eq(1)
+        expect(pagination.limit).to.eq(2)
+
+    def test_paginate_keys_out_of_range(self):
+        request = Mock()
+        request.query_params = {'limit': 2, 'offset': 10}
+        hydrate = Mock()
+
+        pagination = KeysetListPagination()
+
+        expect(pagination.paginate_keys(['a', 'b'], hydrate, request)).to.eq([])
+        expect(hydrate.called).to.be.false()
+
+    def test_paginate_keys_by_cursor(self):
+        request = Mock()
+        request.query_params = {'limit': 2, 'cursor': KeysetListPagination.encode_cursor(['b'])}
+        request.build_absolute_uri.return_value = 'http://cpdp.co/api/v2/pinboards/abc/relevant-complaints/?offset=2'
+        hydrate = Mock(side_effect=lambda keys: keys)
+
+        pagination = KeysetListPagination()
+        page = pagination.paginate_keys(['a', 'b', 'c', 'd', 'e'], hydrate, request)
+
+        expect(page).to.eq(['c', 'd'])
+        expect(pagination.count).to.eq(5)
+        expect(pagination.next_cursor).to.eq(KeysetListPagination.encode_cursor(['d']))
+        expect(pagination.get_next_link()).to.eq(
+            f'http://cpdp.co/api/v2/pinboards/abc/relevant-complaints/?limit=2&cursor={pagination.next_cursor}'
+        )
+        expect(pagination.get_previous_link()).to.be.none()
+
+    def test_paginate_keys_by_empty_cursor(self):
+        request = Mock()
+        request.query_params = {'limit': 2, 'cursor': ''}
+
+        pagination = KeysetListPagination()
+        page = pagination.paginate_keys(['a', 'b'], lambda keys: keys, request)
+
+        expect(page).to.eq(['a', 'b'])
+        expect(pagination.next_cursor).to.be.none()
+
+    def test_paginate_keys_by_unknown_cursor(self):
+        request = Mock()
+        request.query_params = {'limit': 2, 'cursor': KeysetListPagination.encode_cursor(['x'])}
+
+        pagination = KeysetListPagination()
+
+        expect(lambda: pagination.paginate_keys(['a', 'b'], lambda keys: keys, request)).to.throw(NotFound)
@@ -2,7 +2,13 @@ from django.test import TestCase
 
 from robber.expect import expect
 
-from pinboard.queries import ComplaintSummaryQuery, TrrSummaryQuery, OfficersSummaryQuery, ComplainantsSummaryQuery
+from pinboard.queries import (
+    ComplaintSummaryQuery,
+    TrrSummaryQuery,
+    OfficersSummaryQuery,
+    ComplainantsSummaryQuery,
+    PinboardSummaryQuery,
+)
 from pinboard.factories import PinboardFactory
 from trr.factories import TRRFactory, ActionResponseFactory
 from data.factories import (
@@ -266,3 +272,85 @@ class ComplainantsSummaryQueryTestCase(TestCase):
         query_results = dict(ComplainantsSummaryQuery(pinboard).query())
         expect(list(query_results['race'])).to.eq([])
         expect(list(query_results['gender'])).to.eq([])
+
+
+class PinboardSummaryQueryTestCase(TestCase):
+    def test_query(self):
+        allegation_officer = OfficerFactory(race='White', gender='F')
+        trr_officer = OfficerFactory(race='Black', gender='M')
+        pinboard_officer = OfficerFactory(race='Hispanic', gender='M')
+        OfficerFactory(race='White', gender='M')
+
+        allegation_category = AllegationCategoryFactory(category='Illegal Search')
+        pinboard_allegation = AllegationFactory()
+        officer_allegation = AllegationFactory()
+        OfficerAllegationFactory(
+            allegation=pinboard_allegation, officer=allegation_officer, allegation_category=allegation_category
+        )
+        OfficerAllegationFactory(allegation=officer_allegation, officer=pinboard_officer, allegation_category=None)
+        ComplainantFactory(allegation=pinboard_allegation, gender='F', race='Black')
+        ComplainantFactory(allegation=officer_allegation, gender='M', race='')
+        ComplainantFactory(allegation=AllegationFactory(), gender='M', race='White')
+
+        pinboard_trr = TRRFactory(officer=trr_officer)
+        ActionResponseFactory(trr=pinboard_trr, force_type='Verbal Commands')
+        ActionResponseFactory(trr=TRRFactory(officer=pinboard_officer), force_type='Verbal Commands')
+        ActionResponseFactory(trr=TRRFactory(officer=pinboard_officer), force_type='Taser')
+        ActionResponseFactory(trr=TRRFactory(), force_type='Chemical')
+
+        pinboard = PinboardFactory(
+            trrs=(pinboard_trr,),
+            allegations=(pinboard_allegation,),
+            officers=(pinboard_officer,)
+        )
+        pinboard.content_hash
+
+        with self.assertNumQueries(1):
+            result = PinboardSummaryQuery(pinboard).query()
+
+        expect(result).to.eq({
+            'complaint_summary': [
+                {'category': 'Illegal Search', 'count': 1},
+                {'category': None, 'count': 1},
+            ],
+            'trr_summary': [
+                {'force_type': 'Verbal Commands', 'count': 2},
+                {'force_type': 'Taser', 'count': 1},
+            ],
+            'officers_summary': {
+                'race': [
+                    {'race': 'Black', 'percentage': 0.33},
+                    {'race': 'White', 'percentage': 0.33},
+                    {'race': 'Hispanic', 'percentage': 0.33},
+                    {'race': 'Other', 'percentage': 0.0},
+                ],
+                'gender': [
+                    {'gender': 'M', 'percentage': 0.67},
+                    {'gender': 'F', 'percentage': 0.33},
+                    {'gender': 'Unknown', 'percentage': 0.0},
+                ],
+            },
+            'complainants_summary': {
+                'race': [
+                    {'race': 'Black', 'percentage': 0.5},
+                    {'race': 'White', 'percentage': 0.0},
+                    {'race': 'Hispanic', 'percentage': 0.0},
+                    {'race': 'Other', 'percentage': 0.5},
+                ],
+                'gender': [
+                    {'gender': 'M', 'percentage': 0.5},
+                    {'gender': 'F', 'percentage': 0.5},
+                    {'gender': 'Unknown', 'percentage': 0.0},
+                ],
+            },
+        })
+
+    def test_query_with_empty_pinboard(self):
+        pinboard = PinboardFactory(trrs=[], allegations=[], officers=[])
+
+        expect(PinboardSummaryQuery(pinboard).query()).to.eq({
+            'complaint_summary': [],
+            'trr_summary': [],
+            'officers_summary': {'race': [], 'gender': []},
+            'complainants_summary': {'race': [], 'gender': []},
+        })
@@ -4,6 +4,8 @@ from operator import itemgetter
 import json
 
 from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 
 import pytz
@@ -15,7 +17,7 @@ from robber import expect
 from freezegun import freeze_time
 
 from authentication.factories import AdminUserFactory
-from data.cache_managers import allegation_cache_manager
+from data.cache_managers import allegation_cache_manager, officer_coaccusal_cache_manager
 from data.factories import (
     OfficerFactory,
     AllegationFactory,
@@ -1096,6 +1098,27 @@ class PinboardDesktopViewSetTestCase(APITestCase):
         expect(response.data['previous']).to.be.none()
         expect(response.data['next']).to.be.none()
 
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_relevant_documents_cached_per_client(self):
+        cache.clear()
+        pinned_officer = OfficerFactory(id=1)
+        allegation = AllegationFactory(crid='1')
+        OfficerAllegationFactory(officer=pinned_officer, allegation=allegation)
+        AttachmentFileFactory(id=1, file_type='document', owner=allegation, show=True)
+        PinboardFactory(id='66ef1560', officers=[pinned_officer])
+
+        desktop_response = self.client.get(
+            reverse('api-v2:pinboards-relevant-documents', kwargs={'pk': '66ef1560'})
+        )
+        mobile_response = self.client.get(
+            reverse('api-v2:pinboards-mobile-relevant-documents', kwargs={'pk': '66ef1560'})
+        )
+
+        expect(desktop_response.data['results'][0]['allegation']).to.contain('coaccused')
+        expect(desktop_response.data['results'][0]['allegation']).not_to.contain('officers')
+        expect(mobile_response.data['results'][0]['allegation']).to.contain('officers')
+        expect(mobile_response.data['results'][0]['allegation']).not_to.contain('coaccused')
+
     def test_relevant_documents_pagination(self):
         pinned_officer_1 = OfficerFactory(
             id=1,
@@ -1393,6 +1416,7 @@ class PinboardDesktopViewSetTestCase(APITestCase):
         OfficerHistoryFactory(officer=allegation_coaccusal_12, unit=unit, effective_date=date(2004, 1, 2))
         OfficerHistoryFactory(officer=allegation_coaccusal_22, unit=unit, effective_date=date(2004, 1, 2))
 
+        officer_coaccusal_cache_manager.cache_data()
         request_url = reverse('api-v2:pinboards-relevant-coaccusals', kwargs={'pk': '66ef1560'})
         response = self.client.get(request_url)
         expect(response.data['count']).to.eq(5)
@@ -1541,6 +1565,35 @@ class PinboardDesktopViewSetTestCase(APITestCase):
 
         expect(response.data['results']).to.eq(results)
 
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_relevant_coaccusals_cached(self):
+        cache.clear()
+        pinned_officer = OfficerFactory(id=1)
+        PinboardFactory(id='66ef1560', officers=[pinned_officer])
+        PinboardFactory(id='77ef1560', officers=[pinned_officer])
+        for officer_id in [11, 12, 13]:
+            allegation = AllegationFactory()
+            OfficerAllegationFactory(allegation=allegation, officer=pinned_officer)
+            OfficerAllegationFactory(allegation=allegation, officer=OfficerFactory(id=officer_id))
+        officer_coaccusal_cache_manager.cache_data()
+
+        base_url = reverse('api-v2:pinboards-relevant-coaccusals', kwargs={'pk': '66ef1560'})
+        first_response = self.client.get(f"{base_url}?{urlencode({'limit': 2})}")
+
+        shared_url = reverse('api-v2:pinboards-relevant-coaccusals', kwargs={'pk': '77ef1560'})
+        with self.assertNumQueries(4):
+            shared_response = self.client.get(f"{shared_url}?{urlencode({'limit': 2})}")
+
+        expect(shared_response.status_code).to.eq(status.HTTP_200_OK)
+        expect(shared_response.data['count']).to.eq(3)
+        expect(shared_response.data['results']).to.eq(first_response.data['results'])
+        expect(shared_response.data['next']).to.eq(
+            'http://testserver/api/v2/pinboards/77ef1560/relevant-coaccusals/?limit=2&offset=2'
+        )
+
+        second_page_response = self.client.get(f"{base_url}?{urlencode({'limit': 2, 'offset': 2})}")
+        expect(second_page_response.data['results']).to.have.length(1)
+
     def test_relevant_coaccusals_pagination(self):
         pinned_officer_1 = OfficerFactory(id=1)
         pinned_officer_2 = OfficerFactory(id=2)
@@ -1694,6 +1747,7 @@ class PinboardDesktopViewSetTestCase(APITestCase):
         OfficerAllegationFactory(allegation=pinned_allegation_2, officer=allegation_coaccusal_22)
         OfficerAllegationFactory(allegation=not_relevant_allegation, officer=allegation_coaccusal_22)
 
+        officer_coaccusal_cache_manager.cache_data()
         base_url = reverse('api-v2:pinboards-relevant-coaccusals', kwargs={'pk': '66ef1560'})
         first_response = self.client.get(f"{base_url}?{urlencode({'limit': 2})}")
         expect(first_response.status_code).to.eq(status.HTTP_200_OK)
@@ -2157,6 +2211,37 @@ class PinboardDesktopViewSetTestCase(APITestCase):
         )
         expect(last_response.data['next']).to.be.none()
 
+    def test_relevant_complaints_cursor_pagination(self):
+        pinned_officer = OfficerFactory(id=1)
+        PinboardFactory(id='66ef1560', officers=[pinned_officer])
+        for day, crid in enumerate(['1', '2', '3'], start=21):
+            allegation = AllegationFactory(crid=crid, incident_date=datetime(2002, 2, day, tzinfo=pytz.utc))
+            OfficerAllegationFactory(officer=pinned_officer, allegation=allegation)
+
+        base_url = reverse('api-v2:pinboards-relevant-complaints', kwargs={'pk': '66ef1560'})
+        first_response = self.client.get(f"{base_url}?{urlencode({'limit': 2, 'cursor': ''})}")
+        expect(first_response.status_code).to.eq(status.HTTP_200_OK)
+        expect([item['crid'] for item in first_response.data['results']]).to.eq(['3', '2'])
+        expect(first_response.data['count']).to.eq(3)
+        expect(first_response.data['previous']).to.be.none()
+
+        # a complaint added before the cursor does not shift the next page
+        new_allegation = AllegationFactory(crid='4', incident_date=datetime(2002, 2, 25, tzinfo=pytz.utc))
+        OfficerAllegationFactory(officer=pinned_officer, allegation=new_allegation)
+
+        next_response = self.client.get(first_response.data['next'])
+        expect(next_response.status_code).to.eq(status.HTTP_200_OK)
+        expect([item['crid'] for item in next_response.data['results']]).to.eq(['1'])
+        expect(next_response.data['next']).to.be.none()
+
+    def test_relevant_complaints_invalid_cursor(self):
+        PinboardFactory(id='66ef1560', officers=[OfficerFactory()])
+
+        base_url = reverse('api-v2:pinboards-relevant-complaints', kwargs={'pk': '66ef1560'})
+        response = self.client.get(f"{base_url}?{urlencode({'cursor': 'invalid'})}")
+
+        expect(response.status_code).to.eq(status.HTTP_404_NOT_FOUND)
+
     def test_latest_retrieved_pinboard_return_null(self):
         # No previous pinboard, data returned should be null
         response = self.client.get(reverse('api-v2:pinboards-latest-retrieved-pinboard'))
@@ -3110,3 +3195,59 @@ class PinboardDesktopViewSetTestCase(APITestCase):
         expect(response.status_code).to.eq(status.HTTP_200_OK)
         expect(list(response.data['race'])).to.eq([])
         expect(list(response.data['gender'])).to.eq([])
+
+    def test_summary(self):
+        officer = OfficerFactory(race='White', gender='M')
+        allegation = AllegationFactory()
+        allegation_category = AllegationCategoryFactory(category='Use Of Force')
+        OfficerAllegationFactory(allegation=allegation, officer=officer, allegation_category=allegation_category)
+        ComplainantFactory(allegation=allegation, gender='F', race='Black')
+        ActionResponseFactory(trr=TRRFactory(officer=officer), force_type='Taser')
+        pinboard = PinboardFactory(officers=(officer,), allegations=[], trrs=[])
+
+        response = self.client.get(reverse('api-v2:pinboards-summary', kwargs={'pk': pinboard.id}))
+
+        expect(response.status_code).to.eq(status.HTTP_200_OK)
+        expect(response.data).to.eq({
+            'complaint_summary': [{'category': 'Use Of Force', 'count': 1}],
+            'trr_summary': [{'force_type': 'Taser', 'count': 1}],
+            'officers_summary': {
+                'race': [
+                    {'race': 'Black', 'percentage': 0.0},
+                    {'race': 'White', 'percentage': 1.0},
+                    {'race': 'Hispanic', 'percentage': 0.0},
+                    {'race': 'Other', 'percentage': 0.0},
+                ],
+                'gender': [
+                    {'gender': 'M', 'percentage': 1.0},
+                    {'gender': 'F', 'percentage': 0.0},
+                    {'gender': 'Unknown', 'percentage': 0.0},
+                ],
+            },
+            'complainants_summary': {
+                'race': [
+                    {'race': 'Black', 'percentage': 1.0},
+                    {'race': 'White', 'percentage': 0.0},
+                    {'race': 'Hispanic', 'percentage': 0.0},
+                    {'race': 'Other', 'percentage': 0.0},
+                ],
+                'gender': [
+                    {'gender': 'M', 'percentage': 0.0},
+                    {'gender': 'F', 'percentage': 1.0},
+                    {'gender': 'Unknown', 'percentage': 0.0},
+                ],
+            },
+        })
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_summary_endpoints_share_cached_summary(self):
+        cache.clear()
+        officer = OfficerFactory(race='White', gender='M')
+        pinboard = PinboardFactory(officers=(officer,), allegations=[], trrs=[])
+        summary_response = self.client.get(reverse('api-v2:pinboards-summary', kwargs={'pk': pinboard.id}))
+
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('api-v2:pinboards-officers-summary', kwargs={'pk': pinboard.id}))
+
+        expect(response.status_code).to.eq(status.HTTP_200_OK)
+        expect(response.data).to.eq(summary_response.data['officers_summary'])
@@ -12,7 +12,7 @@ from rest_framework.test import APITestCase
 from robber import expect
 from freezegun import freeze_time
 
-from data.cache_managers import allegation_cache_manager
+from data.cache_managers import allegation_cache_manager, officer_coaccusal_cache_manager
 from data.factories import (
     OfficerFactory,
     AllegationFactory,
@@ -1028,6 +1028,7 @@ class PinboardMobileViewSetTestCase(APITestCase):
         OfficerAllegationFactory(allegation=pinned_allegation_2, officer=allegation_coaccusal_22)
         OfficerAllegationFactory(allegation=not_relevant_allegation, officer=allegation_coaccusal_22)
 
+        officer_coaccusal_cache_manager.cache_data()
         request_url = reverse('api-v2:pinboards-mobile-relevant-coaccusals', kwargs={'pk': '66ef1560'})
         response = self.client.get(request_url)
         expect(response.data['count']).to.eq(5)
@@ -1165,6 +1166,7 @@ class PinboardMobileViewSetTestCase(APITestCase):
         OfficerAllegationFactory(allegation=pinned_allegation_2, officer=allegation_coaccusal_22)
         OfficerAllegationFactory(allegation=not_relevant_allegation, officer=allegation_coaccusal_22)
 
+        officer_coaccusal_cache_manager.cache_data()
         base_url = reverse('api-v2:pinboards-mobile-relevant-coaccusals', kwargs={'pk': '66ef1560'})
         first_response = self.client.get(f"{base_url}?{urlencode({'limit': 2})}")
         expect(first_response.status_code).to.eq(status.HTTP_200_OK)
@@ -39,8 +39,10 @@ from pinboard.serializers.mobile.relevant import (
     RelevantDocumentMobileSerializer,
 )
 from trr.models import ActionResponse
+from . import cache as pinboard_cache
 from .models import Pinboard, ProxyAllegation as Allegation
-from .queries import ComplaintSummaryQuery, TrrSummaryQuery, OfficersSummaryQuery, ComplainantsSummaryQuery
+from .pagination import KeysetListPagination
+from .queries import PinboardSummaryQuery
 
 
 @method_decorator(never_cache, name='dispatch')
@@ -175,55 +177,82 @@ class PinboardViewSet(
     def relevant_coaccusals(self, request, pk):
         queryset = Pinboard.objects.all()
         pinboard = get_object_or_404(queryset, id=pk)
-
-        paginator = self.pagination_class()
-        relevant_coaccusals = paginator.paginate_queryset(pinboard.relevant_coaccusals, request, view=self)
-        serializer = self.relevant_coaccusal_serializer_class(relevant_coaccusals, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return self._cached_paginated_response(
+            request, pinboard, 'relevant-coaccusals',
+            lambda: pinboard.relevant_coaccusals, self.relevant_coaccusal_serializer_class
+        )
 
     @action(detail=True, methods=['get'], url_path='relevant-documents')
     def relevant_documents(self, request, pk):
         queryset = Pinboard.objects.all()
         pinboard = get_object_or_404(queryset, id=pk)
-
-        paginator = self.pagination_class()
-        relevant_documents = paginator.paginate_queryset(pinboard.relevant_documents, request, view=self)
-        serializer = self.relevant_document_serializer_class(relevant_documents, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return self._cached_paginated_response(
+            request, pinboard, 'relevant-documents',
+            lambda: pinboard.relevant_documents, self.relevant_document_serializer_class
+        )
 
     @action(detail=True, methods=['get'], url_path='relevant-complaints')
     def relevant_complaints(self, request, pk):
         queryset = Pinboard.objects.all()
         pinboard = get_object_or_404(queryset, id=pk)
-
-        paginator = self.pagination_class()
-        relevant_complaints = paginator.paginate_queryset(pinboard.relevant_complaints, request, view=self)
-        serializer = self.relevant_complaint_serializer_class(relevant_complaints, many=True)
+        crids = pinboard_cache.get_or_compute(
+            pinboard, 'relevant-complaint-crids', lambda: pinboard.relevant_complaint_crids
+        )
+        paginator = KeysetListPagination()
+        page = paginator.paginate_keys(crids, pinboard.relevant_complaints_by_crids, request)
+        serializer = self.relevant_complaint_serializer_class(page, many=True)
         return paginator.get_paginated_response(serializer.data)
 
+    @action(detail=True, methods=['get'], url_path='summary')
+    def summary(self, request, pk):
+        queryset = Pinboard.objects.all()
+        pinboard = get_object_or_404(queryset, id=pk)
+        return Response(self._summary(pinboard))
+
     @action(detail=True, methods=['get'], url_path='complaint-summary')
     def complaint_summary(self, request, pk):
         queryset = Pinboard.objects.all()
         pinboard = get_object_or_404(queryset, id=pk)
-        return Response(ComplaintSummaryQuery(pinboard).query())
+        return Response(self._summary(pinboard)['complaint_summary'])
 
     @action(detail=True, methods=['get'], url_path='trr-summary')
     def trr_summary(self, request, pk):
         queryset = Pinboard.objects.all()
         pinboard = get_object_or_404(queryset, id=pk)
-        return Response(TrrSummaryQuery(pinboard).query())
+        return Response(self._summary(pinboard)['trr_summary'])
 
     @action(detail=True, methods=['get'], url_path='officers-summary')
     def officers_summary(self, request, pk):
         queryset = Pinboard.objects.all()
         pinboard = get_object_or_404(queryset, id=pk)
-        return Response(OfficersSummaryQuery(pinboard).query())
+        return Response(self._summary(pinboard)['officers_summary'])
 
     @action(detail=True, methods=['get'], url_path='complainants-summary')
     def complainants_summary(self, request, pk):
         queryset = Pinboard.objects.all()
         pinboard = get_object_or_404(queryset, id=pk)
-        return Response(ComplainantsSummaryQuery(pinboard).query())
+        return Response(self._summary(pinboard)['complainants_summary'])
+
+    def _summary(self, pinboard):
+        return pinboard_cache.get_or_compute(pinboard, 'summary', lambda: PinboardSummaryQuery(pinboard).query())
+
+    def _cached_paginated_response(self, request, pinboard, name, get_queryset, serializer_class):
+        paginator = self.pagination_class()
+        limit = paginator.get_limit(request)
+        offset = paginator.get_offset(request)
+
+        def compute():
+            page = paginator.paginate_queryset(get_queryset(), request, view=self)
+            return {'count': paginator.count, 'results': list(serializer_class(page, many=True).data)}
+
+        serializer_path = f'{serializer_class.__module__}.{serializer_class.__qualname__}'
+        data = pinboard_cache.get_or_compute(pinboard, name, compute, serializer_path, limit, offset)
+
+        paginator.request = request
+        paginator.limit = limit
+        paginator.offset = offset
+        paginator.count = data['count']
+        return paginator.get_paginated_response(data['results'])
 
     @property
     def _source_pinboard(self):
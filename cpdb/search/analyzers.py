@@ -1,4 +1,5 @@
-from elasticsearch_dsl import analyzer, tokenizer, analysis
+from elasticsearch_dsl import analyzer, tokenizer, analysis, Text
+from elasticsearch_dsl.field import InnerObject
 
 
 remove_white_spaces = analysis.char_filter('remove_white_spaces', 'pattern_replace', pattern=' ', replacement='')
@@ -47,3 +48,82 @@ text_search_analyzer = analyzer(
     filter=['lowercase'],
     tokenizer=tokenizer('autocomplete_search', 'pattern', pattern='[^a-zA-Z0-9\-]+')
 )
+
+autocomplete_edge_ngram = analyzer(
+    'autocomplete_edge_ngram',
+    filter=['lowercase'],
+    tokenizer=tokenizer(
+        'autocomplete_edge_ngram', 'edge_ngram',
+        min_gram=2, max_gram=20, token_chars=['letter', 'digit', 'dash_punctuation']
+    )
+)
+
+autocomplete_prefix = analyzer(
+    'autocomplete_prefix',
+    filter=[
+        'lowercase',
+        analysis.token_filter('autocomplete_shingle', 'shingle', min_shingle_size=2, max_shingle_size=3),
+        analysis.token_filter('autocomplete_prefix_edge_ngram', 'edge_ngram', min_gram=2, max_gram=20),
+    ],
+    tokenizer=tokenizer('autocomplete_search', 'pattern', pattern='[^a-zA-Z0-9\-]+')
+)
+
+autocomplete_prefix_search = analyzer(
+    'autocomplete_prefix_search',
+    char_filter=[analysis.char_filter('join_words', 'pattern_replace', pattern='[^a-zA-Z0-9\-]+', replacement=' ')],
+    filter=['lowercase', 'trim'],
+    tokenizer='keyword'
+)
+
+NGRAM_PROFILE = 'ngram'
+EDGE_NGRAM_PROFILE = 'edge_ngram'
+AUTOCOMPLETE_PROFILES = [NGRAM_PROFILE, EDGE_NGRAM_PROFILE]
+
+
+def _edge_ngram_field(field):
+    params = dict(field._params)
+    params['analyzer'] = autocomplete_edge_ngram
+    params['fields'] = dict(
+        field.fields.to_dict(),
+        prefix=Text(analyzer=autocomplete_prefix, search_analyzer=autocomplete_prefix_search)
+    )
+    return Text(**params)
+
+
+def _is_autocomplete_field(field):
+    analyzer_name = getattr(getattr(field, 'analyzer', None), '_name', None)
+    return isinstance(field, Text) and analyzer_name in [autocomplete._name, autocomplete_edge_ngram._name]
+
+
+def apply_autocomplete_profile(mapping, profile, path=''):
+    '''
+    Switch the autocomplete fields of a mapping (or of a nested/object field) to the analyzers of profile.
+    The edge_ngram profile only indexes prefixes of each word, which keeps the term dictionary much smaller than
+    ngram, plus a `prefix` subfield of word shingle prefixes to match what users type across words.
+    Return paths of the autocomplete fields.
+    '''
+    if profile not in AUTOCOMPLETE_PROFILES:
+        raise ValueError(f'Unknown autocomplete profile: {profile}')
+
+    inner_object = mapping if isinstance(mapping, InnerObject) else mapping.properties
+    autocomplete_fields = []
+    for name, field in list(inner_object.properties.to_dict().items()):
+        if isinstance(field, InnerObject):
+            autocomplete_fields += apply_autocomplete_profile(field, profile, f'{path}{name}.')
+        elif _is_autocomplete_field(field):
+            if profile == EDGE_NGRAM_PROFILE:
+                inner_object.field(name, _edge_ngram_field(field))
+            autocomplete_fields.append(f'{path}{name}')
+    return autocomplete_fields
+
+
+def autocomplete_profile(profile):
+    '''
+    Doc type decorator selecting the analyzer profile of its autocomplete fields. Doc types sharing an index
+    must use the same profile for fields having the same name.
+    '''
+    def decorator(doc_type_klass):
+        autocomplete_fields = apply_autocomplete_profile(doc_type_klass._doc_type.mapping, profile)
+        doc_type_klass.autocomplete_prefix_fields = autocomplete_fields if profile == EDGE_NGRAM_PROFILE else []
+        return doc_type_klass
+    return decorator
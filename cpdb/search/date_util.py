@@ -1,4 +1,6 @@
 import re
+from datetime import datetime
+from functools import lru_cache
 
 from dateparser.search import search_dates
 from dateparser import parse
@@ -13,6 +15,21 @@ DELIMITERS_PATTERN = r'[/\:\-\,\s\_\+\@]'
 COMPONENT_PATTERN = fr'({MONTHS_PATTERN}|{DIGITS_MODIFIER_PATTERN}|{DIGITS_PATTERN})\,?'
 DATE_PATTERN = f'^({COMPONENT_PATTERN})({DELIMITERS_PATTERN}({COMPONENT_PATTERN}))*$'
 SPLIT_DATE_TOKEN = 'SPLIT_DATE_TOKEN'
+DATES_CACHE_SIZE = 2048
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+}
+MONTH_NAMES_PATTERN = re.compile(fr'\b(?:{MONTHS_PATTERN})\b')
+NUMBERS_PATTERN = re.compile(r'\d+')
+ORDINAL_PATTERN = r'(\d{1,2})(?:st|nd|rd|th)?'
+ISO_DATE_PATTERN = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+US_DATE_PATTERN = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+MONTH_FIRST_DATE_PATTERN = re.compile(fr'^({MONTHS_PATTERN}) {ORDINAL_PATTERN},? (\d{{4}})$')
+DAY_FIRST_DATE_PATTERN = re.compile(fr'^{ORDINAL_PATTERN} ({MONTHS_PATTERN}),? (\d{{4}})$')
 
 
 def _remove_illegal_words(string):
@@ -36,9 +53,7 @@ def _search_first_date(string):
     return None, ''
 
 
-def find_dates_from_string(string):
-    string = _remove_illegal_words(string)
-
+def _find_dates_with_dateparser(string):
     dates = []
     date, remaining = _search_first_date(string)
     if date:
@@ -50,3 +65,62 @@ def find_dates_from_string(string):
             dates.append(date)
 
     return dates
+
+
+def _may_contain_complete_date(string):
+    """
+    A complete date needs a day, a month and a year, at least two of them being numbers.
+    Strings with fewer components (names, badge numbers...) are rejected without dateparser.
+    """
+    string = string.replace(SPLIT_DATE_TOKEN, ' ')
+    numbers = NUMBERS_PATTERN.findall(string)
+    month_names = MONTH_NAMES_PATTERN.findall(string)
+    return len(numbers) >= 2 and len(numbers) + len(month_names) >= 3
+
+
+def _to_date(year, month, day):
+    try:
+        return datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _parse_simple_date(string):
+    """Parse the unambiguous formats directly, None means dateparser has to decide"""
+    match = ISO_DATE_PATTERN.match(string)
+    if match:
+        year, month, day = match.groups()
+        return _to_date(year, month, day)
+
+    match = US_DATE_PATTERN.match(string)
+    if match:
+        month, day, year = match.groups()
+        return _to_date(year, month, day)
+
+    match = MONTH_FIRST_DATE_PATTERN.match(string)
+    if match:
+        month, day, year = match.groups()
+        return _to_date(year, MONTHS[month], day)
+
+    match = DAY_FIRST_DATE_PATTERN.match(string)
+    if match:
+        day, month, year = match.groups()
+        return _to_date(year, MONTHS[month], day)
+
+    return None
+
+
+@lru_cache(maxsize=DATES_CACHE_SIZE)
+def _find_dates(string):
+    if not _may_contain_complete_date(string):
+        return ()
+
+    date = _parse_simple_date(string)
+    if date:
+        return (date,)
+
+    return tuple(_find_dates_with_dateparser(string))
+
+
+def find_dates_from_string(string):
+    return list(_find_dates(_remove_illegal_words(string)))
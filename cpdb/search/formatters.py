@@ -1,6 +1,6 @@
 from django.conf import settings
-from django.db.models import Case, When
 
+from es_index.utils import hydrate, serialize_from_source
 from lawsuit.models import Lawsuit
 from search.serializers import LawsuitSerializer
 
@@ -42,16 +42,22 @@ class SimpleFormatter(Formatter):
 
 class DataFormatter(Formatter):
     serializer = None
+    # Serialized fields which may be stored in the documents, the database is skipped if all documents have them
+    source_fields = None
 
     def get_queryset(self, ids):
         raise NotImplementedError
 
     def items(self, docs):
         ids = [doc._id for doc in docs]
-        preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(ids)])
-        return self.get_queryset(ids).order_by(preserved)
+        items, _ = hydrate(self.get_queryset(ids), ids)
+        return items
 
     def serialize(self, docs):
+        if self.source_fields:
+            sources = serialize_from_source(docs, self.source_fields)
+            if sources is not None:
+                return sources
         return [self.serializer(item).data for item in self.items(docs)]
 
     def format(self, response):
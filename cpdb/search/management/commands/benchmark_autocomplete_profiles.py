@@ -0,0 +1,112 @@
+import copy
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.models import SearchTracking
+from es_index import es_client
+from es_index.indices import Index
+from es_index.utils import per_run_uuid
+from officers.doc_types import OfficerInfoDocType
+from search.analyzers import AUTOCOMPLETE_PROFILES, EDGE_NGRAM_PROFILE, apply_autocomplete_profile
+from search.doc_types import (
+    ReportDocType, UnitDocType, AreaDocType, RankDocType, CrDocType, TRRDocType, LawsuitDocType,
+    ZipCodeDocType, SearchTermItemDocType
+)
+from search.services import LatencyRecorder
+
+REINDEX_TIMEOUT = 3600
+BENCHMARK_DOC_TYPES = {
+    doc_type._doc_type.name: doc_type for doc_type in [
+        ReportDocType, UnitDocType, AreaDocType, RankDocType, CrDocType, TRRDocType, LawsuitDocType,
+        ZipCodeDocType, SearchTermItemDocType, OfficerInfoDocType
+    ]
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare index size, indexing throughput and query latency of the autocomplete analyzer profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--doc-types', nargs='+', choices=sorted(BENCHMARK_DOC_TYPES.keys()),
+            default=sorted(BENCHMARK_DOC_TYPES.keys()), help='Doc types to copy into the benchmark indices'
+        )
+        parser.add_argument('--queries', type=int, default=200, help='Number of recorded search queries to run')
+
+    def _create_index(self, index, doc_type, profile):
+        index.create()
+        index.close()
+        mapping = copy.deepcopy(doc_type._doc_type.mapping)
+        fields = apply_autocomplete_profile(mapping, profile)
+        # nested fields need a nested query, only top level fields are searched
+        search_fields = [field for field in fields if '.' not in field]
+        if profile == EDGE_NGRAM_PROFILE:
+            search_fields += [f'{field}.prefix' for field in search_fields]
+        mapping.save(index._name)
+        index.open()
+        return search_fields
+
+    def _copy_documents(self, index, doc_type):
+        es_client.reindex({
+            'source': {'index': doc_type._doc_type.index, 'type': [doc_type._doc_type.name]},
+            'dest': {'index': index._name}
+        }, request_timeout=REINDEX_TIMEOUT, refresh=True)
+
+    def _index_size(self, index):
+        es_client.indices.forcemerge(index=index._name, max_num_segments=1, request_timeout=REINDEX_TIMEOUT)
+        stats = es_client.indices.stats(index=index._name, metric='store,docs')
+        primaries = stats['indices'][index._name]['primaries']
+        return primaries['docs']['count'], primaries['store']['size_in_bytes']
+
+    def _run_queries(self, index, doc_type, search_fields, queries, latency, profile):
+        if not search_fields:
+            return
+        for query in queries:
+            response = es_client.search(index=index._name, doc_type=doc_type._doc_type.name, body={
+                'query': {'multi_match': {'query': query, 'operator': 'and', 'fields': search_fields}},
+                'size': 10
+            })
+            latency.record(profile, response['took'])
+
+    def _benchmark_doc_type(self, doc_type, profile, queries, latency):
+        # one index per doc type, doc types of the same index may map a field name to different types
+        index = Index(f'autocomplete_benchmark_{profile}_{doc_type._doc_type.name}_{per_run_uuid}')
+        try:
+            search_fields = self._create_index(index, doc_type, profile)
+
+            start_time = time.time()
+            self._copy_documents(index, doc_type)
+            indexing_time = time.time() - start_time
+
+            docs_count, size_in_bytes = self._index_size(index)
+            self._run_queries(index, doc_type, search_fields, queries, latency, profile)
+        finally:
+            index.delete(ignore=404)
+        return docs_count, size_in_bytes, indexing_time
+
+    def handle(self, *args, **options):
+        doc_types = [BENCHMARK_DOC_TYPES[name] for name in options['doc_types']]
+        queries = list(
+            SearchTracking.objects.order_by('-usages').values_list('query', flat=True)[:options['queries']]
+        )
+        latency = LatencyRecorder(max_samples=len(queries) * len(doc_types) or 1)
+
+        for profile in AUTOCOMPLETE_PROFILES:
+            docs_count, size_in_bytes, indexing_time = 0, 0, 0
+            for doc_type in doc_types:
+                doc_type_docs_count, doc_type_size_in_bytes, doc_type_indexing_time = self._benchmark_doc_type(
+                    doc_type, profile, queries, latency
+                )
+                docs_count += doc_type_docs_count
+                size_in_bytes += doc_type_size_in_bytes
+                indexing_time += doc_type_indexing_time
+
+            throughput = docs_count / indexing_time if indexing_time else 0
+            self.stdout.write(
+                f'{profile}: {docs_count} docs, index size {size_in_bytes / 1024 / 1024:.2f}MB, '
+                f'indexing {indexing_time:.3f}s ({throughput:.0f} docs/s)'
+            )
+
+        for profile, stats in latency.percentiles().items():
+            self.stdout.write(f'{profile}: {stats["count"]} queries, took p50 {stats["p50"]}ms, p99 {stats["p99"]}ms')
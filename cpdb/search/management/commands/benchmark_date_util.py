@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.models import SearchTracking
+from search import date_util
+
+
+class Command(BaseCommand):
+    help = 'Compare date extraction with and without the fast path over the most used recorded search queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help='Number of recorded queries to use')
+
+    def _time(self, func, queries):
+        start_time = time.time()
+        results = [func(query) for query in queries]
+        return time.time() - start_time, results
+
+    def handle(self, *args, **options):
+        queries = list(
+            SearchTracking.objects.order_by('-usages').values_list('query', flat=True)[:options['limit']]
+        )
+
+        dateparser_time, expected_results = self._time(
+            lambda query: date_util._find_dates_with_dateparser(date_util._remove_illegal_words(query)), queries
+        )
+        date_util._find_dates.cache_clear()
+        cold_time, results = self._time(date_util.find_dates_from_string, queries)
+        warm_time, _ = self._time(date_util.find_dates_from_string, queries)
+
+        mismatches = sum(1 for expected, result in zip(expected_results, results) if expected != result)
+        self.stdout.write(f'Queries: {len(queries)}')
+        self.stdout.write(f'dateparser only: {dateparser_time:.3f}s')
+        self.stdout.write(f'fast path, empty cache: {cold_time:.3f}s')
+        self.stdout.write(f'fast path, warm cache: {warm_time:.3f}s')
+        self.stdout.write(f'Mismatches: {mismatches}')
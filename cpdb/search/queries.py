@@ -1,5 +1,7 @@
+from django.db.models import OuterRef, Subquery
+
 from data.models import Officer, Allegation
-from trr.models import TRR
+from trr.models import TRR, ActionResponse
 from lawsuit.models import Lawsuit
 
 
@@ -15,30 +17,48 @@ class BaseModelQuery(object):
     def query(self):
         return self.queryset().filter(**{f'{self.query_field}__in': self.ids})
 
+    def ordered_query(self):
+        '''
+        Fetch objects of ids in a single query and return them in the order of ids, unknown ids are skipped.
+        '''
+        queryset = self.queryset()
+        to_python = queryset.model._meta.get_field(self.query_field).to_python
+        ids = list(dict.fromkeys(to_python(item_id) for item_id in self.ids))
+        objects = queryset.in_bulk(ids, field_name=self.query_field)
+        return [objects[item_id] for item_id in ids if item_id in objects]
+
 
 class OfficerQuery(BaseModelQuery):
     query_field = 'id'
 
     def queryset(self):
-        return Officer.objects
+        return Officer.objects.only(
+            'id', 'first_name', 'last_name', 'race', 'gender', 'rank', 'allegation_count', 'sustained_count',
+            'birth_year'
+        )
 
 
 class CrQuery(BaseModelQuery):
     query_field = 'crid'
 
     def queryset(self):
-        return Allegation.objects
+        return Allegation.objects.select_related('most_common_category').only(
+            'crid', 'incident_date', 'most_common_category', 'most_common_category__category'
+        )
 
 
 class TrrQuery(BaseModelQuery):
     query_field = 'id'
 
     def queryset(self):
-        return TRR.objects
+        top_force_type = ActionResponse.objects.filter(
+            trr=OuterRef('id'), person='Member Action'
+        ).order_by('-action_sub_category', 'force_type').values('force_type')[:1]
+        return TRR.objects.only('id', 'trr_datetime').annotate(annotated_top_force_type=Subquery(top_force_type))
 
 
 class LawsuitQuery(BaseModelQuery):
     query_field = 'id'
 
     def queryset(self):
-        return Lawsuit.objects
+        return Lawsuit.objects.only('id', 'case_no', 'primary_cause', 'summary', 'incident_date')
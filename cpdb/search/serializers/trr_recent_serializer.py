@@ -7,9 +7,15 @@ from shared.serializer import NoNullSerializer
 
 class TRRRecentSerializer(NoNullSerializer):
     id = serializers.IntegerField()
-    force_type = serializers.CharField(max_length=255, source='top_force_type')
+    force_type = serializers.SerializerMethodField()
     trr_datetime = serializers.DateTimeField(format='%Y-%m-%d', default_timezone=pytz.utc)
     type = serializers.SerializerMethodField()
 
     def get_type(self, obj):
         return 'TRR'
+
+    def get_force_type(self, obj):
+        try:
+            return obj.annotated_top_force_type
+        except AttributeError:
+            return obj.top_force_type
@@ -1,4 +1,17 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+
+from django.conf import settings
+
+from elasticsearch.exceptions import ConnectionTimeout
+from elasticsearch_dsl import MultiSearch
+
+from officers.index_aliases import officers_index_alias
 from search.date_util import find_dates_from_string
+from search.indices import autocompletes_alias
 from search.workers import (
     DateWorker,
     OfficerWorker,
@@ -8,6 +21,7 @@ from search.workers import (
 )
 from .formatters import SimpleFormatter
 
+logger = logging.getLogger(__name__)
 
 DEFAULT_SEARCH_WORKERS = {
     'OFFICER': OfficerWorker(),
@@ -17,28 +31,194 @@ DEFAULT_SEARCH_WORKERS = {
 }
 
 
+class LatencyRecorder(object):
+    '''
+    Keep the latest `max_samples` latencies (in milliseconds) of each content type of this process.
+    '''
+    def __init__(self, max_samples=1000):
+        self.max_samples = max_samples
+        self._samples = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._lock = threading.Lock()
+
+    def record(self, content_type, milliseconds):
+        with self._lock:
+            self._samples[content_type].append(milliseconds)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    @staticmethod
+    def _nearest_rank(sorted_samples, percent):
+        return sorted_samples[max(math.ceil(percent / 100.0 * len(sorted_samples)) - 1, 0)]
+
+    def percentiles(self):
+        with self._lock:
+            samples = {content_type: sorted(values) for content_type, values in self._samples.items() if values}
+
+        return {
+            content_type: {
+                'count': len(values),
+                'p50': self._nearest_rank(values, 50),
+                'p99': self._nearest_rank(values, 99),
+            } for content_type, values in samples.items()
+        }
+
+
+search_latency = LatencyRecorder()
+
+
+class SearchResultCache(object):
+    '''
+    In-process LRU cache of Elasticsearch search results.
+
+    Keys start with the version of the searched indices, i.e. the names of the indices the aliases point to and
+    their data versions. IndexAlias.indexing() swaps the aliases to new indices and incremental indexing bumps
+    the data version, so the cache is emptied once it notices the new version, which is looked up at most every
+    `version_check_interval` seconds.
+    '''
+    def __init__(self, maxsize=1000, aliases=(), version_check_interval=10):
+        self.maxsize = maxsize
+        self.aliases = aliases
+        self.version_check_interval = version_check_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    @property
+    def version(self):
+        now = time.monotonic()
+        if self._version_checked_at is None or now - self._version_checked_at >= self.version_check_interval:
+            version = tuple((alias.current_index_name(), alias.data_version()) for alias in self.aliases)
+            with self._lock:
+                if version != self._version:
+                    self._entries.clear()
+                    self._version = version
+                self._version_checked_at = now
+        return self._version
+
+    @staticmethod
+    def normalize_term(term):
+        return ' '.join(term.split())
+
+    def key(self, content_type, term, limit):
+        return self.version, content_type, self.normalize_term(term), limit
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+search_result_cache = SearchResultCache(
+    maxsize=settings.SEARCH_RESULT_CACHE_SIZE,
+    aliases=(autocompletes_alias, officers_index_alias)
+)
+
+
 class SearchManager(object):
     def __init__(self, formatters=None, workers=None, hooks=None):
         self.formatters = formatters or {}
         self.workers = workers or DEFAULT_SEARCH_WORKERS
         self.hooks = hooks or []
+        self.partial_content_types = []
 
     def search(self, term, content_type=None, limit=10):
+        '''
+        Return formatted results keyed by content type. Content types which failed are left out and the ones
+        which timed out only hold the hits found in time, both are listed in partial_content_types.
+        '''
         response = {}
 
         _workers = {content_type: self.workers[content_type]} if content_type else self.workers
-        search_with_dates = any([isinstance(worker, DateWorker) for worker in _workers.values()])
-        dates = [date.strftime('%Y-%m-%d') for date in find_dates_from_string(term)] if search_with_dates else []
-
-        for _content_type, worker in _workers.items():
-            search_results = worker.search(term, size=limit, dates=dates)
-            response[_content_type] = self._formatter_for(_content_type)().format(search_results)
+        search_results = self._cached_search(term, _workers, limit)
+        for _content_type, results in search_results.items():
+            response[_content_type] = self._formatter_for(_content_type)().format(results)
 
         for hook in self.hooks:
             hook.execute(term, content_type, response)
 
+        self.partial_content_types = [
+            _content_type for _content_type in _workers.keys()
+            if _content_type not in search_results or search_results[_content_type].timed_out
+        ]
         return response
 
+    def _cached_search(self, term, workers, limit):
+        '''
+        Search with the given workers, only sending the queries whose results are not in search_result_cache.
+        Results are cached per worker so that viewsets sharing a content type with different workers do not collide.
+        Content types which failed are neither cached nor returned, partial results of those which timed out are
+        returned but not cached.
+        '''
+        if not search_result_cache.enabled:
+            return self._search(term, workers, limit)
+
+        term = search_result_cache.normalize_term(term)
+        keys = {
+            _content_type: search_result_cache.key((_content_type, type(worker).__name__), term, limit)
+            for _content_type, worker in workers.items()
+        }
+        cached_results = {_content_type: search_result_cache.get(key) for _content_type, key in keys.items()}
+
+        missing_workers = {
+            _content_type: workers[_content_type]
+            for _content_type, results in cached_results.items() if results is None
+        }
+        for _content_type, results in self._search(term, missing_workers, limit).items():
+            if not results.timed_out:
+                search_result_cache.set(keys[_content_type], results)
+            cached_results[_content_type] = results
+
+        return OrderedDict(
+            (_content_type, cached_results[_content_type])
+            for _content_type in workers.keys() if cached_results[_content_type] is not None
+        )
+
+    def _search(self, term, workers, limit):
+        search_with_dates = any([isinstance(worker, DateWorker) for worker in workers.values()])
+        dates = [date.strftime('%Y-%m-%d') for date in find_dates_from_string(term)] if search_with_dates else []
+
+        return self._multi_search({
+            _content_type: worker.search_query(term, size=limit, dates=dates)
+            for _content_type, worker in workers.items()
+        })
+
     def get_search_query_for_type(self, term, content_type):
         worker = self.workers[content_type]
         dates = [
@@ -55,11 +235,44 @@ class SearchManager(object):
         '''
         response = {}
 
-        for content_type, worker in self.workers.items():
-            search_results = worker.get_sample()
-            response[content_type] = self._formatter_for(content_type)().format(search_results)
+        search_results = self._multi_search({
+            content_type: worker.sample_query() for content_type, worker in self.workers.items()
+        })
+        for content_type, results in search_results.items():
+            response[content_type] = self._formatter_for(content_type)().format(results)
 
         return response
 
+    def _multi_search(self, queries):
+        '''
+        Send all queries in a single _msearch request and return responses keyed like the queries.
+        The time Elasticsearch took for each of them is recorded in search_latency.
+        Queries which failed are left out, as is everything when the whole request takes longer than
+        SEARCH_REQUEST_TIMEOUT. Queries which hit their timeout keep the hits found so far, `timed_out` is set.
+        '''
+        if not queries:
+            return {}
+
+        multi_search = MultiSearch().params(request_timeout=settings.SEARCH_REQUEST_TIMEOUT)
+        for query in queries.values():
+            multi_search = multi_search.add(query)
+
+        try:
+            responses = multi_search.execute(raise_on_error=False)
+        except ConnectionTimeout:
+            logger.warning('Search of %s timed out', ', '.join(queries.keys()))
+            return {}
+
+        results = {}
+        for content_type, result in zip(queries.keys(), responses):
+            if result is None:
+                logger.warning('Search of %s failed', content_type)
+                continue
+            search_latency.record(content_type, result.took)
+            if result.timed_out:
+                logger.warning('Search of %s timed out after %sms, returning partial hits', content_type, result.took)
+            results[content_type] = result
+        return results
+
     def _formatter_for(self, content_type):
         return self.formatters.get(content_type, SimpleFormatter)
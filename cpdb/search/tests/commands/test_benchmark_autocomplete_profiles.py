@@ -0,0 +1,47 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from robber import expect
+
+from analytics.factories import SearchTrackingFactory
+from es_index import es_client
+from officers.doc_types import OfficerInfoDocType
+from search.doc_types import AreaDocType, UnitDocType
+from search.tests.utils import IndexMixin
+
+
+class BenchmarkAutocompleteProfilesCommandTestCase(IndexMixin, TestCase):
+    def test_handle(self):
+        UnitDocType(meta={'id': '1'}, name='001', long_name='Unit 001', description='District 001').save()
+        OfficerInfoDocType(meta={'id': '1'}, full_name='Jerome Finnigan', badge='123').save()
+        OfficerInfoDocType(meta={'id': '2'}, full_name='Edward May', badge='456').save()
+        self.refresh_index()
+        SearchTrackingFactory(query='jerome fin', usages=3)
+        SearchTrackingFactory(query='district', usages=2)
+        out = StringIO()
+
+        call_command('benchmark_autocomplete_profiles', doc_types=['unit', 'officer_info_doc_type'], stdout=out)
+
+        output = out.getvalue()
+        expect(output).to.contain('ngram: 3 docs')
+        expect(output).to.contain('edge_ngram: 3 docs')
+        expect(output).to.contain('ngram: 4 queries')
+        expect(output).to.contain('edge_ngram: 4 queries')
+        expect(es_client.indices.get(index='test_autocomplete_benchmark_*')).to.eq({})
+
+    def test_handle_with_default_doc_types(self):
+        UnitDocType(meta={'id': '1'}, name='001', long_name='Unit 001', description='District 001').save()
+        OfficerInfoDocType(meta={'id': '1'}, full_name='Jerome Finnigan', allegation_count=10).save()
+        AreaDocType(meta={'id': '1'}, name='Lincoln Square', area_type='community', allegation_count=5).save()
+        self.refresh_index()
+        SearchTrackingFactory(query='lincoln', usages=1)
+        out = StringIO()
+
+        call_command('benchmark_autocomplete_profiles', stdout=out)
+
+        output = out.getvalue()
+        expect(output).to.contain('ngram: 3 docs')
+        expect(output).to.contain('edge_ngram: 3 docs')
+        expect(es_client.indices.get(index='test_autocomplete_benchmark_*')).to.eq({})
@@ -0,0 +1,22 @@
+from io import StringIO
+
+from django.test import TestCase
+from django.core.management import call_command
+
+from robber import expect
+
+from analytics.factories import SearchTrackingFactory
+
+
+class BenchmarkDateUtilCommandTestCase(TestCase):
+    def test_handle(self):
+        SearchTrackingFactory(query='Jerome Finnigan', usages=3)
+        SearchTrackingFactory(query='2018-06-01', usages=2)
+        SearchTrackingFactory(query='ke 2001-01-01', usages=1)
+        out = StringIO()
+
+        call_command('benchmark_date_util', stdout=out)
+
+        output = out.getvalue()
+        expect(output).to.contain('Queries: 3')
+        expect(output).to.contain('Mismatches: 0')
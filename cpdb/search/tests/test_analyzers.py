@@ -0,0 +1,79 @@
+from django.test import SimpleTestCase
+
+from elasticsearch_dsl import DocType, Text, Keyword, Nested, Integer
+from robber import expect
+
+from search.analyzers import (
+    autocomplete, autocomplete_search, text_analyzer, apply_autocomplete_profile, autocomplete_profile,
+    NGRAM_PROFILE, EDGE_NGRAM_PROFILE
+)
+
+
+def build_doc_type_klass():
+    class TestDocType(DocType):
+        name = Text(analyzer=autocomplete, search_analyzer=autocomplete_search, fields={'keyword': Keyword()})
+        summary = Text(analyzer=text_analyzer)
+        units = Nested(properties={
+            'id': Integer(),
+            'long_unit_name': Text(analyzer=autocomplete, search_analyzer=autocomplete_search),
+        })
+
+        class Meta:
+            doc_type = 'test_doc_type'
+
+    return TestDocType
+
+
+class ApplyAutocompleteProfileTestCase(SimpleTestCase):
+    def test_edge_ngram_profile(self):
+        mapping = build_doc_type_klass()._doc_type.mapping
+
+        fields = apply_autocomplete_profile(mapping, EDGE_NGRAM_PROFILE)
+
+        expect(fields).to.eq(['name', 'units.long_unit_name'])
+        properties = mapping.to_dict()['test_doc_type']['properties']
+        expect(properties['name']).to.eq({
+            'type': 'text',
+            'analyzer': 'autocomplete_edge_ngram',
+            'search_analyzer': 'autocomplete_search',
+            'fields': {
+                'keyword': {'type': 'keyword'},
+                'prefix': {
+                    'type': 'text',
+                    'analyzer': 'autocomplete_prefix',
+                    'search_analyzer': 'autocomplete_prefix_search',
+                },
+            },
+        })
+        expect(properties['summary']).to.eq({'type': 'text', 'analyzer': 'text_analyzer'})
+        expect(properties['units']['properties']['long_unit_name']['analyzer']).to.eq('autocomplete_edge_ngram')
+        expect(mapping._collect_analysis()['tokenizer']['autocomplete_edge_ngram']['type']).to.eq('edge_ngram')
+
+    def test_ngram_profile(self):
+        mapping = build_doc_type_klass()._doc_type.mapping
+        expected_mapping = mapping.to_dict()
+
+        fields = apply_autocomplete_profile(mapping, NGRAM_PROFILE)
+
+        expect(fields).to.eq(['name', 'units.long_unit_name'])
+        expect(mapping.to_dict()).to.eq(expected_mapping)
+
+    def test_unknown_profile(self):
+        mapping = build_doc_type_klass()._doc_type.mapping
+
+        expect(lambda: apply_autocomplete_profile(mapping, 'trigram')).to.throw(ValueError)
+
+
+class AutocompleteProfileTestCase(SimpleTestCase):
+    def test_edge_ngram_profile(self):
+        doc_type_klass = autocomplete_profile(EDGE_NGRAM_PROFILE)(build_doc_type_klass())
+
+        expect(doc_type_klass.autocomplete_prefix_fields).to.eq(['name', 'units.long_unit_name'])
+        expect(
+            doc_type_klass._doc_type.mapping.to_dict()['test_doc_type']['properties']['name']['analyzer']
+        ).to.eq('autocomplete_edge_ngram')
+
+    def test_ngram_profile(self):
+        doc_type_klass = autocomplete_profile(NGRAM_PROFILE)(build_doc_type_klass())
+
+        expect(doc_type_klass.autocomplete_prefix_fields).to.eq([])
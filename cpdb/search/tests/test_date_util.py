@@ -2,8 +2,10 @@ from datetime import datetime
 
 from django.test import SimpleTestCase
 
+from mock import patch
 from robber import expect
 
+from search import date_util
 from search.date_util import find_dates_from_string
 
 
@@ -95,3 +97,40 @@ class DateUtilTestCase(SimpleTestCase):
         ]
         for incomplete_date_string in incomplete_date_strings:
             expect(find_dates_from_string(incomplete_date_string)).to.eq([])
+
+    def test_find_dates_from_string_skip_dateparser_for_non_dates(self):
+        with patch('search.date_util.search_dates') as search_dates_mock:
+            for string in ['Jerome Finnigan', '8562', 'unit 715', '2001 Jun', 'ke 2018 de']:
+                expect(find_dates_from_string(string)).to.eq([])
+            expect(search_dates_mock).not_to.be.called()
+
+    def test_find_dates_from_string_simple_dates_without_dateparser(self):
+        test_cases = {
+            '2018-06-01': [datetime(2018, 6, 1)],
+            '6/1/2018': [datetime(2018, 6, 1)],
+            'Jun 1st, 2018': [datetime(2018, 6, 1)],
+            '1 September 2018': [datetime(2018, 9, 1)],
+        }
+        with patch('search.date_util.search_dates') as search_dates_mock:
+            for string, dates in test_cases.items():
+                expect(find_dates_from_string(string)).to.eq(dates)
+            expect(search_dates_mock).not_to.be.called()
+
+    def test_find_dates_from_string_ambiguous_dates_use_dateparser(self):
+        expect(find_dates_from_string('13/1/2018')).to.eq([datetime(2018, 1, 13)])
+        expect(find_dates_from_string('2018 June 1')).to.eq([datetime(2018, 6, 1)])
+
+    def test_find_dates_from_string_is_cached(self):
+        date_util._find_dates.cache_clear()
+        find_dates_from_string('2001 Jan 12 2014 Oct 1st')
+        find_dates_from_string('2001  JAN 12 2014 oct 1st')
+
+        cache_info = date_util._find_dates.cache_info()
+        expect(cache_info.hits).to.eq(1)
+        expect(cache_info.misses).to.eq(1)
+
+    def test_find_dates_from_string_returns_new_list(self):
+        dates = find_dates_from_string('2018-06-01')
+        dates.append(datetime(2019, 1, 1))
+
+        expect(find_dates_from_string('2018-06-01')).to.eq([datetime(2018, 6, 1)])
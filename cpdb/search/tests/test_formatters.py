@@ -83,6 +83,50 @@ class DataFormatterTestCase(SimpleTestCase):
 
         serialize_mock.assert_called_with(docs)
 
+    def test_serialize_from_source_fields(self):
+        class SourceFormatter(DataFormatter):
+            source_fields = ['id', 'name']
+
+            def get_queryset(self, ids):
+                raise AssertionError('should not query the database')
+
+        docs = [
+            Mock(to_dict=Mock(return_value={'id': 2, 'name': 'b', 'other': 'x'})),
+            Mock(to_dict=Mock(return_value={'id': 1, 'name': 'a'})),
+        ]
+
+        expect(SourceFormatter().serialize(docs)).to.eq([{'id': 2, 'name': 'b'}, {'id': 1, 'name': 'a'}])
+
+    @patch('search.formatters.hydrate', return_value=(['item_2', 'item_1'], []))
+    def test_serialize_from_database_when_source_fields_missing(self, hydrate_mock):
+        class SourceFormatter(DataFormatter):
+            source_fields = ['id', 'name']
+            serializer = Mock(side_effect=lambda item: Mock(data=f'serialized_{item}'))
+
+            def get_queryset(self, ids):
+                return 'queryset'
+
+        docs = [
+            Mock(_id='2', to_dict=Mock(return_value={'id': 2, 'name': 'b'})),
+            Mock(_id='1', to_dict=Mock(return_value={'id': 1})),
+        ]
+
+        expect(SourceFormatter().serialize(docs)).to.eq(['serialized_item_2', 'serialized_item_1'])
+        hydrate_mock.assert_called_with('queryset', ['2', '1'])
+
+    @patch('search.formatters.hydrate', return_value=(['item_2', 'item_1'], []))
+    def test_serialize(self, hydrate_mock):
+        class ItemFormatter(DataFormatter):
+            serializer = Mock(side_effect=lambda item: Mock(data=f'serialized_{item}'))
+
+            def get_queryset(self, ids):
+                return 'queryset'
+
+        docs = [Mock(_id='2'), Mock(_id='1')]
+
+        expect(ItemFormatter().serialize(docs)).to.eq(['serialized_item_2', 'serialized_item_1'])
+        hydrate_mock.assert_called_with('queryset', ['2', '1'])
+
 
 class OfficerFormatterTestCase(SimpleTestCase):
     def test_officer_doc_format(self):
@@ -449,6 +493,16 @@ class LawsuitFormatterTestCase(TestCase):
             {item.id for item in queryset}
         ).to.eq({lawsuit_1.id, lawsuit_2.id})
 
+    def test_items(self):
+        lawsuit_1 = LawsuitFactory()
+        lawsuit_2 = LawsuitFactory()
+
+        items = LawsuitFormatter().items([
+            LawsuitDocType(_id=str(lawsuit_2.id)), LawsuitDocType(_id='0'), LawsuitDocType(_id=str(lawsuit_1.id))
+        ])
+
+        expect(items).to.eq([lawsuit_2, lawsuit_1])
+
     def test_serialize(self):
         lawsuit_1 = LawsuitFactory(
             case_no='00-L-5230',
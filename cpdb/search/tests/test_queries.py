@@ -6,7 +6,7 @@ from robber import expect
 
 from data.factories import OfficerFactory, AllegationFactory
 from search.queries import BaseModelQuery, OfficerQuery, CrQuery, TrrQuery, LawsuitQuery
-from trr.factories import TRRFactory
+from trr.factories import TRRFactory, ActionResponseFactory
 from lawsuit.factories import LawsuitFactory
 
 
@@ -49,3 +49,31 @@ class LawsuitQueryTestCase(TestCase):
         LawsuitFactory(id=3)
         results = sorted(list(LawsuitQuery(ids=[1, 2]).query()), key=attrgetter('id'))
         expect(results).to.eq([lawsuit_1, lawsuit_2])
+
+
+class OrderedQueryTestCase(TestCase):
+    def test_ordered_query_keep_order_of_ids(self):
+        officer_1 = OfficerFactory(id=8562)
+        officer_2 = OfficerFactory(id=8563)
+        officer_3 = OfficerFactory(id=8564)
+
+        with self.assertNumQueries(1):
+            results = OfficerQuery(ids=['8564', '8562', '8563']).ordered_query()
+        expect(results).to.eq([officer_3, officer_1, officer_2])
+
+    def test_ordered_query_skip_duplicated_and_unknown_ids(self):
+        allegation_1 = AllegationFactory(crid='C123')
+        allegation_2 = AllegationFactory(crid='C456')
+
+        results = CrQuery(ids=['C456', 'C999', 'C123', 'C456']).ordered_query()
+        expect(results).to.eq([allegation_2, allegation_1])
+
+    def test_trr_ordered_query_annotate_top_force_type(self):
+        trr = TRRFactory(id=123)
+        ActionResponseFactory(trr=trr, force_type='Taser', action_sub_category='5.1')
+        ActionResponseFactory(trr=trr, force_type='Impact Weapon', action_sub_category='5.2')
+        ActionResponseFactory(trr=trr, force_type='Verbal Commands', action_sub_category='6', person='Subject Action')
+
+        results = TrrQuery(ids=[123]).ordered_query()
+        expect(results[0].annotated_top_force_type).to.eq('Impact Weapon')
+        expect(results[0].annotated_top_force_type).to.eq(trr.top_force_type)
@@ -1,9 +1,11 @@
 from django.test import TestCase
 
+from elasticsearch_dsl import MultiSearch
+from elasticsearch.exceptions import ConnectionTimeout
 from mock import Mock, patch
 from robber import expect
 
-from search.services import SearchManager
+from search.services import SearchManager, LatencyRecorder, SearchResultCache, search_latency
 from search.tests.utils import IndexMixin
 from search.workers import DateCRWorker, OfficerWorker
 from search.doc_types import CrDocType
@@ -126,14 +128,140 @@ class SearchManagerTestCase(IndexMixin, TestCase):
             'full_name': u'John Mcdonald'
         }])
 
+    @patch('search.services.MultiSearch')
     @patch('search.services.SimpleFormatter.format', return_value='formatter_results')
-    def test_hooks(self, _):
+    def test_hooks(self, _, multi_search_mock):
+        multi_search_mock.return_value.params.return_value.add.return_value.execute.return_value = [
+            Mock(took=1, timed_out=False)
+        ]
         mock_hook = Mock()
         mock_worker = Mock()
         term = 'whatever'
         SearchManager(hooks=[mock_hook], workers={'mock': mock_worker}).search(term)
         mock_hook.execute.assert_called_with(term, None, {'mock': 'formatter_results'})
 
+    def test_search_sends_single_multi_search(self):
+        OfficerInfoDocType(meta={'id': '1'}, full_name='full name', badge='123', url='url').save()
+        self.refresh_index()
+        search_latency.reset()
+        multi_search_execute = MultiSearch.execute
+
+        with patch('search.services.MultiSearch.execute', autospec=True, side_effect=multi_search_execute) as execute:
+            response = SearchManager().search('fu na')
+
+        expect(execute.call_count).to.eq(1)
+        expect(response['OFFICER']).to.have.length(1)
+        expect(set(search_latency.percentiles().keys())).to.eq({'OFFICER', 'UNIT', 'COMMUNITY', 'NEIGHBORHOOD'})
+        expect(search_latency.percentiles()['OFFICER']['count']).to.eq(1)
+
+    def test_search_uses_result_cache(self):
+        OfficerInfoDocType(meta={'id': '1'}, full_name='full name', badge='123', url='url').save()
+        self.refresh_index()
+        multi_search_execute = MultiSearch.execute
+
+        with patch('search.services.search_result_cache', SearchResultCache(maxsize=10)) as result_cache:
+            with patch(
+                'search.services.MultiSearch.execute', autospec=True, side_effect=multi_search_execute
+            ) as execute:
+                first_response = SearchManager().search('fu  na ')
+                second_response = SearchManager().search('fu na')
+                SearchManager().search('fu na', content_type='OFFICER')
+                SearchManager().search('fu na', content_type='OFFICER', limit=5)
+
+            expect(execute.call_count).to.eq(2)
+            expect(second_response).to.eq(first_response)
+            expect(second_response['OFFICER']).to.have.length(1)
+            expect(result_cache.stats()).to.eq({
+                'size': 5,
+                'maxsize': 10,
+                'hits': 5,
+                'misses': 5,
+                'hit_ratio': 0.5,
+            })
+
+    def test_search_only_queries_missing_results(self):
+        result_cache = SearchResultCache(maxsize=10)
+        officer_worker = Mock(spec=OfficerWorker)
+        date_cr_worker = Mock(spec=DateCRWorker)
+        workers = {'OFFICER': officer_worker, 'DATE > CR': date_cr_worker}
+
+        with patch('search.services.search_result_cache', result_cache):
+            with patch('search.services.MultiSearch') as multi_search_mock:
+                multi_search_mock.return_value.params.return_value.add.return_value.execute.return_value = [
+                    Mock(took=1, timed_out=False, hits=[])
+                ]
+                SearchManager(workers=workers).search('2017-12-27', content_type='OFFICER')
+                SearchManager(workers=workers).search('2017-12-27')
+
+        expect(officer_worker.search_query.call_count).to.eq(1)
+        date_cr_worker.search_query.assert_called_once_with('2017-12-27', size=10, dates=['2017-12-27'])
+
+    @patch('search.services.MultiSearch')
+    def test_search_without_result_cache(self, multi_search_mock):
+        multi_search_mock.return_value.params.return_value.add.return_value.execute.return_value = [
+            Mock(took=1, timed_out=False, hits=[])
+        ]
+        mock_worker = Mock()
+
+        with patch('search.services.search_result_cache', SearchResultCache(maxsize=0)) as result_cache:
+            SearchManager(workers={'mock': mock_worker}).search('term')
+            SearchManager(workers={'mock': mock_worker}).search('term')
+
+            expect(mock_worker.search_query.call_count).to.eq(2)
+            expect(result_cache.stats()['misses']).to.eq(0)
+
+    @patch('search.services.SimpleFormatter.format', return_value='formatter_results')
+    def test_search_return_partial_results(self, _):
+        workers = {'OFFICER': Mock(), 'CR': Mock(), 'UNIT': Mock()}
+        mock_hook = Mock()
+        search_latency.reset()
+
+        with patch('search.services.MultiSearch') as multi_search_mock:
+            multi_search = multi_search_mock.return_value.params.return_value
+            multi_search.add.return_value = multi_search
+            multi_search.execute.return_value = [
+                Mock(took=1, timed_out=False), Mock(took=300, timed_out=True), None
+            ]
+            search_manager = SearchManager(workers=workers, hooks=[mock_hook])
+            response = search_manager.search('term')
+
+        multi_search_mock.return_value.params.assert_called_with(request_timeout=2.0)
+        multi_search.execute.assert_called_with(raise_on_error=False)
+        expect(response).to.eq({'OFFICER': 'formatter_results', 'CR': 'formatter_results'})
+        expect(search_manager.partial_content_types).to.eq(['CR', 'UNIT'])
+        mock_hook.execute.assert_called_with('term', None, {'OFFICER': 'formatter_results', 'CR': 'formatter_results'})
+        expect(set(search_latency.percentiles().keys())).to.eq({'OFFICER', 'CR'})
+
+    @patch('search.services.SimpleFormatter.format', return_value='formatter_results')
+    def test_search_not_cache_timed_out_results(self, _):
+        result_cache = SearchResultCache(maxsize=10)
+        officer_worker = Mock()
+
+        with patch('search.services.search_result_cache', result_cache):
+            with patch('search.services.MultiSearch') as multi_search_mock:
+                multi_search_mock.return_value.params.return_value.add.return_value.execute.return_value = [
+                    Mock(took=500, timed_out=True)
+                ]
+                search_manager = SearchManager(workers={'OFFICER': officer_worker})
+                first_response = search_manager.search('term')
+                second_response = SearchManager(workers={'OFFICER': officer_worker}).search('term')
+
+        expect(first_response).to.eq({'OFFICER': 'formatter_results'})
+        expect(second_response).to.eq({'OFFICER': 'formatter_results'})
+        expect(search_manager.partial_content_types).to.eq(['OFFICER'])
+        expect(officer_worker.search_query.call_count).to.eq(2)
+        expect(result_cache.stats()['size']).to.eq(0)
+
+    @patch('search.services.MultiSearch')
+    def test_search_request_timeout(self, multi_search_mock):
+        multi_search_mock.return_value.params.return_value.add.return_value.execute.side_effect = \
+            ConnectionTimeout('TIMEOUT', 'timed out', None)
+
+        search_manager = SearchManager(workers={'OFFICER': Mock()})
+        response = search_manager.search('term')
+        expect(response).to.eq({})
+        expect(search_manager.partial_content_types).to.eq(['OFFICER'])
+
     @patch('search.services.OfficerWorker.query', return_value='abc')
     def test_get_search_query_for_type(self, patched_query):
         query = SearchManager().get_search_query_for_type('term', 'OFFICER')
@@ -162,3 +290,111 @@ class SearchManagerTestCase(IndexMixin, TestCase):
             'a': 'b',
             'id': 123
         }])
+
+
+class LatencyRecorderTestCase(TestCase):
+    def test_percentiles(self):
+        recorder = LatencyRecorder()
+        for milliseconds in range(1, 101):
+            recorder.record('OFFICER', milliseconds)
+        recorder.record('UNIT', 7)
+
+        expect(recorder.percentiles()).to.eq({
+            'OFFICER': {'count': 100, 'p50': 50, 'p99': 99},
+            'UNIT': {'count': 1, 'p50': 7, 'p99': 7},
+        })
+
+    def test_keep_latest_samples(self):
+        recorder = LatencyRecorder(max_samples=2)
+        recorder.record('OFFICER', 100)
+        recorder.record('OFFICER', 1)
+        recorder.record('OFFICER', 2)
+
+        expect(recorder.percentiles()).to.eq({'OFFICER': {'count': 2, 'p50': 1, 'p99': 2}})
+
+    def test_reset(self):
+        recorder = LatencyRecorder()
+        recorder.record('OFFICER', 100)
+        recorder.reset()
+
+        expect(recorder.percentiles()).to.eq({})
+
+
+class SearchResultCacheTestCase(TestCase):
+    def test_get_and_set(self):
+        result_cache = SearchResultCache(maxsize=10)
+        key = result_cache.key('OFFICER', 'jerome  finnigan ', 10)
+        expect(result_cache.get(key)).to.be.none()
+
+        result_cache.set(key, 'results')
+
+        expect(result_cache.get(result_cache.key('OFFICER', 'jerome finnigan', 10))).to.eq('results')
+        expect(result_cache.get(result_cache.key('OFFICER', 'jerome finnigan', 5))).to.be.none()
+        expect(result_cache.get(result_cache.key('UNIT', 'jerome finnigan', 10))).to.be.none()
+        expect(result_cache.stats()).to.eq({
+            'size': 1,
+            'maxsize': 10,
+            'hits': 1,
+            'misses': 3,
+            'hit_ratio': 0.25,
+        })
+
+    def test_evict_least_recently_used(self):
+        result_cache = SearchResultCache(maxsize=2)
+        result_cache.set('a', 1)
+        result_cache.set('b', 2)
+        result_cache.get('a')
+        result_cache.set('c', 3)
+
+        expect(result_cache.get('a')).to.eq(1)
+        expect(result_cache.get('b')).to.be.none()
+        expect(result_cache.get('c')).to.eq(3)
+        expect(result_cache.stats()['size']).to.eq(2)
+
+    def test_clear_when_alias_is_swapped(self):
+        alias = Mock(current_index_name=Mock(return_value='autocompletes_1'), data_version=Mock(return_value=None))
+        result_cache = SearchResultCache(maxsize=10, aliases=[alias], version_check_interval=0)
+        result_cache.set(result_cache.key('OFFICER', 'term', 10), 'results')
+        expect(result_cache.get(result_cache.key('OFFICER', 'term', 10))).to.eq('results')
+
+        alias.current_index_name.return_value = 'autocompletes_2'
+
+        expect(result_cache.get(result_cache.key('OFFICER', 'term', 10))).to.be.none()
+        expect(result_cache.stats()['size']).to.eq(0)
+
+    def test_clear_when_data_version_is_bumped(self):
+        alias = Mock(current_index_name=Mock(return_value='autocompletes_1'), data_version=Mock(return_value='1'))
+        result_cache = SearchResultCache(maxsize=10, aliases=[alias], version_check_interval=0)
+        result_cache.set(result_cache.key('OFFICER', 'term', 10), 'results')
+        expect(result_cache.get(result_cache.key('OFFICER', 'term', 10))).to.eq('results')
+
+        alias.data_version.return_value = '2'
+
+        expect(result_cache.get(result_cache.key('OFFICER', 'term', 10))).to.be.none()
+        expect(result_cache.stats()['size']).to.eq(0)
+
+    def test_check_version_at_most_once_per_interval(self):
+        alias = Mock(current_index_name=Mock(return_value='autocompletes_1'), data_version=Mock(return_value=None))
+        result_cache = SearchResultCache(maxsize=10, aliases=[alias], version_check_interval=10)
+
+        with patch('search.services.time.monotonic', side_effect=[100, 105, 110]):
+            expect(result_cache.version).to.eq((('autocompletes_1', None),))
+            alias.current_index_name.return_value = 'autocompletes_2'
+            expect(result_cache.version).to.eq((('autocompletes_1', None),))
+            expect(result_cache.version).to.eq((('autocompletes_2', None),))
+
+        expect(alias.current_index_name.call_count).to.eq(2)
+
+    def test_clear(self):
+        result_cache = SearchResultCache(maxsize=10)
+        result_cache.set('a', 1)
+        result_cache.get('a')
+        result_cache.clear()
+
+        expect(result_cache.stats()).to.eq({
+            'size': 0,
+            'maxsize': 10,
+            'hits': 0,
+            'misses': 0,
+            'hit_ratio': 0.0,
+        })
@@ -38,8 +38,38 @@ class SearchV1ViewSetTestCase(IndexMixin, APITestCase):
 
         expect(response.status_code).to.equal(status.HTTP_200_OK)
         expect(response.data).to.equal('anything_suggester_returns')
+        expect(response.has_header('X-Search-Partial')).to.be.false()
         search.assert_called_with(text, content_type='OFFICER')
 
+    def test_list_with_term_partial_results(self):
+        def search(self, term, content_type=None):
+            self.partial_content_types = ['CR', 'DATE > CR']
+            return {'OFFICER': []}
+
+        url = reverse('api:suggestion-list')
+        with patch('search.views.SearchManager.search', autospec=True, side_effect=search):
+            response = self.client.get(url, {'term': 'any_text'})
+
+        expect(response.status_code).to.equal(status.HTTP_200_OK)
+        expect(response.data).to.equal({'OFFICER': []})
+        expect(response['X-Search-Partial']).to.eq('CR, DATE > CR')
+
+    @patch('search.views.search_latency.percentiles', return_value={'OFFICER': {'count': 2, 'p50': 3, 'p99': 9}})
+    def test_latency(self, _):
+        url = reverse('api:suggestion-latency')
+        response = self.client.get(url)
+
+        expect(response.status_code).to.equal(status.HTTP_200_OK)
+        expect(response.data).to.eq({'OFFICER': {'count': 2, 'p50': 3, 'p99': 9}})
+
+    @patch('search.views.search_result_cache.stats', return_value={'hits': 3, 'misses': 1, 'hit_ratio': 0.75})
+    def test_cache_stats(self, _):
+        url = reverse('api:suggestion-cache-stats')
+        response = self.client.get(url)
+
+        expect(response.status_code).to.equal(status.HTTP_200_OK)
+        expect(response.data).to.eq({'hits': 3, 'misses': 1, 'hit_ratio': 0.75})
+
     def test_search_unit_officer(self):
         officer = OfficerFactory()
         OfficerHistoryFactory(officer=officer, unit=PoliceUnitFactory(unit_name='123'))
@@ -588,6 +618,39 @@ class SearchV1ViewSetTestCase(IndexMixin, APITestCase):
             }
         ])
 
+    def test_retrieve_recent_search_items_keep_client_order_with_one_query_per_type(self):
+        OfficerFactory(id=1, first_name='Jerome', last_name='Finnigan')
+        OfficerFactory(id=2, first_name='Edward', last_name='May')
+        allegation_category = AllegationCategoryFactory(category='Use of Force')
+        AllegationFactory(crid='C1', most_common_category=allegation_category)
+        AllegationFactory(crid='C2', most_common_category=allegation_category)
+        trr_1 = TRRFactory(id=11)
+        trr_2 = TRRFactory(id=12)
+        ActionResponseFactory(trr=trr_1, force_type='Taser', action_sub_category='5.1')
+        ActionResponseFactory(trr=trr_2, force_type='Impact Weapon', action_sub_category='5.2')
+        LawsuitFactory(id=21)
+        LawsuitFactory(id=22)
+
+        url = reverse('api:suggestion-recent-search-items')
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {
+                'officer_ids[]': [2, 1],
+                'crids[]': ['C2', 'C1'],
+                'trr_ids[]': [12, 11],
+                'lawsuit_ids[]': [22, 999, 21],
+            })
+
+        expect(response.status_code).to.eq(status.HTTP_200_OK)
+        expect([(item['type'], item['id']) for item in response.data]).to.eq([
+            ('OFFICER', 2), ('OFFICER', 1),
+            ('CR', 'C2'), ('CR', 'C1'),
+            ('TRR', 12), ('TRR', 11),
+            ('LAWSUIT', 22), ('LAWSUIT', 21),
+        ])
+        expect(response.data[4]['force_type']).to.eq('Impact Weapon')
+        expect(response.data[5]['force_type']).to.eq('Taser')
+        expect(response.data[2]['category']).to.eq('Use of Force')
+
     def test_search_with_apostrophe(self):
         allegation_category = AllegationCategoryFactory(category='Use of Force')
         allegation_1 = AllegationFactory(
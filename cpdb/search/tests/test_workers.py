@@ -3,12 +3,13 @@ from datetime import datetime
 import pytz
 from django.test import SimpleTestCase, TestCase
 
+from mock import Mock
 from robber import expect
 
 from data.factories import OfficerFactory, OfficerAllegationFactory, OfficerHistoryFactory, PoliceUnitFactory, \
     AllegationFactory, InvestigatorFactory, InvestigatorAllegationFactory
 from search.workers import (
-    ReportWorker, OfficerWorker, UnitWorker, UnitOfficerWorker,
+    Worker, ReportWorker, OfficerWorker, UnitWorker, UnitOfficerWorker,
     NeighborhoodsWorker, CommunityWorker, CRWorker, AreaWorker, TRRWorker, RankWorker,
     DateCRWorker, DateTRRWorker, ZipCodeWorker, LawsuitWorker,
     DateOfficerWorker, SearchTermItemWorker, InvestigatorCRWorker
@@ -23,6 +24,44 @@ from search_terms.factories import SearchTermItemFactory, SearchTermCategoryFact
 from trr.factories import TRRFactory
 
 
+class WorkerTestCase(SimpleTestCase):
+    def test_search_fields(self):
+        class TestWorker(Worker):
+            doc_type_klass = ReportDocType
+            fields = ['title', 'tags']
+
+        expect(TestWorker().search_fields).to.eq(['title', 'tags'])
+
+    def test_search_fields_with_prefix_fields(self):
+        class TestWorker(Worker):
+            doc_type_klass = Mock(autocomplete_prefix_fields=['tags', 'name'])
+            fields = ['title', 'tags']
+
+        expect(TestWorker().search_fields).to.eq(['title', 'tags', 'tags.prefix'])
+
+    def test_search_query_with_budget(self):
+        class TestWorker(Worker):
+            doc_type_klass = ReportDocType
+            fields = ['title']
+            timeout = 200
+            terminate_after = 1000
+
+        query = TestWorker().search_query('term', size=5).to_dict()
+        expect(query['timeout']).to.eq('200ms')
+        expect(query['terminate_after']).to.eq(1000)
+        expect(query['size']).to.eq(5)
+
+    def test_search_query_without_budget(self):
+        class TestWorker(Worker):
+            doc_type_klass = ReportDocType
+            fields = ['title']
+            timeout = None
+
+        query = TestWorker().search_query('term').to_dict()
+        expect(query).not_to.contain('timeout')
+        expect(query).not_to.contain('terminate_after')
+
+
 class ReportWorkerTestCase(IndexMixin, SimpleTestCase):
     def test_search(self):
         doc = ReportDocType(
@@ -138,6 +177,64 @@ class OfficerWorkerTestCase(IndexMixin, SimpleTestCase):
         expect(response.hits.total).to.equal(1)
         expect(response.hits.hits[0]['_source']['full_name']).to.eq('John Doe')
 
+    def test_ranking_same_as_script_score_query(self):
+        def script_score_query(term):
+            return OfficerInfoDocType.search().query(
+                'function_score',
+                query={
+                    'multi_match': {
+                        'query': term,
+                        'fields': [
+                            'badge^2', 'historic_badges', 'full_name', 'tags', '_id',
+                            'badge_keyword^4', 'historic_badges_keyword^3',
+                        ]
+                    }
+                },
+                functions=[
+                    {'filter': {'match': {'tags': term}}, 'script_score': {'script': '_score + 60000'}},
+                    {
+                        'filter': {'match': {'full_name': {'query': term, 'operator': 'and'}}},
+                        'script_score': {'script': '_score + 500'}
+                    },
+                    {
+                        'filter': {'match': {'full_name': term}},
+                        'script_score': {'script': '_score + doc[\'allegation_count\'].value * 3'}
+                    }
+                ]
+            )
+
+        officers = [
+            ('Jerome Finnigan', '12345', 120, []),
+            ('Jerome Turbyville', '23456', 45, []),
+            ('Jerome Smith', '34567', 10, ['jerome']),
+            ('Jerome Jones', '45678', 2, []),
+            ('Jeremy Finn', '56789', 30, []),
+            ('Finnegan Carter', '67890', 75, []),
+            ('Carter Finnigan', '12340', 5, []),
+            ('Raymond Piwnicki', '78901', 90, []),
+            ('Raymond Jerome', '89012', 60, []),
+            ('Edward May', '90123', 1, []),
+            ('Edward Jerome', '12346', 20, []),
+            ('Joseph Miedzianowski', '12347', 200, ['finnigan crew']),
+        ]
+        for officer_id, (full_name, badge, allegation_count, tags) in enumerate(officers, start=1):
+            OfficerInfoDocType(
+                meta={'id': officer_id},
+                full_name=full_name,
+                badge=badge,
+                badge_keyword=badge,
+                allegation_count=allegation_count,
+                tags=tags,
+            ).save()
+
+        self.refresh_index()
+
+        for term in ['jerome', 'jerome finnigan', 'finn', 'raymond', 'edward', '12345', 'crew']:
+            expected_ids = [hit.meta.id for hit in script_score_query(term)[:10].execute()]
+            ids = [hit.meta.id for hit in OfficerWorker().search(term, size=10)]
+
+            expect(ids).to.eq(expected_ids)
+
     # Note: We've found that scoring of elasticsearch is incredibly complex and could not
     # be easily replicated in unit tests. Therefore we decided to stop adding tests to this
     # particular test case and instead rely more on manual testing.
@@ -8,7 +8,7 @@ from search.serializers import (
     OfficerRecentSerializer, AllegationRecentSerializer, TRRRecentSerializer, LawsuitRecentSerializer
 )
 from search.workers import ZipCodeWorker, DateOfficerWorker
-from .services import SearchManager
+from .services import SearchManager, search_latency, search_result_cache
 from .pagination import SearchQueryPagination
 from .formatters import (
     OfficerFormatter, UnitFormatter, OfficerV2Formatter, NameV2Formatter, RankFormatter,
@@ -58,11 +58,22 @@ class SearchViewSet(viewsets.ViewSet):
         term = self._search_term
         if term:
             results = self.search_manager.search(term, content_type=self._content_type)
+            partial_content_types = self.search_manager.partial_content_types
+            if partial_content_types:
+                return Response(results, headers={'X-Search-Partial': ', '.join(partial_content_types)})
         else:
             results = SearchManager(formatters=self.formatters, workers=self.workers).suggest_sample()
 
         return Response(results)
 
+    @action(detail=False, methods=['GET'], url_path='latency', url_name='latency')
+    def latency(self, _):
+        return Response(search_latency.percentiles())
+
+    @action(detail=False, methods=['GET'], url_path='cache-stats', url_name='cache-stats')
+    def cache_stats(self, _):
+        return Response(search_result_cache.stats())
+
     @property
     def _content_type(self):
         return self.request.query_params.get('contentType', None)
@@ -77,7 +88,7 @@ class SearchViewSet(viewsets.ViewSet):
         for recent_items_query in self.recent_items_queries:
             ids = self.request.query_params.getlist(f'{recent_items_query["query_param"]}[]', None)
             if ids:
-                items = recent_items_query['query'](ids).query()
+                items = recent_items_query['query'](ids).ordered_query()
                 recent_search_data += recent_items_query['serializer'](items, many=True).data
 
         return Response(
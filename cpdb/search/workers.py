@@ -12,20 +12,37 @@ class Worker(object):
     fields = []
     sort_order = []
     name = ''
+    # Elasticsearch stops collecting hits after `timeout` milliseconds, or `terminate_after` documents per shard
+    timeout = 500
+    terminate_after = None
 
     @property
     def _searcher(self):
         return self.doc_type_klass().search()
 
+    @property
+    def search_fields(self):
+        prefix_fields = getattr(self.doc_type_klass, 'autocomplete_prefix_fields', [])
+        return self.fields + [f'{field}.prefix' for field in self.fields if field in prefix_fields]
+
     def query(self, term, **kwargs):
         return self._searcher \
-            .query('multi_match', query=term, operator='and', fields=self.fields) \
+            .query('multi_match', query=term, operator='and', fields=self.search_fields) \
             .sort(*self.sort_order)
 
+    def search_query(self, term, size=10, begin=0, **kwargs):
+        return self.with_budget(self.query(term, **kwargs))[begin:size]
+
+    def with_budget(self, query):
+        budget = {'timeout': f'{self.timeout}ms'} if self.timeout else {}
+        if self.terminate_after:
+            budget['terminate_after'] = self.terminate_after
+        return query.extra(**budget)
+
     def search(self, term, size=10, begin=0, **kwargs):
-        return self.query(term, **kwargs)[begin:size].execute()
+        return self.search_query(term, size=size, begin=begin, **kwargs).execute()
 
-    def get_sample(self):
+    def sample_query(self):
         query = self._searcher.query(
             'function_score',
             random_score={}
@@ -33,7 +50,10 @@ class Worker(object):
             'exists',
             field='tags'
         )
-        return query[:1].execute()
+        return query[:1]
+
+    def get_sample(self):
+        return self.sample_query().execute()
 
 
 class DateWorker(Worker):
@@ -55,51 +75,21 @@ class OfficerWorker(Worker):
 
     def query(self, term, **kwargs):
         return self._searcher.query(
-            'function_score',
-            query={
-                'multi_match': {
-                    'query': term,
-                    'fields': [
-                        'badge^2', 'historic_badges', 'full_name', 'tags', '_id',
-                        'badge_keyword^4', 'historic_badges_keyword^3',
-                    ]
-                }
-            },
-            functions=[
-                {
-                    'filter': {
-                        'match': {
-                            'tags': term
-                        }
-                    },
-                    'script_score': {
-                        'script': '_score + 60000'
-                    }
-                },
-                {
-                    'filter': {
-                        'match': {
-                            'full_name': {
-                                'query': term,
-                                'operator': 'and'
-                            }
-                        }
-                    },
-                    'script_score': {
-                        'script': '_score + 500'
-                    }
-                },
-                {
-                    'filter': {
-                        'match': {
-                            'full_name': term
-                        }
-                    },
-                    'script_score': {
-                        'script': '_score + doc[\'allegation_count\'].value * 3'
-                    }
-                }
-            ]
+            'bool',
+            must=Q(
+                'multi_match',
+                query=term,
+                fields=[
+                    'badge^2', 'historic_badges', 'full_name', 'tags', '_id',
+                    'badge_keyword^4', 'historic_badges_keyword^3',
+                ]
+            ),
+            should=[
+                Q('constant_score', filter=Q('match', tags=term), boost=60000),
+                Q('constant_score', filter=Q('match', full_name={'query': term, 'operator': 'and'}), boost=500),
+                OfficerInfoDocType.allegation_count_score(Q('match', full_name=term)),
+            ],
+            disable_coord=True
         )
 
 
@@ -117,7 +107,7 @@ class AreaWorker(Worker):
     def query(self, term, **kwargs):
         filter = Q('term', area_type=self.area_type) if self.area_type else Q('match_all')
         q = Q('bool',
-              must=[Q('multi_match', query=term, operator='and', fields=self.fields)],
+              must=[Q('multi_match', query=term, operator='and', fields=self.search_fields)],
               filter=filter)
         return self._searcher.query(q).sort(*self.sort_order)
 
@@ -173,6 +163,8 @@ class DateCRWorker(DateWorker):
 
 class CRWorker(Worker):
     doc_type_klass = CrDocType
+    timeout = 300
+    terminate_after = 10000
 
     def query(self, term, **kwargs):
         by_attachment = Q(
@@ -1,19 +1,21 @@
-from data.models import Allegation
+from data.models import Officer
+from trr.models import TRR
 
 from search.queries import OfficerQuery, CrQuery, TrrQuery, LawsuitQuery
 
 
 class OfficerMobileQuery(OfficerQuery):
-    pass
+    def queryset(self):
+        return Officer.objects.only('id', 'first_name', 'last_name', 'current_badge')
 
 
 class CrMobileQuery(CrQuery):
-    def queryset(self):
-        return Allegation.objects.select_related('most_common_category')
+    pass
 
 
 class TrrMobileQuery(TrrQuery):
-    pass
+    def queryset(self):
+        return TRR.objects.only('id')
 
 
 class LawsuitMobileQuery(LawsuitQuery):
@@ -188,3 +188,32 @@ class SearchV2ViewSetTestCase(IndexMixin, APITestCase):
                 'type': 'LAWSUIT',
             }
         ])
+
+    def test_retrieve_recent_search_items_keep_client_order_with_one_query_per_type(self):
+        OfficerFactory(id=1, first_name='Jerome', last_name='Finnigan')
+        OfficerFactory(id=2, first_name='Edward', last_name='May')
+        allegation_category = AllegationCategoryFactory(category='Use of Force')
+        AllegationFactory(crid='C1', most_common_category=allegation_category)
+        AllegationFactory(crid='C2', most_common_category=allegation_category)
+        TRRFactory(id=11)
+        TRRFactory(id=12)
+        LawsuitFactory(id=21)
+        LawsuitFactory(id=22)
+
+        url = reverse('api-v2:search-mobile-recent-search-items')
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {
+                'officer_ids[]': [2, 1],
+                'crids[]': ['C2', 'C1'],
+                'trr_ids[]': [12, 11],
+                'lawsuit_ids[]': [22, 21],
+            })
+
+        expect(response.status_code).to.eq(status.HTTP_200_OK)
+        expect([(item['type'], item['id']) for item in response.data]).to.eq([
+            ('OFFICER', 2), ('OFFICER', 1),
+            ('CR', 'C2'), ('CR', 'C1'),
+            ('TRR', 12), ('TRR', 11),
+            ('LAWSUIT', 22), ('LAWSUIT', 21),
+        ])
+        expect(response.data[2]['category']).to.eq('Use of Force')
@@ -2,7 +2,7 @@ import functools
 from django.db import connection
 
 from social_graph.serializers import OfficerSerializer, AccusedSerializer
-from data.models import Officer, Allegation
+from data.models import Officer, Allegation, OfficerCoaccusal
 from utils.raw_query_utils import dict_fetch_all
 
 
@@ -11,6 +11,10 @@ COMPLAINT_ORIGIN_FILTER_MAPPING = {
     'OFFICER': 'AND data_allegation.is_officer_complaint IS TRUE',
     'CIVILIAN': 'AND data_allegation.is_officer_complaint IS FALSE',
 }
+COMPLAINT_ORIGIN_COUNT_MAPPING = {
+    'OFFICER': 'officer_coaccusal_count',
+    'CIVILIAN': 'civilian_coaccusal_count',
+}
 DEFAULT_COMPLAINT_ORIGIN = 'CIVILIAN'
 
 
@@ -28,16 +32,22 @@ class SocialGraphDataQuery(object):
         self.show_connected_officers = show_connected_officers
 
     def _officer_allegation_query(self, select_fields):
+        # Officer pairs are picked from the coaccusal edges, whose counts include allegations without incident date,
+        # so no pair reaching the threshold below is left out before the officer allegations are joined.
         officer_ids_string = ", ".join([str(officer.id) for officer in self.officers])
+        count_column = COMPLAINT_ORIGIN_COUNT_MAPPING.get(self.complaint_origin, 'coaccusal_count')
         return f"""
             SELECT {select_fields}
-            FROM data_officerallegation AS A
-            INNER JOIN data_officerallegation AS B ON A.allegation_id = B.allegation_id
+            FROM {OfficerCoaccusal._meta.db_table} AS coaccusal
+            INNER JOIN data_officerallegation AS A ON A.officer_id = coaccusal.officer_a_id
+            INNER JOIN data_officerallegation AS B
+                ON B.officer_id = coaccusal.officer_b_id AND A.allegation_id = B.allegation_id
             LEFT JOIN data_allegation ON data_allegation.crid = A.allegation_id
-            WHERE A.officer_id < B.officer_id
+            WHERE coaccusal.officer_a_id < coaccusal.officer_b_id
+            AND coaccusal.{count_column} >= {self.threshold}
             AND (
-                B.officer_id IN ({officer_ids_string})
-                {'OR' if self.show_connected_officers else 'AND'} A.officer_id IN ({officer_ids_string})
+                coaccusal.officer_b_id IN ({officer_ids_string})
+                {'OR' if self.show_connected_officers else 'AND'} coaccusal.officer_a_id IN ({officer_ids_string})
             )
             AND data_allegation.incident_date IS NOT NULL
             {COMPLAINT_ORIGIN_FILTER_MAPPING.get(self.complaint_origin, '')}
@@ -7,6 +7,7 @@ from robber import expect
 
 from data.factories import OfficerFactory, AllegationFactory, OfficerAllegationFactory
 from data.models import Officer
+from data.cache_managers import officer_coaccusal_cache_manager
 from social_graph.queries import SocialGraphDataQuery
 
 
@@ -135,6 +136,7 @@ class SocialGraphDataQueryTestCase(TestCase):
             id__in=[officer.id for officer in [officer_1, officer_2, officer_3]]
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         social_graph_data_query = SocialGraphDataQuery(officers)
         expect(social_graph_data_query.graph_data()).to.eq(expected_graph_data)
         expect(social_graph_data_query.graph_data(static=True)).to.eq(expected_static_graph_data)
@@ -258,6 +260,7 @@ class SocialGraphDataQueryTestCase(TestCase):
             id__in=[officer.id for officer in [officer_1, officer_2, officer_3]]
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         social_graph_data_query = SocialGraphDataQuery(officers, threshold=1)
         expect(social_graph_data_query.graph_data()).to.eq(expected_graph_data)
 
@@ -448,6 +451,7 @@ class SocialGraphDataQueryTestCase(TestCase):
             id__in=[officer.id for officer in [officer_1, officer_2, officer_3, officer_4, officer_5]]
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         social_graph_data_query = SocialGraphDataQuery(officers, threshold=3)
         expect(social_graph_data_query.graph_data()).to.eq(expected_graph_data)
 
@@ -570,6 +574,7 @@ class SocialGraphDataQueryTestCase(TestCase):
             id__in=[officer.id for officer in [officer_1, officer_2, officer_3]]
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         social_graph_data_query = SocialGraphDataQuery(
             officers,
             threshold=1,
@@ -758,6 +763,7 @@ class SocialGraphDataQueryTestCase(TestCase):
             id__in=[officer.id for officer in [officer_1, officer_2, officer_3, officer_4, officer_5]]
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         social_graph_data_query = SocialGraphDataQuery(officers, threshold=3, complaint_origin='OFFICER')
         expect(social_graph_data_query.graph_data()).to.eq(expected_graph_data)
 
@@ -886,6 +892,7 @@ class SocialGraphDataQueryTestCase(TestCase):
             id__in=[officer.id for officer in [officer_1, officer_2, officer_3]]
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         social_graph_data_query = SocialGraphDataQuery(
             officers,
             threshold=1,
@@ -1080,6 +1087,7 @@ class SocialGraphDataQueryTestCase(TestCase):
             id__in=[officer.id for officer in [officer_1, officer_2, officer_3, officer_4, officer_5]]
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         social_graph_data_query = SocialGraphDataQuery(
             officers, threshold=3, complaint_origin='ALL'
         )
@@ -1315,6 +1323,7 @@ class SocialGraphDataQueryTestCase(TestCase):
             id__in=[officer.id for officer in [officer_1, officer_2, officer_3]]
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         social_graph_data_query = SocialGraphDataQuery(
             officers, threshold=2, complaint_origin='ALL', show_connected_officers=True
         )
@@ -1447,6 +1456,7 @@ class SocialGraphDataQueryTestCase(TestCase):
             id__in=[officer.id for officer in [officer_1, officer_2, officer_3, officer_4, officer_5, officer_6]]
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         social_graph_data_query = SocialGraphDataQuery(
             officers,
             threshold=2,
@@ -1500,6 +1510,7 @@ class SocialGraphDataQueryTestCase(TestCase):
             id__in=[officer.id for officer in [officer_1, officer_2, officer_3, officer_4]]
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         social_graph_data_query = SocialGraphDataQuery(officers)
         expect(list(social_graph_data_query.allegations())).to.eq([allegation_1, allegation_2, allegation_3])
 
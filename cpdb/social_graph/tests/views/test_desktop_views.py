@@ -12,6 +12,7 @@ from mock import patch
 
 from data.factories import PoliceUnitFactory, OfficerFactory, AllegationFactory, \
     OfficerAllegationFactory, OfficerHistoryFactory, AttachmentFileFactory, AllegationCategoryFactory, VictimFactory
+from data.cache_managers import officer_coaccusal_cache_manager
 from pinboard.factories import PinboardFactory
 from trr.factories import TRRFactory
 
@@ -129,6 +130,7 @@ class SocialGraphDesktopViewSetTestCase(APITestCase):
             ]
         }
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-network', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562, 8563, 8564',
@@ -258,6 +260,7 @@ class SocialGraphDesktopViewSetTestCase(APITestCase):
             ]
         }
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-network', kwargs={})
         response = self.client.get(url, {
             'unit_id': 123,
@@ -536,6 +539,7 @@ class SocialGraphDesktopViewSetTestCase(APITestCase):
             ]
         }
 
+        officer_coaccusal_cache_manager.cache_data()
         response = self.client.get(reverse('api-v2:social-graph-network'), {'pinboard_id': pinboard.id})
         static_response = self.client.get(
             reverse('api-v2:social-graph-network'),
@@ -597,6 +601,7 @@ class SocialGraphDesktopViewSetTestCase(APITestCase):
         OfficerAllegationFactory(id=7, officer=officer_1, allegation=allegation_3)
         OfficerAllegationFactory(id=8, officer=officer_2, allegation=allegation_3)
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-network', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562, 8563, 8564',
@@ -782,6 +787,7 @@ class SocialGraphDesktopViewSetTestCase(APITestCase):
             'list_event': ['2007-12-31', '2008-12-31']
         }
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-network', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562,8563,8564,8565,8566',
@@ -960,6 +966,7 @@ class SocialGraphDesktopViewSetTestCase(APITestCase):
             },
         ]
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-officers', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562, 8563, 8564',
@@ -1151,6 +1158,7 @@ class SocialGraphDesktopViewSetTestCase(APITestCase):
         AttachmentFileFactory(id=4, tag='CR', owner=allegation_2, show=False)
         AttachmentFileFactory(id=5, tag='CR', owner=allegation_2, title='arrest report')
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-allegations', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562, 8563, 8564',
@@ -12,6 +12,7 @@ from mock import patch
 
 from data.factories import PoliceUnitFactory, OfficerFactory, AllegationFactory, \
     OfficerAllegationFactory, OfficerHistoryFactory, AttachmentFileFactory, AllegationCategoryFactory, VictimFactory
+from data.cache_managers import officer_coaccusal_cache_manager
 from pinboard.factories import PinboardFactory
 from trr.factories import TRRFactory
 
@@ -129,6 +130,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
             ]
         }
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-mobile-network', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562, 8563, 8564',
@@ -258,6 +260,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
             ]
         }
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-mobile-network', kwargs={})
         response = self.client.get(url, {
             'unit_id': 123,
@@ -479,6 +482,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
             'list_event': ['2007-12-31']
         }
 
+        officer_coaccusal_cache_manager.cache_data()
         response = self.client.get(reverse('api-v2:social-graph-mobile-network'), {'pinboard_id': pinboard.id})
 
         expect(response.status_code).to.eq(status.HTTP_200_OK)
@@ -661,6 +665,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
             'list_event': ['2007-12-31', '2008-12-31']
         }
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-mobile-network', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562,8563,8564,8565,8566',
@@ -839,6 +844,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
             },
         ]
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-mobile-officers', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562, 8563, 8564',
@@ -1030,6 +1036,7 @@ class SocialGraphMobileViewSetTestCase(APITestCase):
         AttachmentFileFactory(id=4, tag='CR', owner=allegation_2, show=False)
         AttachmentFileFactory(id=5, tag='CR', owner=allegation_2, title='arrest report')
 
+        officer_coaccusal_cache_manager.cache_data()
         url = reverse('api-v2:social-graph-mobile-allegations', kwargs={})
         response = self.client.get(url, {
             'officer_ids': '8562, 8563, 8564',
@@ -11,10 +11,14 @@ app_name = __name__.split('.')[0]
 class AttachmentFileIndexer(BaseIndexer):
     doc_type_klass = AttachmentFileDocType
     index_alias = tracker_index_alias
+    incremental = True
 
     def get_queryset(self):
         return AttachmentFile.objects.for_allegation().all()
 
+    def get_updated_queryset(self, since):
+        return self.get_queryset().filter(updated_at__gt=since)
+
     def extract_datum(self, datum):
         return {
             'id': datum.id,
@@ -1,5 +1,9 @@
+from datetime import datetime
+
 from django.test import TestCase
 
+import pytz
+from freezegun import freeze_time
 from robber import expect
 
 from data.factories import AttachmentFileFactory, AllegationFactory
@@ -12,6 +16,15 @@ class AttachmentFileIndexerTestCase(TestCase):
         AttachmentFileFactory()
         expect(AttachmentFileIndexer().get_queryset().count()).to.eq(1)
 
+    def test_get_updated_queryset(self):
+        with freeze_time(datetime(2020, 1, 1, tzinfo=pytz.utc)):
+            AttachmentFileFactory(id=1)
+        with freeze_time(datetime(2020, 3, 1, tzinfo=pytz.utc)):
+            AttachmentFileFactory(id=2)
+
+        queryset = AttachmentFileIndexer().get_updated_queryset(datetime(2020, 2, 1, tzinfo=pytz.utc))
+        expect([attachment.id for attachment in queryset]).to.eq([2])
+
     def test_extract_datum(self):
         allegation = AllegationFactory(crid=123456)
         datum = AttachmentFileFactory(
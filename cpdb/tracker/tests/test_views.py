@@ -9,6 +9,7 @@ from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 from robber import expect
 from freezegun import freeze_time
+from mock import patch
 from urllib.parse import urlencode
 
 from authentication.factories import AdminUserFactory
@@ -437,6 +438,21 @@ class AttachmentAPITestCase(TrackerTestCaseMixin, APITestCase):
         expect(response.status_code).to.eq(status.HTTP_200_OK)
         expect(AttachmentFile.objects.get(pk=1).show).to.be.false()
 
+    @patch('tracker.views.pinboard_cache.invalidate')
+    def test_update_attachment_visibility_invalidate_pinboard_cache(self, invalidate_mock):
+        admin_user = AdminUserFactory()
+        token, _ = Token.objects.get_or_create(user=admin_user)
+        AttachmentFileFactory(id=1, show=True)
+
+        url = reverse('api-v2:attachments-detail', kwargs={'pk': '1'})
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.client.patch(url, {'show': True}, format='json')
+        expect(invalidate_mock.called).to.be.false()
+
+        self.client.patch(url, {'show': False}, format='json')
+        expect(invalidate_mock.call_count).to.eq(1)
+
     def test_update_attachment_bad_request(self):
         admin_user = AdminUserFactory()
         token, _ = Token.objects.get_or_create(user=admin_user)
@@ -1057,6 +1073,20 @@ class AttachmentAPITestCase(TrackerTestCaseMixin, APITestCase):
         expect(response.data['count']).to.eq(3)
         expect(expected_ids).to.contain(*[result['id'] for result in response.data['results']])
 
+    @patch('tracker.views.AttachmentViewSet.serialize_search_from_source', True)
+    def test_attachments_full_text_search_from_source_falls_back_to_database(self):
+        allegation = AllegationFactory(crid=123456)
+        AttachmentFileFactory(id=11, owner=allegation, title='Title 123456', show=True)
+
+        base_url = reverse('api-v2:attachments-list')
+        self.refresh_index()
+
+        response = self.client.get(f'{base_url}?match=123456')
+        expect(response.status_code).to.eq(status.HTTP_200_OK)
+        expect(response.data['count']).to.eq(1)
+        expect(response.data['results'][0]['id']).to.eq(11)
+        expect(response.data['results'][0]['documents_count']).to.eq(1)
+
     def test_attachments_full_text_search_with_pagination(self):
         allegation = AllegationFactory(crid=111333)
 
@@ -1085,6 +1115,39 @@ class AttachmentAPITestCase(TrackerTestCaseMixin, APITestCase):
         expect(response.data['previous']).to.contain(f'{base_url}?limit=2&match=summary')
         expect(len(response.data['results'])).to.eq(1)
 
+    def test_attachments_full_text_search_with_cursor_pagination(self):
+        allegation = AllegationFactory(crid=111333)
+
+        AttachmentFileFactory(id=11, title='summary', owner=allegation)
+        AttachmentFileFactory(id=22, title='summary report')
+        AttachmentFileFactory(id=33, title='summary report title', text_content='document content')
+
+        base_url = reverse('api-v2:attachments-list')
+        self.refresh_index()
+
+        response = self.client.get(f'{base_url}?match=summary&limit=2&cursor=')
+        expect(response.status_code).to.eq(status.HTTP_200_OK)
+        expect(response.data['count']).to.eq(3)
+        expect(response.data['previous']).to.be.none()
+        expect(response.data['next']).to.contain('cursor=')
+        expect(len(response.data['results'])).to.eq(2)
+        first_page_ids = [result['id'] for result in response.data['results']]
+
+        response = self.client.get(response.data['next'])
+        expect(response.status_code).to.eq(status.HTTP_200_OK)
+        expect(response.data['count']).to.eq(3)
+        expect(response.data['next']).to.be.none()
+        expect(len(response.data['results'])).to.eq(1)
+
+        expect(first_page_ids + [result['id'] for result in response.data['results']]).to.contain(11, 22, 33)
+
+    def test_attachments_full_text_search_with_invalid_cursor(self):
+        base_url = reverse('api-v2:attachments-list')
+        self.refresh_index()
+
+        response = self.client.get(f'{base_url}?match=summary&cursor=invalid')
+        expect(response.status_code).to.eq(status.HTTP_404_NOT_FOUND)
+
     def test_attachments_full_text_search_as_admin(self):
         admin_user = AdminUserFactory()
         token, _ = Token.objects.get_or_create(user=admin_user)
@@ -14,6 +14,7 @@ from data.models import AttachmentFile
 from data.utils.subqueries import SQCount
 from document_cloud.models import DocumentCrawler
 from es_index.pagination import ESQuerysetPagination
+from pinboard import cache as pinboard_cache
 from .doc_types import AttachmentFileDocType
 from .serializers import (
     AttachmentFileListSerializer,
@@ -30,6 +31,8 @@ from shared.utils import formatted_errors
 
 class AttachmentViewSet(viewsets.ViewSet):
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    # Serialize search results from the documents, the database is skipped if all documents store the list fields
+    serialize_search_from_source = False
 
     @never_cache
     def retrieve(self, request, pk):
@@ -59,8 +62,11 @@ class AttachmentViewSet(viewsets.ViewSet):
             if request.auth is None:
                 es_query = es_query.filter('term', show=True)
 
-            paginator = ESQuerysetPagination()
+            source_fields = serializer_class.Meta.fields if self.serialize_search_from_source else None
+            paginator = ESQuerysetPagination(source_fields=source_fields)
             page = paginator.paginate_es_query(es_query, request, queryset)
+            if paginator.from_source:
+                return paginator.get_paginated_response(page)
         else:
             if 'crid' in request.query_params:
                 queryset = queryset.filter(owner_id=request.query_params['crid'])
@@ -79,6 +85,7 @@ class AttachmentViewSet(viewsets.ViewSet):
     def partial_update(self, request, pk):
         attachment = get_object_or_404(AttachmentFile, id=pk)
         old_tags = list(attachment.tags.all())
+        old_show = attachment.show
 
         serializer = UpdateAttachmentFileSerializer(
             instance=attachment,
@@ -91,6 +98,9 @@ class AttachmentViewSet(viewsets.ViewSet):
                 serializer.save()
                 attachment.refresh_from_db()
                 new_tags = list(attachment.tags.all())
+                if attachment.show != old_show or new_tags != old_tags:
+                    # visibility and hiding tags decide which documents pinboards list as relevant
+                    pinboard_cache.invalidate()
                 if new_tags != old_tags:
                     added_tags = list(set(new_tags).difference(set(old_tags)))
                     removed_tags = list(set(old_tags).difference(set(new_tags)))
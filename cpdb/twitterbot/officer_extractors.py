@@ -1,3 +1,5 @@
+from elasticsearch_dsl.query import Q
+
 from officers.doc_types import OfficerInfoDocType
 from twitterbot.serializers import OfficerSerializer
 
@@ -7,22 +9,12 @@ class ElasticSearchOfficerExtractor:
         results = []
         seen_ids = []
         for (source, name) in names:
+            name_query = Q('match', full_name={'query': name, 'operator': 'and'})
             query = OfficerInfoDocType().search().query(
-                'function_score',
-                query={
-                    'match': {
-                        'full_name': {
-                            'query': name,
-                            'operator': 'and'
-                        }
-                    }
-                },
-                script_score={
-                    'script': {
-                        'lang': 'painless',
-                        'inline': '_score + doc[\'allegation_count\'].value * 3'
-                    }
-                }
+                'bool',
+                must=name_query,
+                should=[OfficerInfoDocType.allegation_count_score(name_query)],
+                disable_coord=True
             )
             search_result = query[:1].execute()
             results += [
@@ -68,7 +68,7 @@ class OfficerTweetHandlerTestCase(RebuildIndexMixin, TestCase):
         self.send_tweet_patcher = patch('twitterbot.handlers.officer_tweet_handler.send_tweet')
         self.send_tweet = self.send_tweet_patcher.start()
         self.percentile_patch = patch(
-            'officers.indexers.officers_indexer.officer_percentile.top_percentile',
+            'officers.indexers.officers_indexer.officer_percentile.yearly_top_percentile',
             return_value=[]
         )
         self.percentile_patch.start()
@@ -3,6 +3,7 @@ from django.test import TestCase
 from robber import expect
 
 from data.factories import OfficerFactory, OfficerAllegationFactory
+from officers.doc_types import OfficerInfoDocType
 from twitterbot.officer_extractors import ElasticSearchOfficerExtractor
 from twitterbot.tests.mixins import RebuildIndexMixin
 
@@ -81,3 +82,37 @@ class ElasticSearchOfficerExtractorTestCase(OfficerExtractorTestCase):
             self.extractor.get_officers([('text', 'Michael Glynn')]),
             []
         )
+
+    def test_ranking_same_as_script_score_query(self):
+        def script_score_query(name):
+            return OfficerInfoDocType().search().query(
+                'function_score',
+                query={'match': {'full_name': {'query': name, 'operator': 'and'}}},
+                script_score={
+                    'script': {
+                        'lang': 'painless',
+                        'inline': '_score + doc[\'allegation_count\'].value * 3'
+                    }
+                }
+            )
+
+        officers = [
+            ('Jerome', 'Finnigan', 5),
+            ('Jerome', 'Turbyville', 3),
+            ('Jerome', 'Jones', 0),
+            ('Jeremy', 'Finn', 2),
+            ('Finnegan', 'Carter', 4),
+            ('Raymond', 'Jerome', 1),
+            ('Edward', 'May', 1),
+        ]
+        for first_name, last_name, allegation_count in officers:
+            officer = OfficerFactory(first_name=first_name, last_name=last_name)
+            OfficerAllegationFactory.create_batch(allegation_count, officer=officer)
+
+        self.refresh_index()
+
+        for name in ['Jerome', 'Jerome Finnigan', 'Finn', 'Raymond', 'Edward', 'Jones']:
+            expected_ids = [hit.meta.id for hit in script_score_query(name)[:1].execute()]
+            ids = [str(obj['id']) for _, obj in self.extractor.get_officers([('text', name)])]
+
+            expect(ids).to.eq(expected_ids)
@@ -1,3 +1,5 @@
+from django.db.models import Q
+
 from data.models import PoliceUnit
 from es_index.indexers import BaseIndexer
 from .doc_types import UnitDocType
@@ -13,9 +15,17 @@ app_name = __name__.split('.')[0]
 class UnitIndexer(BaseIndexer):
     doc_type_klass = UnitDocType
     index_alias = units_index_alias
+    incremental = True
 
     def get_queryset(self):
         return PoliceUnit.objects.all()
 
+    def get_updated_queryset(self, since):
+        return PoliceUnit.objects.filter(
+            Q(updated_at__gt=since) |
+            Q(officerhistory__updated_at__gt=since) |
+            Q(officerhistory__officer__officerallegation__updated_at__gt=since)
+        ).distinct()
+
     def extract_datum(self, datum):
         return UnitSummarySerializer(datum).data
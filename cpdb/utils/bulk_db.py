@@ -1,28 +1,39 @@
-def build_bulk_update_sql(table_name, id_field, fields, data):
-    column_assignment = ', '.join(f'{field} = c.{field}' for field in fields)
-    data_columns = [id_field] + fields
+from django.db import connection, transaction
+from psycopg2.extras import execute_values
 
-    def format_value(value):
-        if value is None:
-            return 'NULL'
-        elif isinstance(value, str):
-            return f"'{value}'"
-        else:
-            return str(value)
 
-    def format_value_row(row):
-        return f"({', '.join(format_value(row[field]) for field in data_columns)})"
+def bulk_update(table_name, id_field, fields, data, page_size=1000):
+    """
+    Update `fields` of many rows of `table_name` at once.
+    Rows are sent as real query parameters into a temp table shaped like the target columns, then applied
+    with a single UPDATE ... FROM.
+    :param data: iterable of dicts having id_field and every field as keys
+    :param page_size: number of rows sent per INSERT statement
+    :return: number of updated rows
+    """
+    data_columns = [id_field] + fields
+    temp_table_name = f'tmp_bulk_update_{table_name}'
+    column_assignment = ', '.join(f'{field} = c.{field}' for field in fields)
+    rows = ([row[field] for field in data_columns] for row in data)
 
-    value_rows = ', '.join(map(format_value_row, data))
-    defining_types = ', '.join(f'(NULL::{table_name}).{field}' for field in data_columns)
-    null_rows_for_defining_types = f'({defining_types}), '
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {temp_table_name}')
+        cursor.execute(
+            f'CREATE TEMP TABLE {temp_table_name} AS SELECT {", ".join(data_columns)} FROM {table_name} WITH NO DATA'
+        )
+        execute_values(
+            cursor.cursor,
+            f'INSERT INTO {temp_table_name} ({", ".join(data_columns)}) VALUES %s',
+            rows,
+            page_size=page_size
+        )
+        cursor.execute(f'''
+            UPDATE {table_name} AS t SET
+              {column_assignment}
+            FROM {temp_table_name} AS c
+            WHERE c.{id_field} = t.{id_field}
+        ''')
+        updated_count = cursor.rowcount
+        cursor.execute(f'DROP TABLE {temp_table_name}')
 
-    return f'''
-        UPDATE {table_name} AS t SET
-          {column_assignment}
-        FROM (values
-          {null_rows_for_defining_types}
-          {value_rows}
-        ) AS c({', '.join(data_columns)})
-        WHERE c.{id_field} = t.{id_field};
-    '''
+    return updated_count
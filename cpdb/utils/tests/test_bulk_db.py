@@ -2,36 +2,47 @@ from django.test.testcases import TestCase
 
 from robber import expect
 
-from utils.bulk_db import build_bulk_update_sql
+from data.factories import OfficerFactory
+from data.models import Officer
+from utils.bulk_db import bulk_update
 
 
 class BulkDbTestCase(TestCase):
-    def test_build_bulk_update_sql(self):
-        def _format_sql(sql_string):
-            ''.join(sql_string.replace('\n', '').split())
+    def test_bulk_update(self):
+        officer_1 = OfficerFactory(id=1, first_name='Roman', complaint_percentile=10)
+        officer_2 = OfficerFactory(id=2, first_name='Jerome', complaint_percentile=20)
+        officer_3 = OfficerFactory(id=3, first_name='Edward', complaint_percentile=30)
 
         batch_data = [
             {
                 'id': 1,
-                'first_name': 'Roman',
+                'first_name': "O'Brien",
                 'complaint_percentile': 50
             },
             {
                 'id': 2,
                 'first_name': 'Jerome',
-                'complaint_percentile': 78
+                'complaint_percentile': None
             }
         ]
 
-        expected_sql_string = '''
-            UPDATE officer AS t SET
-              complaint_percentile = c.complaint_percentile
-            FROM (values
-              ((NULL::officer).id, (NULL::officer).first_name, (NULL::officer).complaint_percentile),
-              (1, 'Roman', 50), (2, 'Jerome', 78)
-            ) AS c(id, first_name, complaint_percentile)
-            WHERE c.id = t.id;
-        '''
-
-        sql_string = build_bulk_update_sql('officer', 'id', ['first_name', 'complaint_percentile'], batch_data)
-        expect(_format_sql(sql_string)).to.eq(_format_sql(expected_sql_string))
+        updated_count = bulk_update(
+            Officer._meta.db_table, 'id', ['first_name', 'complaint_percentile'], batch_data, page_size=1
+        )
+
+        expect(updated_count).to.eq(2)
+        officer_1.refresh_from_db()
+        officer_2.refresh_from_db()
+        officer_3.refresh_from_db()
+        expect(officer_1.first_name).to.eq("O'Brien")
+        expect(officer_1.complaint_percentile).to.eq(50)
+        expect(officer_2.complaint_percentile).to.be.none()
+        expect(officer_3.first_name).to.eq('Edward')
+        expect(officer_3.complaint_percentile).to.eq(30)
+
+    def test_bulk_update_empty_data(self):
+        officer = OfficerFactory(first_name='Roman')
+
+        expect(bulk_update(Officer._meta.db_table, 'id', ['first_name'], [])).to.eq(0)
+        officer.refresh_from_db()
+        expect(officer.first_name).to.eq('Roman')
@@ -16,6 +16,7 @@ from data.factories import (
     PoliceUnitFactory,
     AreaFactory,
 )
+from data.cache_managers import officer_coaccusal_cache_manager
 from trr.factories import TRRFactory
 from xlsx.tests.writer_base_test_case import WriterBaseTestCase
 from xlsx.utils import export_officer_xlsx
@@ -224,6 +225,7 @@ class ExportOfficerXlsxUtilTestCase(WriterBaseTestCase):
             allegation=allegation,
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         export_officer_xlsx(officer, self.test_output_dir)
 
         self.covert_xlsx_to_csv('accused.xlsx')
@@ -454,6 +456,7 @@ class ExportOfficerXlsxUtilTestCase(WriterBaseTestCase):
             allegation=allegation,
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         export_officer_xlsx(investigator.officer, self.test_output_dir)
 
         self.covert_xlsx_to_csv('investigator.xlsx')
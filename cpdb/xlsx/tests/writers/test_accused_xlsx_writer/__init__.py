@@ -14,6 +14,7 @@ from data.factories import (
     AreaFactory,
     PoliceUnitFactory,
 )
+from data.cache_managers import officer_coaccusal_cache_manager
 from xlsx.tests.writer_base_test_case import WriterBaseTestCase
 from xlsx.writers.accused_xlsx_writer import AccusedXlsxWriter
 
@@ -229,6 +230,7 @@ class AccusedXlsxWriterTestCase(WriterBaseTestCase):
             allegation=allegation,
         )
 
+        officer_coaccusal_cache_manager.cache_data()
         writer = AccusedXlsxWriter(officer, self.test_output_dir)
         writer.export_xlsx()
 